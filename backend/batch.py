@@ -0,0 +1,288 @@
+"""
+Offline bulk analysis of archived recordings (same pipeline as POST /analyze).
+
+Walks directories and/or manifests (one path per line, '#' comments), hashes
+every file and skips those whose output already exists, then spreads the rest
+over a process pool. Each worker loads the models once and keeps them for all
+its files. Outputs are keyed like long-media jobs, by content hash + options
+(services.jobs.job_id_for): per file it writes <out>/<key>.json (+ .pdf with
+--pdf), frames under <out>/frames/<key>/, and appends a line to
+<out>/index.jsonl. With SEARCH_INDEX=1 results are also added to the /search
+index (SEARCH_DB) as meeting <sha16>, the first 16 hex digits of the file's SHA-256.
+
+If a worker dies (e.g. OOM-killed), the pool is recreated and the unfinished
+files are resubmitted; the files that were being processed at the time are
+retried one at a time afterwards, so a file that crashes again is the one
+marked failed.
+
+Recordings of LONG_MEDIA_MIN_SEC or longer go through the windowed,
+memory-bounded long-media pipeline, like /analyze?long_media=auto.
+
+Run from backend/:
+  python batch.py /archive/meetings --out /archive/analysis --pdf
+  python batch.py --manifest backfill.txt --out out --workers 4
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Tuple
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND)
+
+from services.jobs import file_sha256, job_id_for  # noqa: E402  (model-free)
+
+# ---- Knobs ----
+WORKER_MEM_GB      = float(os.getenv("BATCH_WORKER_MEM_GB", "3"))      # resident models + one recording
+THREADS_PER_WORKER = int(os.getenv("BATCH_THREADS_PER_WORKER", "2"))   # torch / CTranslate2 / OpenMP threads
+
+MEDIA_EXTS = ["mp3", "wav", "mp4", "avi", "mov", "webm"]
+
+
+# ---- Inputs ----
+def _media_in(path: str) -> List[str]:
+    if os.path.isfile(path):
+        return [path]
+    found = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if name.rsplit(".", 1)[-1].lower() in MEDIA_EXTS:
+                found.append(os.path.join(root, name))
+    return found
+
+def collect_inputs(paths: List[str], manifest: str = "") -> List[str]:
+    items = list(paths)
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    items.append(line if os.path.isabs(line) else os.path.join(base, line))
+    files = []
+    for p in items:
+        files.extend(_media_in(p))
+    return sorted(set(os.path.abspath(f) for f in files))
+
+
+# ---- Pool sizing ----
+def _available_mem_gb() -> float:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / (1024 ** 2)
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 ** 3)
+    except (ValueError, OSError, AttributeError):
+        return WORKER_MEM_GB  # unknown: let the core count decide
+
+def auto_workers(n_files: int) -> int:
+    """As many workers as cores / THREADS_PER_WORKER allow and free memory can hold."""
+    by_cpu = (os.cpu_count() or 1) // max(1, THREADS_PER_WORKER)
+    by_mem = int(_available_mem_gb() // WORKER_MEM_GB)
+    return max(1, min(by_cpu, by_mem, n_files))
+
+
+# ---- Worker ----
+def _init_worker(threads: int) -> None:
+    # Thread caps must be set before torch / ctranslate2 are imported.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.chdir(BACKEND)  # model paths are relative to backend/
+    import torch
+    torch.set_num_threads(threads)
+    import services.pipeline     # noqa: F401  loads Whisper, BART, RoBERTa, Xception once
+    import services.long_media   # noqa: F401
+
+def _atomic_write(path: str, chunks) -> None:
+    tmp = path + ".part"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp, path)
+
+def output_key(sha: str, options: Dict[str, Any]) -> str:
+    """Name of a file's outputs: another --sentiment-mode, --diarize, ... is another output."""
+    return job_id_for(sha, options)[:16]
+
+def _work_dir(out_dir: str, key: str) -> str:
+    # exists only while a worker is processing the file (left behind if it dies)
+    return os.path.join(out_dir, "work", key)
+
+def process_file(path: str, sha: str, out_dir: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    from services.long_media import LongMediaAnalysis, MIN_DURATION_SEC, probe_duration
+    from services.pipeline import VIDEO_EXTS, analyze_media
+    from services.search import SEARCH_INDEX
+
+    key = output_key(sha, options)
+    meeting_id = sha[:16]
+    json_path = os.path.join(out_dir, f"{key}.json")
+    frame_dir = os.path.join(out_dir, "frames", key)
+    work_dir = _work_dir(out_dir, key)
+    shutil.rmtree(work_dir, ignore_errors=True)   # spill logs of a crashed attempt
+    os.makedirs(work_dir)
+    is_video = path.rsplit(".", 1)[-1].lower() in VIDEO_EXTS
+    t0 = time.perf_counter()
+    duration = probe_duration(path)
+    if duration <= 0:
+        print(f"[batch] ffprobe could not read the duration of {path}; analyzing it in memory "
+              f"and leaving it out of the media time")
+    stats = {"source": path, "sha256": sha, "json": json_path, "media_sec": round(duration, 1)}
+    try:
+        if duration >= MIN_DURATION_SEC:
+            job = LongMediaAnalysis(path, work_dir, is_video=is_video,
+                                    frame_dir=frame_dir if is_video else None, frame_url=f"frames/{key}",
+                                    frame_sampling=options["frame_sampling"], diarize=options["diarize"])
+            job.run()
+            _atomic_write(json_path, job.iter_json(options["sentiment_mode"], page_size=0,
+                                                   extra={"meeting_id": meeting_id} if SEARCH_INDEX else None))
+            if SEARCH_INDEX:
+                job.index(meeting_id, title=os.path.basename(path))
+        else:
+            result = analyze_media(path, frame_dir=frame_dir, frame_url=f"frames/{key}", work_dir=work_dir,
+                                   frame_sampling=options["frame_sampling"],
+                                   sentiment_mode=options["sentiment_mode"], page_size=0,
+                                   meeting_id=meeting_id, title=os.path.basename(path), diarize=options["diarize"])
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            _atomic_write(json_path, [json.dumps(result)])
+        if options["pdf"]:
+            from services.report import report_payload, write_pdf
+            with open(json_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            stats["pdf"] = write_pdf(report_payload(result, os.path.basename(path)),
+                                     os.path.join(out_dir, f"{key}.pdf"))
+        stats["status"] = "done"
+    except Exception as e:
+        stats.update(status="failed", error=str(e))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    stats["seconds"] = round(time.perf_counter() - t0, 1)
+    return stats
+
+
+# ---- Driver ----
+def hash_inputs(files: List[str], threads: int = 4) -> List[Tuple[str, str]]:
+    with ThreadPoolExecutor(max_workers=threads) as ex:  # hashlib releases the GIL
+        return list(zip(files, ex.map(file_sha256, files)))
+
+def run_pool(items: List[Tuple[str, str]], workers: int, threads: int, out_dir: str,
+             options: Dict[str, Any], record) -> List[Tuple[str, str]]:
+    """Process `items` on a fresh pool, `record`ing each result; returns the unfinished ones (in order) if it broke."""
+    unfinished = set()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {pool.submit(process_file, path, sha, out_dir, options): (path, sha) for path, sha in items}
+        for fut in as_completed(futures):
+            try:
+                record(fut.result())
+            except BrokenProcessPool:  # a worker died (e.g. OOM-killed)
+                unfinished.add(futures[fut])
+    return [item for item in items if item in unfinished]
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk-analyze recordings with the /analyze pipeline.")
+    ap.add_argument("inputs", nargs="*", help="files or directories (searched recursively)")
+    ap.add_argument("--manifest", default="", help="text file with one path per line")
+    ap.add_argument("--out", required=True, help="output directory")
+    ap.add_argument("--workers", type=int, default=0, help="processes (default: sized to cores and memory)")
+    ap.add_argument("--pdf", action="store_true", help="also render a PDF report per file")
+    ap.add_argument("--diarize", action="store_true", help="label segments by speaker (services.diarization)")
+    ap.add_argument("--frame-sampling", default="grid", choices=["grid", "adaptive"])
+    ap.add_argument("--sentiment-mode", default="segments", choices=["segments", "bucket", "turn"],
+                    help="bucket/turn store only the compact timeline (no per-segment detail)")
+    args = ap.parse_args()
+
+    files = collect_inputs(args.inputs, args.manifest)
+    if not files:
+        sys.exit("No media files found.")
+    out_dir = os.path.abspath(args.out)
+
+    options = {"frame_sampling": args.frame_sampling, "sentiment_mode": args.sentiment_mode, "pdf": args.pdf,
+               "diarize": args.diarize}
+
+    # Skip by content hash + options: renamed/moved copies of finished recordings are not redone
+    todo, seen, skipped = [], set(), 0
+    for path, sha in hash_inputs(files):
+        if sha in seen or os.path.exists(os.path.join(out_dir, f"{output_key(sha, options)}.json")):
+            skipped += 1
+            continue
+        seen.add(sha)
+        todo.append((path, sha))
+
+    workers = args.workers or auto_workers(len(todo))
+    print(f"{len(files)} files: {skipped} already processed, {len(todo)} to do on {workers} worker(s)")
+    if not todo:
+        return
+
+    threads = max(1, min(THREADS_PER_WORKER, (os.cpu_count() or 1) // workers))
+    done = failed = unprobed = 0
+    media_sec = 0.0
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)    # only once there is work: a no-op run leaves nothing behind
+    with open(os.path.join(out_dir, "index.jsonl"), "a", encoding="utf-8") as index:
+        def record(stats):
+            nonlocal done, failed, unprobed, media_sec
+            index.write(json.dumps(stats) + "\n")
+            index.flush()
+            if stats["status"] == "done":
+                done += 1
+                media_sec += stats["media_sec"]
+                unprobed += stats["media_sec"] <= 0
+            else:
+                failed += 1
+            print(f"[{done + failed}/{len(todo)}] {stats['status']:<6} {stats['seconds']:>7.1f}s "
+                  f"{os.path.basename(stats['source'])}" + (f"  ({stats['error']})" if "error" in stats else ""))
+
+        def crashed(path, error):
+            record({"source": path, "status": "failed", "error": error, "seconds": 0.0, "media_sec": 0.0})
+
+        queue, suspects = todo, []
+        while queue:
+            unfinished = run_pool(queue, workers, threads, out_dir, options, record)
+            if not unfinished:
+                break
+            # a worker died: the files it may have been on left their work dir behind
+            in_flight = [(p, sha) for p, sha in unfinished
+                         if os.path.isdir(_work_dir(out_dir, output_key(sha, options)))]
+            if not in_flight:
+                for path, _ in unfinished:
+                    crashed(path, "worker pool crashed before starting the file")
+                break
+            print(f"worker crashed; restarting the pool for {len(unfinished) - len(in_flight)} file(s), "
+                  f"{len(in_flight)} in-flight file(s) are retried one at a time")
+            suspects += in_flight
+            queue = [item for item in unfinished if item not in in_flight]
+
+        # one worker: a crash now is the fault of the file it was processing
+        while suspects:
+            unfinished = run_pool(suspects, 1, threads, out_dir, options, record)
+            if not unfinished:
+                break
+            crashed(unfinished[0][0], "worker crashed (e.g. out of memory) twice on this file")
+            suspects = unfinished[1:]
+
+    try:
+        os.rmdir(os.path.join(out_dir, "work"))   # per-file work dirs are gone; drop their parent
+    except OSError:
+        pass   # never created, or a crashed file's work dir is still in it
+
+    wall = time.perf_counter() - t0
+    print(f"\nprocessed {done}, failed {failed}, skipped {skipped} in {wall / 60:.1f} min")
+    if wall > 0:
+        print(f"throughput: {done / wall * 3600:.1f} files/h, "
+              f"{media_sec / wall:.2f}x real time ({media_sec / 3600:.1f} h of media)"
+              + (f"; {unprobed} file(s) of unknown duration not counted" if unprobed else ""))
+
+
+if __name__ == "__main__":
+    main()
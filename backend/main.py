@@ -2,7 +2,7 @@ import os, sys
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from routes import transcribe, analyze, report
+from routes import transcribe, analyze, report, jobs, search, metrics, profiles
 
 # Ensure current folder is in sys.path for relative imports
 sys.path.append(os.path.dirname(__file__))
@@ -25,6 +25,10 @@ app.add_middleware(
 app.include_router(transcribe.router)
 app.include_router(analyze.router)
 app.include_router(report.router)
+app.include_router(jobs.router)
+app.include_router(search.router)
+app.include_router(metrics.router)
+app.include_router(profiles.router)
 
 # Serve static files (extracted frames etc.)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -1,96 +1,104 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Query, Request
 import os
 import shutil
 import uuid
-import ffmpeg
 from datetime import datetime
 
-from services.transcriber import transcribe_audio
-from services.summarizer import generate_summary
-from services.sentiment import analyze_sentiment
-from services.deepfake import extract_frames, predict_image
+from services.deepfake import predict_image
+from services.pipeline import AUDIO_EXTS, VIDEO_EXTS, analyze_media
+from services.long_media import MIN_DURATION_SEC, WINDOW_SEC as LONG_WINDOW_SEC, probe_duration
+from services.jobs import file_sha256, job_id_for
+from services.search import SEARCH_INDEX
+from services.encoding import compact_result, encoded_response
+from services.profiling import profiled
+from services.diarization import DIARIZATION
+from routes.jobs import job_source_path, start_long_media_job
 
 router = APIRouter()
 
 @router.post("/analyze")
-async def analyze_file(file: UploadFile = File(...)):
+@profiled("analyze")
+def analyze_file(
+    request: Request,
+    file: UploadFile = File(...),
+    # "segments" = original per-segment list; "bucket"/"turn" = compact timeline
+    sentiment_mode: str = Query("segments", pattern="^(segments|bucket|turn)$"),
+    bucket_sec: float = Query(60.0, ge=1),
+    # page of the per-segment detail sent inline (page_size=0 = none); indexed
+    # meetings are also paged by GET /meetings/{meeting_id}/sentiment
+    page: int = Query(0, ge=0),
+    page_size: int = Query(200, ge=0, le=1000),
+    # opt-in windowed, memory-bounded processing as a background job (the response is
+    # the job id; see /jobs/{id}/result); "auto" = recordings >= LONG_MEDIA_MIN_SEC
+    long_media: str = Query("off", pattern="^(auto|on|off)$"),
+    # deepfake frames: fixed 30s "grid" or confidence-driven "adaptive" refinement
+    frame_sampling: str = Query("grid", pattern="^(grid|adaptive)$"),
+    # "compact" = columnar transcript/sentiment/frames, orjson, br/gzip per Accept-Encoding
+    response_format: str = Query("json", alias="format", pattern="^(json|compact)$"),
+    # label segments with "speaker" and add a per-speaker "speakers" summary
+    diarize: bool = Query(DIARIZATION),
+):
+    # plain def: FastAPI runs it in its threadpool, so copying and hashing the upload
+    # and the model calls below don't block the event loop
+    accept_encoding = request.headers.get("accept-encoding", "")
+
     # # 1) Persist upload to temp/
     temp_dir = "temp"
     os.makedirs(temp_dir, exist_ok=True)
-    file_path = os.path.join(temp_dir, file.filename)
+    # unique name: concurrent uploads of the same filename must not share a path
+    file_path = os.path.join(temp_dir, f"{uuid.uuid4().hex[:8]}_{os.path.basename(file.filename)}")
     with open(file_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
 
     ext = file.filename.rsplit(".", 1)[-1].lower()
 
-    # --- Audio flow ---
-    if ext in ["mp3", "wav"]:
-        transcript = transcribe_audio(file_path)
-        summary = generate_summary(transcript)
-        sentiment = analyze_sentiment(transcript)
-        # cleanup
-        os.remove(file_path)
-        return {
-            "type": "audio",
-            "transcript": transcript,
-            "summary": summary,
-            "sentiment": sentiment
-        }
+    # --- Long-media flow (rolling windows, checkpointed, background job) ---
+    if ext in AUDIO_EXTS + VIDEO_EXTS and long_media != "off" and (
+        long_media == "on" or probe_duration(file_path) >= MIN_DURATION_SEC
+    ):
+        # Checkpointed job keyed by content hash + options: re-uploading the same
+        # recording after a restart resumes from the last finished window.
+        options = {"frame_sampling": frame_sampling, "window_sec": LONG_WINDOW_SEC}
+        if diarize:
+            options["diarize"] = True
+        content_hash = file_sha256(file_path)
+        job_id = job_id_for(content_hash, options)
+        source_path = job_source_path(job_id, ext)
+        if os.path.exists(source_path):
+            os.remove(file_path)
+        else:
+            os.makedirs(os.path.dirname(source_path), exist_ok=True)
+            os.replace(file_path, source_path)
+        view = {"sentiment_mode": sentiment_mode, "bucket_sec": bucket_sec,
+                "page": page, "page_size": page_size, "format": response_format}
+        return start_long_media_job(job_id, source_path, file.filename, options, view, content_hash)
 
-    # --- Video flow ---
-    elif ext in ["mp4", "avi", "mov"]:
+    # --- Audio / video flow ---
+    if ext in AUDIO_EXTS + VIDEO_EXTS:
         # Prepare static frames output directory by timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        frame_output_dir = os.path.join("static", "frames", timestamp)
-        os.makedirs(frame_output_dir, exist_ok=True)
-
-        # Extract frames every 30s and run deepfake prediction
-        frames = extract_frames(file_path, frame_output_dir, interval_sec=30)
-        frame_results = []
-        fake_count = 0
-        for frame_path in frames:
-            label, score = predict_image(frame_path)
-            if label == "Fake":
-                fake_count += 1
-            fname = os.path.basename(frame_path)
-            frame_results.append({
-                "label": label,
-                "score": round(score * 100, 1),
-                "image_url": f"/static/frames/{timestamp}/{fname}"
-            })
-
-        # Extract audio -> mono wav 16k
-        audio_path = os.path.join(temp_dir, "audio.wav")
+        timestamp = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
         try:
-            (
-                ffmpeg
-                .input(file_path)
-                .output(audio_path, ac=1, ar=16000)
-                .overwrite_output()
-                .run(quiet=True)
+            result = analyze_media(
+                file_path,
+                frame_dir=os.path.join("static", "frames", timestamp),
+                frame_url=f"/static/frames/{timestamp}",
+                work_dir=temp_dir,
+                frame_sampling=frame_sampling,
+                sentiment_mode=sentiment_mode,
+                bucket_sec=bucket_sec,
+                page=page,
+                page_size=page_size,
+                # same file -> same meeting in the search index
+                meeting_id=file_sha256(file_path)[:16] if SEARCH_INDEX else None,
+                title=file.filename,
+                diarize=diarize,
             )
-        except Exception as e:
-            return {"error": f"Failed to extract audio: {str(e)}"}
-
-        # ASR + summary + sentiment on the extracted audio
-        transcript = transcribe_audio(audio_path)
-        summary = generate_summary(transcript)
-        sentiment = analyze_sentiment(transcript)
-
-        # Cleanup temp files
-        for p in [audio_path, file_path]:
-            if os.path.exists(p):
-                os.remove(p)
-
-        return {
-            "type": "video",
-            "frames_checked": len(frames),
-            "fake_frames": fake_count,
-            "frame_details": frame_results,     
-            "transcript": transcript,
-            "summary": summary,
-            "sentiment": sentiment
-        }
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        if response_format == "compact" and "error" not in result:
+            return encoded_response(compact_result(result), accept_encoding)
+        return result
 
     else:
         # --- Unsupported extension ---
@@ -99,12 +107,13 @@ async def analyze_file(file: UploadFile = File(...)):
 
 
 @router.post("/analyze_frame")
-async def analyze_frame(file: UploadFile = File(...)):
+def analyze_frame(file: UploadFile = File(...)):
     #     Single-frame deepfake check (used by RecordPage periodic snapshots).
     #     Returns: {"label": "...", "score": float_in_[0,1]}
+    #     (plain def: Xception runs in the threadpool, not on the event loop)
     filename = f"temp/frame_{uuid.uuid4().hex}.jpg"
     with open(filename, "wb") as f:
-        f.write(await file.read())
+        f.write(file.file.read())
     label, score = predict_image(filename)
     os.remove(filename)
     return {"label": label, "score": score}
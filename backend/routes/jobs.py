@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import FileResponse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+
+from services.jobs import JOB_WORKERS, JOBS_DIR, Checkpoints, JobStore, claim, file_sha256, release
+from services.long_media import LongMediaAnalysis
+from services.pipeline import VIDEO_EXTS
+from services.search import SEARCH_INDEX
+from services.encoding import encoded_stream
+
+router = APIRouter()
+
+# Long-media jobs run here, off the event loop; extra jobs wait in the queue
+# (their status is already "running").
+_workers = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="long-media")
+
+
+def job_source_path(job_id: str, ext: str) -> str:
+    return os.path.join(JOBS_DIR, job_id, f"source.{ext}")
+
+def job_result_path(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, job_id, "result.json")
+
+def _job_info(job_id: str, status: str) -> dict:
+    return {"job_id": job_id, "status": status, "result": f"/jobs/{job_id}/result"}
+
+def start_long_media_job(job_id, source_path, filename, options, view, content_hash=None):
+    '''
+    Queue a checkpointed long-media job on the job workers and return at once:
+    {"job_id", "status": "running", "result": "/jobs/<id>/result"}. Poll
+    GET /jobs/{id} and fetch the result once its status is "done".
+
+    `options` are the processing options the job id is derived from; `view`
+    (sentiment_mode, bucket_sec, page, page_size, format) only shapes the result
+    and is stored with them under "view".
+    '''
+    if not claim(job_id):
+        return _job_info(job_id, "running")    # already queued or running in this process
+    JobStore().upsert_job(job_id, filename, source_path, {**options, "view": view})
+    if os.path.exists(job_result_path(job_id)):
+        os.remove(job_result_path(job_id))     # a re-run replaces the previous result
+    _workers.submit(_run_job, job_id, source_path, filename, options, view, content_hash)
+    return _job_info(job_id, "running")
+
+def _run_job(job_id, source_path, filename, options, view, content_hash=None):
+    '''
+    Run (or resume) a claimed job and write its JSON result to job_result_path.
+
+    Finished stages are read back from the job's checkpoints, so a job that was
+    interrupted by a restart only redoes the window it was working on. On success
+    the source, spill logs and checkpoints are removed (the result stays) and the
+    status becomes "done"; on failure they are kept for /jobs/{id}/resume. With
+    SEARCH_INDEX=1 the finished meeting is added to the search index under the
+    first 16 hex digits of the file's SHA-256.
+    '''
+    store = JobStore()
+    job_dir = os.path.dirname(source_path)
+    work_dir = os.path.join(job_dir, "work")
+    ext = source_path.rsplit(".", 1)[-1].lower()
+    is_video = ext in VIDEO_EXTS
+    # frames dir is keyed by job id so URLs stay valid across resumes
+    frames_key = f"job_{job_id[:16]}"
+    try:
+        job = LongMediaAnalysis(
+            source_path,
+            work_dir=work_dir,
+            is_video=is_video,
+            frame_dir=os.path.join("static", "frames", frames_key) if is_video else None,
+            frame_url=f"/static/frames/{frames_key}",
+            window_sec=options["window_sec"],
+            frame_sampling=options["frame_sampling"],
+            checkpoints=Checkpoints(store, job_id),
+            diarize=options.get("diarize", False),
+        )
+        job.run()
+
+        extra = {"job_id": job_id}
+        if SEARCH_INDEX:
+            extra["meeting_id"] = (content_hash or file_sha256(source_path))[:16]
+        # written under a temporary name: the result file is either complete or absent
+        partial = job_result_path(job_id) + ".part"
+        with open(partial, "w", encoding="utf-8") as f:
+            for chunk in job.iter_json(view["sentiment_mode"], view["bucket_sec"], page_size=view["page_size"],
+                                       page=view.get("page", 0), extra=extra, compact=view["format"] == "compact"):
+                f.write(chunk)
+        os.replace(partial, job_result_path(job_id))
+
+        if SEARCH_INDEX:
+            job.index(extra["meeting_id"], title=filename)
+        store.set_status(job_id, "done")
+        store.delete_checkpoints(job_id)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.remove(source_path)
+    except Exception as e:
+        print(f"[jobs] {job_id} failed: {e}")
+        store.set_status(job_id, "failed", f"Long-media analysis failed: {str(e)}")
+    finally:
+        release(job_id)
+
+def _file_chunks(path: str, block: int = 1 << 16):
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter(lambda: f.read(block), "")
+
+
+@router.get("/jobs")
+def list_jobs(status: str = Query(None, pattern="^(running|done|failed)$")):
+    # "running" jobs not active in this process were interrupted and can be resumed
+    return {"jobs": JobStore().list_jobs(status)}
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = JobStore().get_job(job_id)
+    if job is None:
+        return {"error": "Job not found."}
+    if job["status"] == "done":
+        job["result"] = f"/jobs/{job_id}/result"
+    return job
+
+@router.get("/jobs/{job_id}/result")
+def job_result(job_id: str, request: Request):
+    #     The finished analysis, the same JSON object /analyze returns (plus
+    #     "long_media" and "job_id"); compact results are br/gzip-compressed
+    #     according to Accept-Encoding.
+    job = JobStore().get_job(job_id)
+    if job is None:
+        return {"error": "Job not found."}
+    if job["status"] == "running":
+        return {"error": "Job is still running.", **_job_info(job_id, "running")}
+    if job["status"] == "failed":
+        return {"error": job["error"] or "Job failed.", "job_id": job_id, "status": "failed"}
+    path = job_result_path(job_id)
+    if not os.path.exists(path):
+        return {"error": "Job result is missing; upload the recording again.", "job_id": job_id}
+    if job["options"].get("view", {}).get("format") == "compact":
+        return encoded_stream(_file_chunks(path), request.headers.get("accept-encoding", ""))
+    return FileResponse(path, media_type="application/json")
+
+@router.post("/jobs/{job_id}/resume")
+def resume_job(
+    job_id: str,
+    sentiment_mode: str = Query("segments", pattern="^(segments|bucket|turn)$"),
+    bucket_sec: float = Query(60.0, ge=1),
+    # page of the per-segment detail in the result (page_size=0 = none); indexed
+    # meetings are also paged by GET /meetings/{meeting_id}/sentiment
+    page: int = Query(0, ge=0),
+    page_size: int = Query(200, ge=0, le=1000),
+    response_format: str = Query("json", alias="format", pattern="^(json|compact)$"),
+):
+    job = JobStore().get_job(job_id)
+    if job is None:
+        return {"error": "Job not found."}
+    if job["status"] == "done":
+        return {"error": "Job already finished.", **_job_info(job_id, "done")}
+    if not os.path.exists(job["source_path"]):
+        return {"error": "Job source file is missing; upload the recording again.", "job_id": job_id}
+    options = {k: v for k, v in job["options"].items() if k != "view"}
+    view = {"sentiment_mode": sentiment_mode, "bucket_sec": bucket_sec,
+            "page": page, "page_size": page_size, "format": response_format}
+    return start_long_media_job(job_id, job["source_path"], job["filename"], options, view)
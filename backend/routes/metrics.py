@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from services.sentiment import sentiment_cache_stats
+
+router = APIRouter()
+
+@router.get("/metrics/sentiment_cache")
+def sentiment_cache():
+    #     Shared sentiment memo cache: size, hits/misses/hit_rate since start,
+    #     segments answered by the short-segment fast path, LRU evictions.
+    return sentiment_cache_stats()
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, JSONResponse
+
+from services.profiling import artifact_path, get_profile, is_admin, list_profiles
+
+router = APIRouter()
+
+_FORBIDDEN = {"error": "Admin token required (X-Admin-Token)."}
+
+@router.get("/profiles")
+def profiles(request: Request):
+    #     Stored request profiles, newest first (admin only).
+    if not is_admin(request):
+        return JSONResponse(_FORBIDDEN, status_code=403)
+    return {"profiles": list_profiles()}
+
+@router.get("/profiles/{profile_id}")
+def profile(profile_id: str, request: Request):
+    if not is_admin(request):
+        return JSONResponse(_FORBIDDEN, status_code=403)
+    meta = get_profile(profile_id)
+    if meta is None:
+        return {"error": "Profile not found."}
+    return meta
+
+@router.get("/profiles/{profile_id}/{artifact}")
+def profile_artifact(profile_id: str, artifact: str, request: Request):
+    #     sampling.speedscope.json -> https://www.speedscope.app
+    #     torch_trace.json         -> chrome://tracing or https://ui.perfetto.dev
+    #     sampling.html, torch_ops.txt, cprofile.* -> open directly
+    if not is_admin(request):
+        return JSONResponse(_FORBIDDEN, status_code=403)
+    path = artifact_path(profile_id, artifact)
+    if path is None:
+        return {"error": "Artifact not found."}
+    return FileResponse(path, filename=f"{profile_id}_{artifact}")
@@ -1,46 +1,50 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import FileResponse
-import pdfkit
+from fastapi import APIRouter, Body, Query, Request
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
 import shutil
-from jinja2 import Environment, FileSystemLoader
 import uuid
 import os
-from pdfkit.configuration import Configuration
+
+from services.report import write_pdf
+from services.profiling import profiled
 
 router = APIRouter()
 
 @router.post("/generate_pdf")
-async def generate_pdf(request: Request):
-    # Read JSON payload from frontend
-    request_data = await request.json()
-
-    # Load Jinja2 template from ./templates/report_template.html
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template("report_template.html")
-    html_content = template.render(data=request_data)
+@profiled("generate_pdf")
+def generate_pdf(request: Request, request_data: dict = Body(...)):
+    # request_data: JSON payload from the frontend. A def endpoint runs on the
+    # threadpool (wkhtmltopdf takes seconds), off the event loop, and a profiled
+    # request samples the thread that renders the PDF.
 
     # Compose a unique output filename under temp/
     output_filename = f"report_{uuid.uuid4().hex[:8]}.pdf"
     output_path = f"temp/{output_filename}"
 
-    
-    config = Configuration(wkhtmltopdf=r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe")
-    pdfkit.from_string(html_content, output_path, configuration=config)
+    # Render ./templates/report_template.html to PDF
+    write_pdf(request_data, output_path)
 
     return FileResponse(output_path, filename="meeting_report.pdf", media_type='application/pdf')
 
-@router.get("/export_frames_zip")
-def export_frames_zip():
-    frames_folder = "static/frames/20250812_164852"  
-    zip_output = "temp/deepfake_frames.zip"
+FRAMES_ROOT = os.path.join("static", "frames")
 
-    if os.path.exists(zip_output):
-        os.remove(zip_output)
-
-    shutil.make_archive(zip_output.replace(".zip", ""), 'zip', frames_folder)
+@router.get("/export_frames_zip")
+def export_frames_zip(frames: str = Query(..., pattern=r"^[\w-]+$")):
+    #     frames = folder under static/frames/ (the <id> in a result's
+    #     /static/frames/<id>/... image URLs). Required: guessing "the most
+    #     recent analysis" could hand out another user's frames.
+    frames_folder = os.path.join(FRAMES_ROOT, frames)
+    if not os.path.isdir(frames_folder):
+        return JSONResponse({"error": "Frames not found."}, status_code=404)
+
+    # Unique archive per request, removed once sent: concurrent exports used to
+    # overwrite (and delete) each other's temp/deepfake_frames.zip.
+    zip_base = f"temp/frames_{uuid.uuid4().hex[:8]}"
+    zip_output = shutil.make_archive(zip_base, 'zip', frames_folder)
 
     return FileResponse(
         zip_output,
         filename="deepfake_frames.zip",
-        media_type="application/zip"
+        media_type="application/zip",
+        background=BackgroundTask(os.remove, zip_output),
     )
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse
+import sqlite3
+import time
+
+from services.profiling import is_admin
+from services.search import KINDS, SearchIndex
+
+router = APIRouter()
+
+_FORBIDDEN = {"error": "Admin token required (X-Admin-Token)."}
+
+@router.get("/search")
+def search(
+    q: str = Query(..., min_length=1),
+    # comma-separated subset of segment,summary,action,decision,fact
+    kind: str = Query(None),
+    meeting_id: str = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    #     Full-text search over every analyzed meeting (SQLite FTS5, BM25 ranking).
+    #     Returns matching transcript segments (with timestamps and sentiment),
+    #     summary bullets and extracted actions/decisions/facts.
+    kinds = [k.strip() for k in kind.split(",") if k.strip()] if kind else None
+    if kinds and any(k not in KINDS for k in kinds):
+        return {"error": f"Unknown kind; use any of: {', '.join(KINDS)}."}
+    t0 = time.perf_counter()
+    try:
+        results = SearchIndex().search(q, kinds=kinds, meeting_id=meeting_id, limit=limit, offset=offset)
+    except sqlite3.Error as e:
+        return {"error": f"Search failed: {str(e)}"}
+    return {
+        "query": q,
+        "took_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "offset": offset,
+        "results": results,
+    }
+
+@router.get("/meetings")
+def list_meetings(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    return {"meetings": SearchIndex().list_meetings(limit, offset)}
+
+@router.get("/meetings/{meeting_id}/sentiment")
+def meeting_sentiment(
+    meeting_id: str,
+    page: int = Query(0, ge=0),
+    page_size: int = Query(200, ge=1, le=1000),
+):
+    #     Per-segment sentiment detail of an analyzed meeting, one page at a time
+    #     (the sentiment_mode=bucket|turn responses carry one page).
+    detail = SearchIndex().segment_sentiment(meeting_id, limit=page_size, offset=page * page_size)
+    if detail is None:
+        return {"error": "Meeting not found."}
+    return {"meeting_id": meeting_id, "page": page, "page_size": page_size, **detail}
+
+@router.delete("/meetings/{meeting_id}")
+def delete_meeting(meeting_id: str, request: Request):
+    #     Remove a meeting from the search index (admin only).
+    if not is_admin(request):
+        return JSONResponse(_FORBIDDEN, status_code=403)
+    if not SearchIndex().delete_meeting(meeting_id):
+        return {"error": "Meeting not found."}
+    return {"deleted": meeting_id}
@@ -1,21 +1,38 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Query, Request
 import os
 import uuid
-import time
 import ffmpeg
 
 from services.transcriber import transcribe_audio
-from services.summarizer import generate_summary
-from services.sentiment import analyze_sentiment
+from services.summarizer import generate_summary, summary_highlights
+from services.sentiment import analyze_sentiment_with_probs, sentiment_payload
+from services.ingest import SINGLE_PASS, demux
+from services.profiling import profiled
+from services.diarization import DIARIZATION, label_speakers
+from services.pipeline import with_speakers
 
 router = APIRouter()
 
 @router.post("/transcribe_chunk")
-async def transcribe_chunk(file: UploadFile = File(...)):
+@profiled("transcribe_chunk")
+def transcribe_chunk(
+    request: Request,
+    file: UploadFile = File(...),
+    sentiment_mode: str = Query("segments", pattern="^(segments|bucket|turn)$"),
+    bucket_sec: float = Query(60.0, ge=1),
+    # page of the per-segment detail sent inline (page_size=0 = none)
+    page: int = Query(0, ge=0),
+    page_size: int = Query(200, ge=0, le=1000),
+    # label segments with "speaker" and add a per-speaker "speakers" summary
+    diarize: bool = Query(DIARIZATION),
+):
     '''
     Receive a single full recording (webm), convert to wav (mono/16k),
     then run ASR + summarization + sentiment analysis.
 
+    A plain def handler: FastAPI runs it in its threadpool, so decoding and the
+    Whisper/BART/RoBERTa calls don't block the event loop for other requests.
+
     Behavior intentionally preserved:
     - Early return for very small/invalid chunks still returns a *list* of transcript items
       (not a dict). This matches your original behavior and keeps the frontend contract unchanged.
@@ -24,8 +41,9 @@ async def transcribe_chunk(file: UploadFile = File(...)):
     Pipeline:
       1) Read the uploaded bytes
       2) Persist raw .webm into temp/
-      3) Convert to .wav via ffmpeg (mono @ 16k)
-      4) Run transcribe → summarize → sentiment
+      3) Decode to .wav (mono @ 16k) in-process, ffmpeg as fallback
+      4) Run transcribe (→ diarize) → summarize → sentiment
+         (sentiment_mode=bucket|turn returns the compact server-side timeline)
       5) Cleanup temp files
     '''
 
@@ -33,7 +51,7 @@ async def transcribe_chunk(file: UploadFile = File(...)):
     wav_path = raw_path.replace(".webm", ".wav")
 
     # Read all bytes of the uploaded chunk
-    content = await file.read()
+    content = file.file.read()
     print("🧾 Chunk size:", len(content), "bytes")
 
      # Small/invalid chunk guard — original early return shape is preserved
@@ -45,23 +63,35 @@ async def transcribe_chunk(file: UploadFile = File(...)):
         f.flush()
         os.fsync(f.fileno())
 
-     # Allow filesystem to settle a bit
-    time.sleep(0.2)
-
+    probs = None
     try:
-          # Convert webm → wav (mono/16k), keeping original ffmpeg flags
-        (
-            ffmpeg
-            .input(raw_path, f='webm', analyzeduration='2147483647', probesize='2147483647')
-            .output(wav_path, format='wav', acodec='pcm_s16le', ac=1, ar=16000)
-            .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
-        )
+        decoded = False
+        if SINGLE_PASS:
+            # In-process decode of the audio track straight to 16k mono PCM
+            try:
+                demux(raw_path, wav_path)
+                decoded = True
+            except Exception as e:
+                print("⚠️ in-process decode failed, falling back to ffmpeg:", e)
+
+        if not decoded:
+            # Convert webm → wav (mono/16k), keeping original ffmpeg flags
+            (
+                ffmpeg
+                .input(raw_path, f='webm', analyzeduration='2147483647', probesize='2147483647')
+                .output(wav_path, format='wav', acodec='pcm_s16le', ac=1, ar=16000)
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
 
         # Run ASR + summarization + sentiment
         transcript = transcribe_audio(wav_path, lang="en")
+        if diarize:
+            label_speakers(wav_path, transcript)
         summary = generate_summary(transcript)
-        sentiment = analyze_sentiment(transcript)
+        highlights = summary_highlights(transcript)
+        _, probs = analyze_sentiment_with_probs(transcript)
+        sentiment = sentiment_payload(transcript, sentiment_mode, bucket_sec, page=page, page_size=page_size, probs=probs)
 
     except ffmpeg.Error as e:
         print("🔥 ffmpeg error detail:", e.stderr.decode())
@@ -70,6 +100,7 @@ async def transcribe_chunk(file: UploadFile = File(...)):
             "text": f"⚠️ ffmpeg error: {e.stderr.decode().strip().splitlines()[-1]}"
         }]
         summary = ""
+        highlights = {}
         sentiment = ""
 
     except Exception as e:
@@ -78,6 +109,7 @@ async def transcribe_chunk(file: UploadFile = File(...)):
             "text": f"⚠️ Error: {str(e)}"
         }]
         summary = ""
+        highlights = {}
         sentiment = ""
 
     finally:
@@ -88,8 +120,12 @@ async def transcribe_chunk(file: UploadFile = File(...)):
             os.remove(wav_path)
 
     # Final response shape
-    return {
+    response = {
         "transcript": transcript,
         "summary": summary,
+        "highlights": highlights,
         "sentiment": sentiment
     }
+    if diarize:
+        with_speakers(response, probs)
+    return response
@@ -4,8 +4,12 @@ from PIL import Image
 import timm
 import cv2
 import numpy as np
+import heapq
 import os
 
+from services import standin
+from services.profiling import model_span
+
 try:
     import face_recognition  # type: ignore
     FACE_DETECT_AVAILABLE = True
@@ -18,10 +22,23 @@ device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 model_path = "model/xception_deepfake_final.pt"
 # Create Xception and load weights
 # Note: If loading fails, check model_path and timm version compatibility.
-model = timm.create_model('xception', pretrained=False, num_classes=2)
-model.load_state_dict(torch.load(model_path, map_location=device))
-model.eval().to(device)
+# MODEL_STANDIN: no weights, fake scores at a configurable cost (load testing)
+STANDIN = standin.enabled("xception")
+if STANDIN:
+    model = standin.StandInModel("xception")
+else:
+    model = timm.create_model('xception', pretrained=False, num_classes=2)
+    model.load_state_dict(torch.load(model_path, map_location=device))
+    model.eval().to(device)
+
 
+# Adaptive (coarse-to-fine) sampling knobs
+ADAPTIVE_COARSE_SEC      = float(os.getenv("DEEPFAKE_COARSE_INTERVAL_SEC", "60"))
+ADAPTIVE_FRAMES_PER_MIN  = float(os.getenv("DEEPFAKE_FRAMES_PER_MIN", "2"))   # same budget as the 30s grid
+ADAPTIVE_MIN_GAP_SEC     = float(os.getenv("DEEPFAKE_MIN_GAP_SEC", "2"))
+ADAPTIVE_MARGIN          = float(os.getenv("DEEPFAKE_UNCERTAIN_MARGIN", "0.15"))
+ADAPTIVE_JUMP            = float(os.getenv("DEEPFAKE_SCORE_JUMP", "0.25"))
+ADAPTIVE_EXPLORE         = 0.2   # refinement weight of confident intervals (coverage)
 
 # Preprocessing for Xception: 299x299, [-1, 1] normalization
 transform = transforms.Compose([
@@ -30,7 +47,13 @@ transform = transforms.Compose([
     transforms.Normalize([0.5] * 3, [0.5] * 3)
 ])
 
-def extract_frames(video_path, output_dir="extracted_frames", interval_sec=30):
+def extract_frames(video_path, output_dir="extracted_frames", interval_sec=30,
+                   start_sec=0.0, end_sec=None, first_index=0):
+    """
+    Save one frame every `interval_sec` seconds as output_dir/frame<N>.jpg.
+    `start_sec`/`end_sec` restrict extraction to a time window (used by the
+    long-media pipeline); `first_index` offsets N so windows don't collide.
+    """
     vidcap = cv2.VideoCapture(video_path)
     if not vidcap.isOpened():
         print(f"[deepfake.extract_frames] Failed to open video: {video_path}")
@@ -40,21 +63,28 @@ def extract_frames(video_path, output_dir="extracted_frames", interval_sec=30):
     if fps <= 0:
         fps = 1.0
     interval = max(1, int(fps * interval_sec))
+    if start_sec > 0:
+        vidcap.set(cv2.CAP_PROP_POS_MSEC, start_sec * 1000.0)
+    last = None if end_sec is None else int(fps * (end_sec - start_sec))
 
-    success, image = vidcap.read()
     count = 0
     saved = 0
     frame_paths = []
 
     os.makedirs(output_dir, exist_ok=True)
 
-    while success:
+    while last is None or count < last:
         if count % interval == 0:
-            frame_filename = f"{output_dir}/frame{saved}.jpg"
+            success, image = vidcap.read()
+            if not success:
+                break
+            frame_filename = f"{output_dir}/frame{first_index + saved}.jpg"
             cv2.imwrite(frame_filename, image)
             frame_paths.append(frame_filename)
             saved += 1
-        success, image = vidcap.read()
+        elif not vidcap.grab():
+            # skipped frames are only grabbed, never converted to BGR
+            break
         count += 1
 
     vidcap.release()
@@ -79,6 +109,13 @@ def predict_image(image_path):
     image_cv = cv2.imread(image_path)
     if image_cv is None:
         raise FileNotFoundError(f"Cannot read image: {image_path}")
+    return predict_frame(image_cv)
+
+def predict_frame(image_cv):
+    """Same as `predict_image`, for a BGR frame already in memory."""
+    if STANDIN:
+        score_fake = model.score_frame(image_cv)
+        return ("Fake" if score_fake > 0.5 else "Real"), round(score_fake, 4)
 
     face_locations = []
     if FACE_DETECT_AVAILABLE:
@@ -95,7 +132,7 @@ def predict_image(image_path):
         image_pil = Image.fromarray(rgb)
 
     image_tensor = transform(image_pil).unsqueeze(0).to(device)
-    with torch.no_grad():
+    with torch.no_grad(), model_span("xception.deepfake"):
         output = model(image_tensor)
         probs = torch.softmax(output, dim=1)
         score_fake = float(probs[0][0].item())  
@@ -103,5 +140,156 @@ def predict_image(image_path):
     label = "Fake" if score_fake > 0.5 else "Real"
     return label, round(score_fake, 4)
 
+def score_frame(image_cv, output_dir, index):
+    """Save a decoded BGR frame as output_dir/frame<index>.jpg and score it."""
+    frame_path = f"{output_dir}/frame{index}.jpg"
+    cv2.imwrite(frame_path, image_cv)
+    label, score = predict_frame(image_cv)
+    return frame_path, label, score
+
+# -------------------- Adaptive Sampling --------------------
+def _interval_priority(sa, sb, length, margin, jump):
+    """
+    How much refining the interval between two scored frames is worth.
+    Intervals whose ends sit near the 0.5 threshold or disagree sharply rank
+    first; confident stretches keep a small exploration weight so long gaps
+    still get sampled once the uncertain ones are resolved.
+    """
+    dist = min(abs(sa - 0.5), abs(sb - 0.5))
+    delta = abs(sa - sb)
+    weight = ADAPTIVE_EXPLORE
+    if dist < margin:
+        weight += 1.0 - 2.0 * dist
+    if delta >= jump:
+        weight += delta
+    return weight * length
+
+def sample_frames_adaptive(video_path, output_dir="extracted_frames",
+                           coarse_interval_sec=ADAPTIVE_COARSE_SEC, frames_per_min=ADAPTIVE_FRAMES_PER_MIN,
+                           min_gap_sec=ADAPTIVE_MIN_GAP_SEC, margin=ADAPTIVE_MARGIN, jump=ADAPTIVE_JUMP,
+                           start_sec=0.0, end_sec=None, first_index=0):
+    """
+    Coarse-to-fine deepfake sampling.
+
+    Scores a sparse grid every `coarse_interval_sec` plus one frame just before
+    the end (the video length comes from the frame count, else ffprobe, else
+    the last timestamp that still decodes), then repeatedly bisects the
+    widest interval weighted by how close its endpoints are to the 0.5 threshold
+    (within `margin`) or how much they differ (by at least `jump`), until
+    `frames_per_min` frames per minute of video have been scored or no interval is
+    wider than 2 * `min_gap_sec`.
+
+    Returns:
+        dict with
+          - "frames":   [{"time", "label", "score", "path"}] sorted by time
+          - "timeline": columnar per-interval view between consecutive samples:
+                        {"start", "end", "score_min", "score_max", "confidence"}
+                        where confidence = 2 * min distance of the endpoint scores
+                        from 0.5 (0 = undecided, 1 = certain)
+          - "budget":   frame budget for the window
+    """
+    empty = {"frames": [], "timeline": {"start": [], "end": [], "score_min": [], "score_max": [],
+                                        "confidence": []}, "budget": 0}
+    vidcap = cv2.VideoCapture(video_path)
+    if not vidcap.isOpened():
+        print(f"[deepfake.sample_frames_adaptive] Failed to open video: {video_path}")
+        return empty
+
+    fps = vidcap.get(cv2.CAP_PROP_FPS) or 0
+    n_frames = vidcap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+    duration = n_frames / fps if fps > 0 and n_frames > 0 else 0.0
+    if duration <= 0:
+        # WebM / streamed MP4 often report no frame count; ask the container
+        from services.long_media import probe_duration   # (long_media imports this module)
+        duration = probe_duration(video_path)
+    end = (duration if end_sec is None else min(end_sec, duration)) if duration > 0 else end_sec
+    if end is not None and end <= start_sec:
+        vidcap.release()
+        return empty
+
+    os.makedirs(output_dir, exist_ok=True)
+    samples = {}
+
+    def read_at(t):
+        vidcap.set(cv2.CAP_PROP_POS_MSEC, t * 1000.0)
+        success, image = vidcap.read()
+        return image if success else None
+
+    def score_at(t):
+        image = read_at(t)
+        if image is None:
+            return None
+        path = f"{output_dir}/frame{first_index + len(samples)}.jpg"
+        cv2.imwrite(path, image)
+        label, score = predict_frame(image)
+        samples[t] = (label, score, path)
+        return score
+
+    step = max(coarse_interval_sec, 1e-3)
+    if end is None:
+        # length still unknown: walk the coarse grid until frames stop decoding
+        coarse, t = [], float(start_sec)
+        while score_at(round(t, 3)) is not None:
+            coarse.append(t)
+            t += step
+        if not samples:
+            vidcap.release()
+            return empty
+        # frames stop between the last decoded grid point and `t`: bisect to the
+        # last decodable timestamp (within half a second) and end there
+        good, bad = coarse[-1], t
+        while bad - good > 0.5:
+            mid = (good + bad) / 2.0
+            if read_at(mid) is None:
+                bad = mid
+            else:
+                good = mid
+        end = round(good, 3)
+    else:
+        coarse = np.arange(start_sec, end, step).tolist()
+        for t in coarse:
+            score_at(round(float(t), 3))
+    # the stretch after the last coarse point is covered by a sample just before `end`
+    tail = round(end - min(0.5, min_gap_sec / 2.0), 3)
+    if samples and tail - max(samples) >= 2 * min_gap_sec and score_at(tail) is not None:
+        coarse.append(tail)
+    budget = max(len(coarse), int(np.ceil(frames_per_min * (end - start_sec) / 60.0)))
+
+    heap = []
+    def push(a, b):
+        if b - a < 2 * min_gap_sec:
+            return
+        pri = _interval_priority(samples[a][1], samples[b][1], b - a, margin, jump)
+        heapq.heappush(heap, (-pri, a, b))
+
+    times = sorted(samples)
+    for a, b in zip(times, times[1:]):
+        push(a, b)
+    while heap and len(samples) < budget:
+        _, a, b = heapq.heappop(heap)
+        mid = round((a + b) / 2.0, 3)
+        if score_at(mid) is None:
+            continue
+        push(a, mid)
+        push(mid, b)
+    vidcap.release()
+
+    times = sorted(samples)
+    frames = [{"time": t, "label": samples[t][0], "score": samples[t][1], "path": samples[t][2]} for t in times]
+    scores = np.array([samples[t][1] for t in times], dtype=np.float64)
+    bounds = np.array(times + [end], dtype=np.float64)
+    nxt = np.append(scores[1:], scores[-1:]) if len(scores) else scores
+    dist = np.minimum(np.abs(scores - 0.5), np.abs(nxt - 0.5))
+    timeline = {
+        "start": np.round(bounds[:-1], 3).tolist(),
+        "end": np.round(bounds[1:], 3).tolist(),
+        "score_min": np.round(np.minimum(scores, nxt), 4).tolist(),
+        "score_max": np.round(np.maximum(scores, nxt), 4).tolist(),
+        "confidence": np.round(2.0 * dist, 4).tolist(),
+    }
+    print(f"[deepfake.sample_frames_adaptive] Scored {len(frames)} frames "
+          f"({len(coarse)} coarse, budget {budget}).")
+    return {"frames": frames, "timeline": timeline, "budget": budget}
+
 def face_detection_enabled() -> bool:
     return FACE_DETECT_AVAILABLE
\ No newline at end of file
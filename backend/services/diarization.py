@@ -0,0 +1,310 @@
+"""
+Lightweight speaker diarization, CPU only, no model download.
+
+MFCCs are computed in vectorized NumPy over 10 ms frames, an energy VAD keeps
+voiced frames, and every short window (DIARIZE_WINDOW_SEC, DIARIZE_HOP_SEC) is
+embedded as the mean + std of its mean-normalized MFCCs. Windows are clustered
+(average-linkage cosine tree, cut with the best silhouette, at most
+DIARIZE_MAX_SPEAKERS) and each transcript segment takes the majority speaker of
+the windows inside it.
+
+Embeddings are cached per content hash of the audio, so re-analysing the same
+recording only re-runs the (cheap) clustering. Cost is a few seconds per hour
+of audio on one CPU core (real-time factor ~0.001, cached ~0.0002); see
+testing/benchmark_diarization.py.
+"""
+import glob
+import hashlib
+import os
+import wave
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.fft import dct
+from sklearn.metrics import silhouette_score
+
+from services.encoding import SENTIMENT_LABELS
+
+
+# ---- Knobs ----
+DIARIZATION  = os.getenv("DIARIZATION", "0") == "1"                 # default of ?diarize=
+MAX_SPEAKERS = int(os.getenv("DIARIZE_MAX_SPEAKERS", "8"))
+MIN_SILHOUETTE = float(os.getenv("DIARIZE_MIN_SILHOUETTE", "0.2"))  # weaker splits = one speaker
+WINDOW_SEC   = float(os.getenv("DIARIZE_WINDOW_SEC", "1.5"))        # embedding window
+HOP_SEC      = float(os.getenv("DIARIZE_HOP_SEC", "0.75"))
+MIN_SHARE    = float(os.getenv("DIARIZE_MIN_SHARE", "0.03"))        # smaller clusters fold into the nearest
+CACHE_DIR    = os.getenv("DIARIZE_CACHE_DIR", os.path.join("temp", "diarization"))
+CACHE_FILES  = int(os.getenv("DIARIZE_CACHE_FILES", "1000"))        # newest kept (0 = no cache)
+
+SAMPLE_RATE  = 16000
+_FRAME, _HOP, _NFFT, _N_MELS, _N_MFCC = 400, 160, 512, 40, 20       # 25 ms / 10 ms frames
+_BLOCK       = 60 * SAMPLE_RATE                                     # samples per MFCC block
+_MAX_LINKAGE = 2000    # windows clustered exactly; beyond that a sample is, and the rest assigned
+
+
+# ---- Audio ----
+def _pcm_blocks(path: str) -> Iterator[np.ndarray]:
+    """16 kHz mono float32 in ~60 s blocks: 16k mono WAVs directly, anything else through PyAV."""
+    try:
+        with wave.open(path, "rb") as w:
+            if (w.getframerate(), w.getnchannels(), w.getsampwidth()) == (SAMPLE_RATE, 1, 2):
+                while True:
+                    raw = w.readframes(_BLOCK)
+                    if not raw:
+                        return
+                    yield np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+                return
+    except (wave.Error, EOFError):
+        pass
+
+    import av
+    with av.open(path) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        buf: List[np.ndarray] = []
+        n = 0
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                pcm = out.to_ndarray().reshape(-1)
+                buf.append(pcm)
+                n += len(pcm)
+                if n >= _BLOCK:
+                    yield np.concatenate(buf).astype(np.float32) / 32768.0
+                    buf, n = [], 0
+        for out in resampler.resample(None):
+            buf.append(out.to_ndarray().reshape(-1))
+        if buf:
+            yield np.concatenate(buf).astype(np.float32) / 32768.0
+
+
+# ---- Features ----
+@lru_cache(maxsize=1)
+def _mel_filterbank() -> np.ndarray:
+    mel = lambda f: 2595.0 * np.log10(1.0 + f / 700.0)
+    hz = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+    edges = hz(np.linspace(mel(60.0), mel(7600.0), _N_MELS + 2))
+    bins = np.fft.rfftfreq(_NFFT, 1.0 / SAMPLE_RATE)
+    lo, mid, hi = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    fb = np.maximum(0.0, np.minimum((bins - lo) / (mid - lo), (hi - bins) / (hi - mid)))
+    return fb.astype(np.float32).T    # (n_fft/2+1, n_mels)
+
+def mfcc_frames(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(T, 19) MFCCs without c0 and (T,) log energy per 10 ms frame, block by block."""
+    window = np.hamming(_FRAME).astype(np.float32)
+    fb = _mel_filterbank()
+    feats, energy = [], []
+    tail = np.zeros(0, dtype=np.float32)
+    for block in _pcm_blocks(path):
+        x = np.concatenate([tail, block])
+        if len(x) < _FRAME:
+            tail = x
+            continue
+        n = 1 + (len(x) - _FRAME) // _HOP
+        frames = np.lib.stride_tricks.sliding_window_view(x, _FRAME)[::_HOP][:n]
+        tail = x[n * _HOP:]
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        energy.append(np.log((frames ** 2).sum(axis=1) + 1e-8))
+        emph = np.concatenate([frames[:, :1], frames[:, 1:] - 0.97 * frames[:, :-1]], axis=1)
+        power = np.abs(np.fft.rfft(emph * window, _NFFT)) ** 2
+        logmel = np.log(power.astype(np.float32) @ fb + 1e-8)
+        feats.append(dct(logmel, type=2, norm="ortho", axis=1)[:, 1:_N_MFCC].astype(np.float32))
+    if not feats:
+        return np.zeros((0, _N_MFCC - 1), dtype=np.float32), np.zeros(0, dtype=np.float32)
+    return np.concatenate(feats), np.concatenate(energy)
+
+def window_embeddings(feats: np.ndarray, energy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Window centers (s) and raw embeddings (mean + std of the voiced MFCCs) of
+    every mostly-voiced window. `_normalize` is applied at clustering time, over
+    all windows of the recording (also across long-media windows).
+    """
+    win = max(1, int(round(WINDOW_SEC * SAMPLE_RATE / _HOP)))
+    hop = max(1, int(round(HOP_SEC * SAMPLE_RATE / _HOP)))
+    if len(feats) < win:
+        return np.zeros(0, dtype=np.float32), np.zeros((0, 2 * feats.shape[1]), dtype=np.float32)
+
+    # energy VAD: within ~22 dB of the loud frames and clearly above the noise floor
+    lo, hi = np.percentile(energy, [10, 95])
+    voiced = (energy > max(hi - 5.0, lo + 1.0)).astype(np.float64)
+    feats = feats.astype(np.float64)
+
+    # windowed sums of voiced frames via cumulative sums: O(T) for all windows at once
+    zero = np.zeros((1, feats.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(feats * voiced[:, None], axis=0)])
+    cs2 = np.concatenate([zero, np.cumsum(feats ** 2 * voiced[:, None], axis=0)])
+    cn = np.concatenate([[0.0], np.cumsum(voiced)])
+    starts = np.arange(0, len(feats) - win + 1, hop)
+    ends = starts + win
+    n = cn[ends] - cn[starts]
+    keep = n >= 0.5 * win
+    starts, ends, n = starts[keep], ends[keep], n[keep][:, None]
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros((0, 2 * feats.shape[1]), dtype=np.float32)
+    mean = (cs[ends] - cs[starts]) / n
+    std = np.sqrt(np.maximum((cs2[ends] - cs2[starts]) / n - mean ** 2, 0.0))
+    centers = (starts + ends) / 2.0 * _HOP / SAMPLE_RATE
+    return centers.astype(np.float32), np.hstack([mean, std]).astype(np.float32)
+
+
+# ---- Cache ----
+def _cache_path(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(f"{WINDOW_SEC}:{HOP_SEC}".encode())
+    return os.path.join(CACHE_DIR, f"{h.hexdigest()[:32]}.npz")
+
+def embeddings(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Window centers + embeddings of an audio file, cached by content hash."""
+    cache = _cache_path(path) if CACHE_FILES > 0 else None
+    if cache and os.path.exists(cache):
+        with np.load(cache) as z:
+            return z["centers"], z["emb"].astype(np.float32)
+    centers, emb = window_embeddings(*mfcc_frames(path))
+    # float16 precision, as stored in the cache: a cached run must cluster the
+    # same numbers as the cold run, or labels can change between runs
+    emb = emb.astype(np.float16).astype(np.float32)
+    if cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = cache + ".tmp.npz"
+        np.savez_compressed(tmp, centers=centers, emb=emb.astype(np.float16))   # exact after the rounding
+        os.replace(tmp, cache)
+        _prune_cache()
+    return centers, emb
+
+def _prune_cache() -> None:
+    files = glob.glob(os.path.join(CACHE_DIR, "*.npz"))
+    if len(files) > CACHE_FILES:
+        files.sort(key=os.path.getmtime)
+        for f in files[:len(files) - CACHE_FILES]:
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+
+
+# ---- Clustering ----
+def _normalize(emb: np.ndarray) -> np.ndarray:
+    """Standardize every dimension over the recording (this also removes the channel), unit length."""
+    x = (emb - emb.mean(axis=0)) / (emb.std(axis=0) + 1e-6)
+    return x / (np.linalg.norm(x, axis=1, keepdims=True) + 1e-9)
+
+def cluster(emb: np.ndarray) -> np.ndarray:
+    """
+    Speaker index per window (0 = most windows). Average-linkage cosine tree;
+    the cut with the best silhouette wins, or a single speaker when no cut
+    reaches MIN_SILHOUETTE. Clusters under MIN_SHARE fold into the nearest one.
+    """
+    n = len(emb)
+    if n < 4:
+        return np.zeros(n, dtype=np.int64)
+    x = _normalize(emb.astype(np.float64))
+    idx = np.linspace(0, n - 1, min(n, _MAX_LINKAGE)).astype(np.int64)
+    xs = x[idx]
+    Z = linkage(xs, method="average", metric="cosine")
+    dist = np.clip(1.0 - xs @ xs.T, 0.0, 2.0)
+    np.fill_diagonal(dist, 0.0)
+    best, best_score = np.ones(len(idx), dtype=np.int64), MIN_SILHOUETTE
+    for k in range(2, MAX_SPEAKERS + 1):
+        lab = fcluster(Z, t=k, criterion="maxclust")
+        ids, counts = np.unique(lab, return_counts=True)
+        big = ids[counts >= max(2, MIN_SHARE * len(idx))]
+        if len(big) < 2:
+            continue
+        # score the large clusters only: outlier windows should not decide k
+        keep = np.isin(lab, big)
+        score = silhouette_score(dist[np.ix_(keep, keep)], lab[keep], metric="precomputed")
+        if score > best_score:
+            best, best_score = np.where(keep, lab, 0), score
+    ids = np.unique(best[best > 0]) if (best > 0).any() else np.unique(best)
+    centroids = np.stack([xs[best == k].mean(axis=0) for k in ids])
+    labels = np.argmax(x @ centroids.T, axis=1)        # nearest centroid for every window
+    order = np.argsort(-np.bincount(labels, minlength=len(ids)), kind="stable")
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return remap[labels]
+
+def segment_speakers(transcript: Iterable[Dict[str, Any]], centers: np.ndarray,
+                     labels: np.ndarray) -> List[str]:
+    """
+    "Speaker N" per segment: the majority window cluster inside it (nearest
+    window when none is), numbered by first appearance. `centers` ascending.
+    """
+    names: Dict[int, str] = {}
+    out: List[str] = []
+    n_clusters = int(labels.max()) + 1 if len(labels) else 1
+    for seg in transcript:
+        c = 0
+        if len(centers):
+            a = np.searchsorted(centers, float(seg["start"]))
+            b = np.searchsorted(centers, float(seg["end"]), side="right")
+            if b > a:
+                c = int(np.argmax(np.bincount(labels[a:b], minlength=n_clusters)))
+            else:
+                mid = (float(seg["start"]) + float(seg["end"])) / 2.0
+                c = int(labels[np.argmin(np.abs(centers - mid))])
+        if c not in names:
+            names[c] = f"Speaker {len(names) + 1}"
+        out.append(names[c])
+    return out
+
+
+# ---- Public API ----
+def label_speakers(audio_path: str, transcript: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add "speaker" to every segment of `transcript` (in place); times refer to `audio_path`."""
+    if not transcript:
+        return transcript
+    centers, emb = embeddings(audio_path)
+    for seg, name in zip(transcript, segment_speakers(transcript, centers, cluster(emb))):
+        seg["speaker"] = name
+    return transcript
+
+def attribute(items: List[Dict[str, Any]], segments: List[Dict[str, Any]]) -> None:
+    """Give highlight items (with "start") the speaker of the segment they start in."""
+    starts = np.array([float(s["start"]) for s in segments])
+    if not len(starts):
+        return
+    for it in items:
+        if "start" in it:
+            i = max(0, int(np.searchsorted(starts, float(it["start"]), side="right")) - 1)
+            it["speaker"] = segments[i].get("speaker")
+
+
+def speaker_summary(transcript: List[Dict[str, Any]], probs: Optional[np.ndarray] = None,
+                    highlights: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Per-speaker talk time, segment count, sentiment (mean probabilities, label
+    counts and polarity from the (n, 3) `probs` of `analyze_sentiment_with_probs`)
+    and the actions/decisions whose source sentence they spoke.
+    """
+    speakers = [s.get("speaker") for s in transcript]
+    if not any(sp is not None for sp in speakers):
+        return []
+    names, inv = np.unique(np.array([str(sp) for sp in speakers], dtype=object), return_inverse=True)
+    dur = np.array([max(0.0, float(s["end"]) - float(s["start"])) for s in transcript])
+    talk = np.bincount(inv, weights=dur, minlength=len(names))
+    count = np.bincount(inv, minlength=len(names))
+    first = np.full(len(names), len(inv))
+    np.minimum.at(first, inv, np.arange(len(inv)))
+    total = talk.sum() or 1.0
+
+    out = []
+    for k in np.argsort(first, kind="stable"):
+        row: Dict[str, Any] = {"speaker": names[k], "segments": int(count[k]),
+                               "talk_sec": round(float(talk[k]), 2), "share": round(float(talk[k] / total), 4)}
+        if probs is not None and len(probs) == len(inv):
+            # mean probabilities + label counts, as in the bucket/turn timelines
+            mine = probs[inv == k]
+            p = mine.mean(axis=0)
+            row["mean_probs"] = {lab: round(float(v), 4) for lab, v in zip(SENTIMENT_LABELS, p)}
+            row["counts"] = {lab: int(v) for lab, v in
+                             zip(SENTIMENT_LABELS, np.bincount(mine.argmax(axis=1), minlength=len(SENTIMENT_LABELS)))}
+            row["polarity"] = round(float(p[2] - p[0]), 4)
+        if highlights:
+            row["actions"] = [a["text"] for a in highlights.get("actions", []) if a.get("speaker") == names[k]]
+            row["decisions"] = [d["text"] for d in highlights.get("decisions", []) if d.get("speaker") == names[k]]
+        out.append(row)
+    return out
@@ -0,0 +1,149 @@
+import gzip
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli  # type: ignore
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+# ---- Knobs ----
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))   # smaller bodies are sent as-is
+GZIP_LEVEL         = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY     = int(os.getenv("BROTLI_QUALITY", "5"))           # 4-6: near-gzip speed, smaller output
+
+# Same order as services.sentiment.labels (kept here so this module stays model-free)
+SENTIMENT_LABELS = ["negative", "neutral", "positive"]
+
+
+# ---- Compact (columnar) layout ----
+def compact_transcript(transcript: List[Dict[str, Any]],
+                       sentiment: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Transcript rows -> columns {"start", "end", "text"[, "speaker"]}. Per-segment
+    sentiment rows are merged in as "sentiment" (index into "labels") and "score".
+    """
+    cols: Dict[str, Any] = {
+        "start": [s["start"] for s in transcript],
+        "end": [s["end"] for s in transcript],
+        "text": [s["text"] for s in transcript],
+    }
+    if any("speaker" in s for s in transcript):
+        cols["speaker"] = [s.get("speaker") for s in transcript]
+    if sentiment is not None:
+        code = {lab: i for i, lab in enumerate(SENTIMENT_LABELS)}
+        cols["labels"] = SENTIMENT_LABELS
+        cols["sentiment"] = [code[r["sentiment"]] for r in sentiment]
+        cols["score"] = [r["score"] for r in sentiment]
+    return cols
+
+def compact_frames(frames: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """frame_details rows -> columns; image URLs are split into one shared prefix + file names."""
+    urls = [f["image_url"] for f in frames]
+    prefix = os.path.commonprefix(urls)
+    prefix = prefix[:prefix.rfind("/") + 1]
+    cols: Dict[str, Any] = {
+        "label": [f["label"] for f in frames],
+        "score": [f["score"] for f in frames],
+        "url_prefix": prefix,
+        "file": [u[len(prefix):] for u in urls],
+    }
+    if frames and all("time" in f for f in frames):
+        cols["time"] = [f["time"] for f in frames]
+    return cols
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    /analyze result -> "compact" layout: columnar transcript with the per-segment
+    sentiment merged in (the separate "sentiment" list is dropped; bucket/turn
+    reports are kept) and columnar frame_details.
+    """
+    out = dict(result)
+    out["format"] = "compact"
+    sentiment = result.get("sentiment")
+    per_segment = sentiment if isinstance(sentiment, list) else None
+    if isinstance(result.get("transcript"), list):
+        out["transcript"] = compact_transcript(result["transcript"], per_segment)
+        if per_segment is not None:
+            del out["sentiment"]
+    if isinstance(result.get("frame_details"), list):
+        out["frame_details"] = compact_frames(result["frame_details"])
+    return out
+
+
+# ---- Serialization + content negotiation ----
+def dumps(obj: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header (q=0 excludes), else None."""
+    offered = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name] = q
+    for enc in (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]:
+        if offered.get(enc, offered.get("*", 0.0)) > 0:
+            return enc
+    return None
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+def encoded_response(obj: Any, accept_encoding: str = "") -> Response:
+    """orjson-serialized JSON, br/gzip-compressed when the client accepts it."""
+    body = dumps(obj)
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=compress(body, encoding), media_type="application/json", headers=headers)
+
+def _compress_stream(chunks: Iterable[str], encoding: Optional[str]) -> Iterator[bytes]:
+    if encoding is None:
+        for chunk in chunks:
+            yield chunk.encode("utf-8")
+        return
+    if encoding == "br":
+        comp = brotli.Compressor(quality=BROTLI_QUALITY)
+        feed, finish = comp.process, comp.finish
+    else:
+        comp = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+        feed, finish = comp.compress, comp.flush
+    for chunk in chunks:
+        out = feed(chunk.encode("utf-8"))
+        if out:
+            yield out
+    yield finish()
+
+def encoded_stream(chunks: Iterable[str], accept_encoding: str = "") -> StreamingResponse:
+    """Streamed JSON text, compressed on the fly with the negotiated encoding."""
+    encoding = negotiate_encoding(accept_encoding)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(_compress_stream(chunks, encoding), media_type="application/json", headers=headers)
@@ -0,0 +1,284 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, NamedTuple
+
+
+# ---- Sentence splitting (cached) ----
+_SENT_BREAK    = re.compile(r"(?<=[.!?])\s+")
+_DIGIT         = re.compile(r"\d")
+
+def _clean(s: str) -> str:
+    return " ".join((s or "").split())
+
+@lru_cache(maxsize=16)
+def sentence_spans(text: str) -> Tuple[Tuple[int, int], ...]:
+    """(start, end) character spans of each non-empty sentence in `text`."""
+    spans: List[Tuple[int, int]] = []
+    try:
+        from nltk.tokenize import sent_tokenize
+        pos = 0
+        for s in sent_tokenize(text):
+            i = text.find(s, pos)
+            if i < 0:
+                raise ValueError("sentence not found in source text")
+            pos = i + len(s)
+            spans.append((i, pos))
+    except Exception:
+        spans, pos = [], 0
+        for m in _SENT_BREAK.finditer(text):
+            spans.append((pos, m.start()))
+            pos = m.end()
+        spans.append((pos, len(text)))
+    out: List[Tuple[int, int]] = []
+    for a, b in spans:
+        # trim surrounding whitespace so spans map 1:1 to stripped sentences
+        while a < b and text[a].isspace():
+            a += 1
+        while b > a and text[b - 1].isspace():
+            b -= 1
+        if a < b:
+            out.append((a, b))
+    return tuple(out)
+
+def split_sentences(text: str) -> List[str]:
+    return [text[a:b] for a, b in sentence_spans(text)]
+
+
+# ---- Transcript text with segment offsets ----
+class TranscriptText(NamedTuple):
+    text: str
+    offsets: List[int]     # char offset where each kept segment starts in `text`
+    starts: List[float]
+    ends: List[float]
+
+    def span_time(self, a: int, b: int) -> Tuple[float, float]:
+        """Source [start, end] seconds of the characters text[a:b]."""
+        if not self.offsets:
+            return 0.0, 0.0
+        i = max(0, bisect_right(self.offsets, a) - 1)
+        j = max(0, bisect_right(self.offsets, max(a, b - 1)) - 1)
+        return self.starts[i], self.ends[j]
+
+def transcript_text(transcript: List[Dict[str, Any]]) -> TranscriptText:
+    """
+    Join segment texts (whitespace-normalized) with single spaces, keeping
+    the offset of each segment so spans can be mapped back to timestamps.
+    """
+    parts: List[str] = []
+    offsets: List[int] = []
+    starts: List[float] = []
+    ends: List[float] = []
+    pos = 0
+    for seg in transcript or []:
+        t = _clean(str(seg.get("text", "")))
+        if not t:
+            continue
+        if parts:
+            pos += 1
+        offsets.append(pos)
+        starts.append(float(seg.get("start", 0.0)))
+        ends.append(float(seg.get("end", 0.0)))
+        parts.append(t)
+        pos += len(t)
+    return TranscriptText(" ".join(parts), offsets, starts, ends)
+
+
+# ---- Precompiled patterns ----
+FILLER_PREFIX = re.compile(r"^(?:\s*(?:um|uh|er|ah|so|well|and)[,.\s])+ ?", re.I)
+Q_PAT         = re.compile(r"\?\s*$")
+PLEASANTRY    = re.compile(r"\b(thank you|thanks|great|awesome|nice)\b", re.I)
+NUMBER_RE     = re.compile(r"\b\d[\d,]*(?:\.\d+)?%?\b|\b(RM|MYR|USD|EUR)\s?\d|\b€\s?\d|\$\s?\d", re.I)
+
+# Keyword vocabularies, one per tag. All of them are resolved together from a
+# single tokenization of each sentence (see `sentence_tags`).
+_VOCAB: Dict[str, Tuple[str, ...]] = {
+    # who: speaker/role words (AGENT_RE)
+    "agent": ("we", "you", "team", "designer", "engineer", "developer", "pm", "manager",
+              "marketing", "qa", "ops", "student", "presenter", "industrial designer",
+              "marketing executive"),
+    # what: commitment/task verbs (ACTION_RE)
+    "action": ("will", "need to", "should", "plan to", "try to", "please", "assign", "prepare",
+               "send", "email", "review", "update", "implement", "fix", "deploy", "test",
+               "analyze", "summarize", "document", "schedule", "share", "collect", "gather",
+               "design", "draft", "work on"),
+    # decisions (DECIDE_RE)
+    "decide": ("decide", "decided", "agree", "agreed", "finalize", "approve", "approved",
+               "choose", "adopt", "conclude", "concluded"),
+    "pleasantry": ("thank you", "thanks", "great", "awesome", "nice"),
+    # bullet ranking vocabularies
+    "bullet_action": ("update", "deliver", "send", "prepare", "review", "finalize", "test", "fix",
+                      "implement", "schedule", "align", "confirm", "approve", "assign",
+                      "follow up", "follow-up", "followup", "work on"),
+    "bullet_decision": ("decide", "decided", "agreement", "agreed", "approved", "finalize",
+                        "choose", "switch", "adopt"),
+}
+
+_WORD_RE = re.compile(r"\w+")
+
+def _build_keywords():
+    """Single words -> tags, and two-word phrases keyed by their first word."""
+    single: Dict[str, set] = {}
+    pairs: Dict[str, Dict[str, set]] = {}
+    for tag, words in _VOCAB.items():
+        for w in words:
+            toks = _WORD_RE.findall(w.lower())
+            if len(toks) == 1:
+                single.setdefault(toks[0], set()).add(tag)
+            else:
+                pairs.setdefault(toks[0], {}).setdefault(toks[1], set()).add(tag)
+    return ({k: frozenset(v) for k, v in single.items()},
+            {k: {k2: frozenset(v2) for k2, v2 in v.items()} for k, v in pairs.items()})
+
+_SINGLE_TAGS, _PAIR_TAGS = _build_keywords()
+_KEYWORDS = frozenset(_SINGLE_TAGS) | frozenset(_PAIR_TAGS)
+
+# Fact patterns, in output order. Each kind is matched independently, so a span
+# can count for two kinds ("$10%" is both "$10" and "10%"), as in the original scan.
+FACT_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("cur", re.compile(r"(?:€|\$|RM|MYR|USD|EUR)\s?\d[\d,]*(?:\.\d+)?", re.I)),
+    ("pct", re.compile(r"\b\d+(?:\.\d+)?\s*%")),
+    ("dur", re.compile(r"\b\d+\s*(?:seconds?|minutes?|hours?|hrs?|days?)\b", re.I)),
+    ("tme", re.compile(r"\b(?:[01]?\d|2[0-3]):[0-5]\d\b")),
+    ("dte", re.compile(r"\b\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?\b")),
+)
+FACT_KINDS = tuple(kind for kind, _ in FACT_PATTERNS)
+
+_ROLE_PREFIX   = re.compile(r"\b(as the|for the)\s+([a-z ]+?),\s*", re.I)
+_MODAL_PREFIX  = re.compile(r"\b(you|we)\s+(are\s+going\s+to|going\s+to|will|should|need\s+to)\s+", re.I)
+_WORKING_ON    = re.compile(r"\bto\s+be\s+working\s+on\b", re.I)
+_THOUSANDS     = re.compile(r"(\d),(?=\d{3}\b)")
+_CUR_CODE_SP   = re.compile(r"\b(MYR|USD|EUR|RM)\s+", re.I)
+_SYMBOL_SP     = re.compile(r"([€$])\s+")
+
+
+def sentence_tags(s: str) -> frozenset:
+    """
+    All keyword tags present in `s`. The sentence is tokenized once and every
+    vocabulary is resolved by set lookups, instead of one regex scan per vocabulary.
+    """
+    toks = _WORD_RE.findall(s.lower())
+    hits = _KEYWORDS.intersection(toks)
+    if not hits:
+        return frozenset()
+    found = set()
+    for t in hits:
+        found |= _SINGLE_TAGS.get(t, frozenset())
+    if not hits.isdisjoint(_PAIR_TAGS):
+        for t1, t2 in zip(toks, toks[1:]):
+            nxt = _PAIR_TAGS.get(t1)
+            if nxt and t2 in nxt:
+                found |= nxt[t2]
+    return frozenset(found)
+
+def norm_task_text(s: str) -> str:
+    s = FILLER_PREFIX.sub("", s or "").strip()
+    s = _ROLE_PREFIX.sub(lambda m: m.group(2).title() + " — ", s)
+    s = _MODAL_PREFIX.sub("", s)
+    s = _WORKING_ON.sub("work on", s)
+    return _clean(s)
+
+def _norm_fact(x: str) -> str:
+    y = _clean(x)
+    y = _THOUSANDS.sub(r"\1", y)
+    y = _CUR_CODE_SP.sub(r"\1 ", y)
+    return _SYMBOL_SP.sub(r"\1", y)
+
+
+# ---- Single-pass scan ----
+class Sentence(NamedTuple):
+    start: int           # char span in the scanned text
+    end: int
+    text: str            # whitespace-normalized sentence
+    tags: frozenset
+    facts: Tuple[Tuple[str, int, int, str], ...]   # (kind, a, b, raw match)
+
+@lru_cache(maxsize=8)
+def scan(text: str) -> Tuple[Sentence, ...]:
+    """
+    Split `text` once and evaluate every pattern on each sentence in one pass.
+    Cached by text, so the summarizer and the route share one scan per transcript.
+    """
+    out: List[Sentence] = []
+    for a, b in sentence_spans(text):
+        raw = text[a:b]
+        # every fact pattern needs a digit; skip the fact scans otherwise
+        facts = tuple(
+            (kind, a + m.start(), a + m.end(), m.group(0))
+            for kind, pattern in FACT_PATTERNS for m in pattern.finditer(raw)
+        ) if _DIGIT.search(raw) else ()
+        out.append(Sentence(a, b, _clean(raw), sentence_tags(raw), facts))
+    return tuple(out)
+
+def _dedupe(items: List[Dict[str, Any]], cap: int) -> List[Dict[str, Any]]:
+    seen = set(); out = []
+    if cap <= 0:
+        return out
+    for it in items:
+        k = it["text"].lower()
+        if k not in seen:
+            seen.add(k); out.append(it)
+        if len(out) >= cap:
+            break
+    return out
+
+def _collect(text: str, times=None, cap_act: int = 6, cap_dec: int = 4, cap_facts: int = 8):
+    def stamp(d: Dict[str, Any], a: int, b: int) -> Dict[str, Any]:
+        if times is not None:
+            d["start"], d["end"] = times.span_time(a, b)
+        return d
+
+    actions: List[Dict[str, Any]] = []
+    decisions: List[Dict[str, Any]] = []
+    facts_by_kind: Dict[str, List[Dict[str, Any]]] = {k: [] for k in FACT_KINDS}
+    for s in scan(text):
+        for kind, a, b, raw in s.facts:
+            facts_by_kind[kind].append(stamp({"text": _norm_fact(raw)}, a, b))
+        if not s.text or "pleasantry" in s.tags or Q_PAT.search(s.text):
+            continue
+        if "decide" in s.tags:
+            decisions.append(stamp({"text": s.text}, s.start, s.end))
+            continue
+        if "agent" in s.tags and "action" in s.tags:
+            actions.append(stamp({"text": norm_task_text(s.text)}, s.start, s.end))
+
+    # facts keep the original bucket order: currency, percent, duration, time, date
+    facts = [f for k in FACT_KINDS for f in facts_by_kind[k]]
+    return _dedupe(actions, cap_act), _dedupe(decisions, cap_dec), _dedupe(facts, cap_facts)
+
+
+# ---- Public API ----
+def extract_structure(transcript: List[Dict[str, Any]], cap_act: int = 6, cap_dec: int = 4,
+                      cap_facts: int = 8) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Actions, decisions and key facts from a transcript, each with the source
+    timestamps of the sentence/match they came from:
+      {"actions": [{"text", "start", "end"}], "decisions": [...], "facts": [...]}
+    """
+    tt = transcript_text(transcript)
+    actions, decisions, facts = _collect(tt.text, tt, cap_act, cap_dec, cap_facts)
+    return {"actions": actions, "decisions": decisions, "facts": facts}
+
+def extract_actions_decisions(raw_text: str, cap_act: int = 6, cap_dec: int = 4):
+    actions, decisions, _ = _collect(raw_text, None, cap_act, cap_dec, 0)
+    return [a["text"] for a in actions], [d["text"] for d in decisions]
+
+def extract_key_facts(raw_text: str, cap: int = 8) -> List[str]:
+    _, _, facts = _collect(raw_text, None, 0, 0, cap)
+    return [f["text"] for f in facts]
+
+def pick_bullets(paragraph: str, k: int = 6) -> List[str]:
+    def score(s: Sentence) -> float:
+        sc = 0.0
+        if "bullet_action" in s.tags: sc += 1.2
+        if "bullet_decision" in s.tags: sc += 1.0
+        if NUMBER_RE.search(s.text):  sc += 0.7
+        n = len(s.text.split())
+        if 10 <= n <= 28: sc += 0.5
+        return sc
+    sents: Dict[str, float] = {}
+    for s in scan(paragraph):
+        if len(s.text.split()) >= 6 and s.text not in sents:
+            sents[s.text] = score(s)
+    ranked = sorted(sents, key=lambda x: (-sents[x], -len(x)))
+    return ranked[:k]
@@ -0,0 +1,112 @@
+import contextvars
+import os
+import queue
+import threading
+import wave
+from typing import Any, Callable, Dict, Optional
+
+import av
+
+
+# ---- Knobs ----
+SINGLE_PASS       = os.getenv("SINGLE_PASS_DEMUX", "1") == "1"
+AUDIO_QUEUE_SIZE  = int(os.getenv("INGEST_AUDIO_QUEUE", "256"))   # PCM chunks (~20-60 ms each)
+FRAME_QUEUE_SIZE  = int(os.getenv("INGEST_FRAME_QUEUE", "4"))     # decoded BGR frames are large
+SAMPLE_RATE       = 16000
+
+_DONE = object()
+
+
+def _drain(q: "queue.Queue", handle: Callable[[Any], None], errors: list) -> None:
+    """Consumer loop: apply `handle` to items until the sentinel; keep draining after an error."""
+    while True:
+        item = q.get()
+        if item is _DONE:
+            return
+        if errors:
+            continue
+        try:
+            handle(item)
+        except Exception as e:  # surfaced by demux() once the producer is done
+            errors.append(e)
+
+def demux(file_path: str, wav_path: str, frame_interval_sec: float = 30,
+          on_frame: Optional[Callable[[float, int, Any], None]] = None) -> Dict[str, Any]:
+    """
+    Decode a media container once and fan it out:
+      - audio is resampled to 16 kHz mono s16 PCM and streamed into `wav_path`
+      - if `on_frame` is given, one video frame every `frame_interval_sec` seconds is
+        passed as on_frame(time_sec, index, bgr_ndarray)
+
+    Both consumers run in their own threads behind bounded queues, so decoding,
+    WAV writing and frame scoring overlap while memory stays bounded. Works for
+    MP4/AVI/MOV and the WebM produced by the in-browser recorder.
+
+    Returns: {"duration": seconds of audio written, "frames": frames delivered}
+    Raises:  av.AVError for unreadable input, or the first consumer exception.
+    """
+    container = av.open(file_path)
+    try:
+        audio = container.streams.audio[0] if container.streams.audio else None
+        video = container.streams.video[0] if (on_frame and container.streams.video) else None
+        if audio is None:
+            raise ValueError("No audio stream found.")
+        streams = [s for s in (audio, video) if s is not None]
+        if video is not None:
+            video.thread_type = "AUTO"
+
+        errors: list = []
+        audio_q: "queue.Queue" = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+        frame_q: "queue.Queue" = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+        written = {"samples": 0}
+
+        wav = wave.open(wav_path, "wb")
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+
+        def write_pcm(pcm: bytes) -> None:
+            wav.writeframes(pcm)
+            written["samples"] += len(pcm) // 2
+
+        # consumers run in the caller's context (e.g. a profiled request labels their model calls)
+        workers = [threading.Thread(target=contextvars.copy_context().run,
+                                    args=(_drain, audio_q, write_pcm, errors), daemon=True)]
+        if video is not None:
+            workers.append(threading.Thread(target=contextvars.copy_context().run,
+                                            args=(_drain, frame_q, lambda it: on_frame(*it), errors), daemon=True))
+        for w in workers:
+            w.start()
+
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        next_t = 0.0
+        n_frames = 0
+        try:
+            for packet in container.demux(*streams):
+                if errors:
+                    break
+                for frame in packet.decode():
+                    if packet.stream is audio:
+                        for out in resampler.resample(frame):
+                            audio_q.put(out.to_ndarray().tobytes())
+                    else:
+                        t = frame.time if frame.time is not None else n_frames * frame_interval_sec
+                        if t + 1e-6 >= next_t:
+                            frame_q.put((float(t), n_frames, frame.to_ndarray(format="bgr24")))
+                            n_frames += 1
+                            next_t += frame_interval_sec
+                            while next_t <= t:
+                                next_t += frame_interval_sec
+            for out in resampler.resample(None):
+                audio_q.put(out.to_ndarray().tobytes())
+        finally:
+            audio_q.put(_DONE)
+            frame_q.put(_DONE)
+            for w in workers:
+                w.join()
+            wav.close()
+        if errors:
+            raise errors[0]
+        return {"duration": written["samples"] / SAMPLE_RATE, "frames": n_frames}
+    finally:
+        container.close()
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+
+# ---- Knobs ----
+JOBS_DIR    = os.getenv("JOBS_DIR", os.path.join("temp", "jobs"))
+JOBS_DB     = os.getenv("JOBS_DB", os.path.join(JOBS_DIR, "jobs.db"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))    # long-media jobs analyzed at the same time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    filename    TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    options     TEXT NOT NULL,
+    status      TEXT NOT NULL,          -- running | done | failed
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    job_id   TEXT NOT NULL,
+    stage    TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    payload  TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage, key)
+);
+"""
+
+
+def file_sha256(path: str, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def job_id_for(content_hash: str, options: Dict[str, Any]) -> str:
+    """Stable job id: same file + same processing options -> same job."""
+    key = content_hash + json.dumps(options, sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+class JobStore:
+    """SQLite-backed job registry and stage checkpoints (one connection per call)."""
+
+    def __init__(self, db_path: str = JOBS_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.db_path, timeout=30)
+        con.row_factory = sqlite3.Row
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    # ---- Jobs ----
+    def upsert_job(self, job_id: str, filename: str, source_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "INSERT INTO jobs (id, filename, source_path, options, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'running', ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET options=excluded.options, status='running', error=NULL, "
+                "updated_at=excluded.updated_at",
+                (job_id, filename, source_path, json.dumps(options), now, now),
+            )
+        return self.get_job(job_id)
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with closing(self._connect()) as con, con:
+            con.execute("UPDATE jobs SET status=?, error=?, updated_at=? WHERE id=?",
+                        (status, error, time.time(), job_id))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as con:
+            row = con.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job["options"] = json.loads(job["options"])
+            job["checkpoints"] = {
+                r["stage"]: r["n"] for r in con.execute(
+                    "SELECT stage, COUNT(*) AS n FROM checkpoints WHERE job_id=? GROUP BY stage", (job_id,))
+            }
+        return job
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT id, filename, status, error, created_at, updated_at FROM jobs"
+        args: tuple = ()
+        if status:
+            sql += " WHERE status=?"
+            args = (status,)
+        with closing(self._connect()) as con:
+            return [dict(r) for r in con.execute(sql + " ORDER BY updated_at DESC", args)]
+
+    def delete_checkpoints(self, job_id: str) -> None:
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM checkpoints WHERE job_id=?", (job_id,))
+
+    # ---- Checkpoints ----
+    def put(self, job_id: str, stage: str, key: str, payload: Any) -> None:
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, stage, key, payload, saved_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, stage, key, json.dumps(payload), time.time()),
+            )
+
+    def stage(self, job_id: str, stage: str) -> Dict[str, Any]:
+        with closing(self._connect()) as con:
+            return {
+                r["key"]: json.loads(r["payload"]) for r in con.execute(
+                    "SELECT key, payload FROM checkpoints WHERE job_id=? AND stage=?", (job_id, stage))
+            }
+
+
+class Checkpoints:
+    """
+    Stage checkpoints of one job, cached in memory and written through to SQLite.
+    `done(stage, key)` returns the saved payload (or None) so a resumed run can skip
+    finished work; `commit` records a finished unit of work.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._cache: Dict[str, Dict[str, Any]] = {}
+
+    def _stage(self, stage: str) -> Dict[str, Any]:
+        if stage not in self._cache:
+            self._cache[stage] = self.store.stage(self.job_id, stage)
+        return self._cache[stage]
+
+    def done(self, stage: str, key: Any) -> Optional[Any]:
+        return self._stage(stage).get(str(key))
+
+    def commit(self, stage: str, key: Any, payload: Any) -> None:
+        self.store.put(self.job_id, stage, str(key), payload)
+        self._stage(stage)[str(key)] = payload
+
+    def all(self, stage: str) -> Dict[str, Any]:
+        return dict(self._stage(stage))
+
+
+# Jobs currently executing in this process. A job whose DB status is "running"
+# but that is not listed here was interrupted (e.g. a restart) and can be resumed.
+_active = set()
+_active_lock = threading.Lock()
+
+def claim(job_id: str) -> bool:
+    with _active_lock:
+        if job_id in _active:
+            return False
+        _active.add(job_id)
+        return True
+
+def release(job_id: str) -> None:
+    with _active_lock:
+        _active.discard(job_id)
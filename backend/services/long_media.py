@@ -0,0 +1,475 @@
+import gc
+import json
+import os
+import shutil
+import wave
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import ffmpeg
+import numpy as np
+
+from services.transcriber import transcribe_audio
+from services.summarizer import ENABLE_STRUCT, compose_summary, summarize_partials
+from services.sentiment import aggregate_sentiment, analyze_sentiment_with_probs
+from services.extraction import extract_structure, transcript_text
+from services.deepfake import extract_frames, predict_image, sample_frames_adaptive
+from services.search import SearchIndex
+from services.encoding import SENTIMENT_LABELS, compact_frames
+from services.diarization import attribute, cluster, embeddings, segment_speakers, speaker_summary
+
+
+# ---- Knobs ----
+WINDOW_SEC       = float(os.getenv("LONG_MEDIA_WINDOW_SEC", "600"))   # rolling window length
+MIN_DURATION_SEC = float(os.getenv("LONG_MEDIA_MIN_SEC", "1800"))     # auto-enable threshold
+_STREAM_BATCH    = 500                                                # items per streamed chunk
+_CAPS            = {"actions": 6, "decisions": 4, "facts": 8}
+
+
+def probe_duration(path: str) -> float:
+    """Container duration in seconds (0.0 if ffprobe cannot tell; see `LongMediaAnalysis.run`)."""
+    try:
+        return float(ffmpeg.probe(path)["format"]["duration"])
+    except Exception:
+        return 0.0
+
+
+class SpillLog:
+    """
+    Append-only JSON-lines file; iterating reads it back lazily, one item at a time.
+    The byte offset of every item is kept, so read_range seeks instead of rescanning.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets = array("q")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                pos = 0
+                for line in f:
+                    if line.strip():
+                        self.offsets.append(pos)
+                    pos += len(line)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        with open(self.path, "ab") as f:
+            pos = f.tell()
+            for item in items:
+                line = (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                self.offsets.append(pos)
+                pos += len(line)
+
+    def __iter__(self) -> Iterator[Any]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def read_range(self, lo: int, hi: int) -> List[Any]:
+        lo, hi = max(lo, 0), min(hi, len(self.offsets))
+        if lo >= hi:
+            return []
+        out: List[Any] = []
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[lo])
+            for line in f:
+                if line.strip():
+                    out.append(json.loads(line))
+                    if len(out) >= hi - lo:
+                        break
+        return out
+
+    def truncate(self, n: int) -> None:
+        """Drop everything after the first `n` items (uncommitted work of an interrupted run)."""
+        if n >= len(self.offsets):
+            return
+        os.truncate(self.path, self.offsets[n])
+        del self.offsets[n:]
+
+
+def _wav_seconds(path: str) -> float:
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, EOFError, OSError):
+        return 0.0
+
+def _json_array(items: Iterable[Any]) -> Iterator[str]:
+    """Stream a JSON array in batches without materializing the list."""
+    yield "["
+    buf: List[str] = []
+    first = True
+    for item in items:
+        buf.append(json.dumps(item, ensure_ascii=False))
+        if len(buf) >= _STREAM_BATCH:
+            yield ("" if first else ",") + ",".join(buf)
+            first = False
+            buf = []
+    if buf:
+        yield ("" if first else ",") + ",".join(buf)
+    yield "]"
+
+
+class LongMediaAnalysis:
+    """
+    Memory-bounded analysis of a long recording.
+
+    The file is processed in rolling windows of `window_sec` seconds (until the
+    probed duration, or, when ffprobe cannot read it, until a window decodes to
+    less than `window_sec` of audio): each window's
+    audio is cut to its own small WAV, transcribed, scored and summarized (first pass),
+    frames inside the window are checked, and every per-window result is appended to
+    an on-disk log in `work_dir`. Buffers are dropped after each window, so peak memory
+    depends on the window length, not the meeting length. The final response is
+    streamed back from the logs by `iter_json`.
+
+    With `diarize`, the asr stage also logs speaker embeddings of the window;
+    all windows are clustered together at assembly, so speaker labels are
+    consistent across the whole recording.
+
+    With `checkpoints` (services.jobs.Checkpoints), every finished stage of every
+    window (frames, asr, sentiment, summary, highlights) is committed together with
+    the log ranges it wrote. A new run on the same `work_dir` truncates the logs to
+    the committed state and skips finished stages.
+    """
+
+    def __init__(self, file_path: str, work_dir: str, is_video: bool,
+                 frame_dir: Optional[str] = None, frame_url: str = "",
+                 window_sec: float = WINDOW_SEC, frame_interval_sec: float = 30,
+                 frame_sampling: str = "grid", checkpoints=None, diarize: bool = False):
+        self.file_path = file_path
+        self.work_dir = work_dir
+        self.is_video = is_video
+        self.frame_dir = frame_dir
+        self.frame_url = frame_url.rstrip("/")
+        self.window_sec = float(window_sec)
+        self.frame_interval_sec = frame_interval_sec
+        self.frame_sampling = frame_sampling
+        self.checkpoints = checkpoints
+        self.diarize = diarize
+        self.duration = probe_duration(file_path)
+
+        os.makedirs(work_dir, exist_ok=True)
+        self.transcript = SpillLog(os.path.join(work_dir, "transcript.jsonl"))
+        self.sentiment = SpillLog(os.path.join(work_dir, "sentiment.jsonl"))
+        self.probs = SpillLog(os.path.join(work_dir, "probs.jsonl"))        # [start, end, p_neg, p_neu, p_pos]
+        self.frames = SpillLog(os.path.join(work_dir, "frames.jsonl"))
+        self.frame_timeline = SpillLog(os.path.join(work_dir, "frame_timeline.jsonl"))
+        self.partials = SpillLog(os.path.join(work_dir, "partials.jsonl"))
+        self.highlights = SpillLog(os.path.join(work_dir, "highlights.jsonl"))  # {"kind": ..., **item}
+        self.voices = SpillLog(os.path.join(work_dir, "voices.jsonl"))            # [center_sec, *embedding]
+        self.fake_frames = 0
+        self.windows = 0
+        self.resumed_windows = 0
+        self._summary: Optional[str] = None
+        self._speakers: Optional[List[str]] = None
+
+    # ---- Processing ----
+    _LOGS = ("transcript", "sentiment", "probs", "frames", "frame_timeline", "partials", "highlights", "voices")
+    _STAGES = ("frames", "asr", "sentiment", "summary", "highlights")
+
+    def run(self) -> "LongMediaAnalysis":
+        known = self.duration > 0
+        if not known:
+            print(f"[long_media] duration of {self.file_path} unknown; reading windows until the audio ends")
+        n = max(1, int(np.ceil(self.duration / self.window_sec))) if known else None
+        self._restore()
+        w = 0
+        while n is None or w < n:
+            t0 = w * self.window_sec
+            stages = self._STAGES if (self.is_video and self.frame_dir) else self._STAGES[1:]
+            if all(self._done(st, w) is not None for st in stages):
+                self.resumed_windows += 1
+                asr = self._done("asr", w)
+            else:
+                asr = self._process_window(w, t0, t0 + self.window_sec)
+            self.windows += 1
+            gc.collect()
+            if not known:
+                # a short (or empty) window is the end of the recording
+                audio_sec = float(asr.get("audio_sec", self.window_sec))
+                if audio_sec < self.window_sec - 1.0:
+                    self.duration = t0 + audio_sec
+                    break
+            w += 1
+        return self
+
+    def _done(self, stage: str, w: int):
+        return self.checkpoints.done(stage, w) if self.checkpoints is not None else None
+
+    def _restore(self) -> None:
+        """Roll every log back to the end of its last committed range."""
+        if self.checkpoints is None:
+            return
+        keep = {name: 0 for name in self._LOGS}
+        for stage in self._STAGES:
+            for payload in self.checkpoints.all(stage).values():
+                for name, (_, hi) in payload["logs"].items():
+                    keep[name] = max(keep[name], hi)
+                self.fake_frames += payload.get("fake", 0)
+        for name, n in keep.items():
+            getattr(self, name).truncate(n)
+
+    def _stage(self, stage: str, w: int, logs, work) -> Dict[str, Any]:
+        """Run `work` unless (stage, w) is checkpointed; commit the log ranges it appended."""
+        saved = self._done(stage, w)
+        if saved is not None:
+            return saved
+        before = {name: len(getattr(self, name)) for name in logs}
+        extra = work() or {}
+        payload = {**extra, "logs": {name: [before[name], len(getattr(self, name))] for name in logs}}
+        if self.checkpoints is not None:
+            self.checkpoints.commit(stage, w, payload)
+        return payload
+
+    def _process_window(self, w: int, t0: float, t1: float) -> Dict[str, Any]:
+        """Run the unfinished stages of window `w`; returns the asr checkpoint payload."""
+        if self.is_video and self.frame_dir:
+            def frames():
+                fake_before = self.fake_frames
+                self._frames_window(t0, t1)
+                return {"fake": self.fake_frames - fake_before}
+            self._stage("frames", w, ("frames", "frame_timeline"), frames)
+
+        def asr():
+            wav = os.path.join(self.work_dir, f"window{w}.wav")
+            try:
+                (
+                    ffmpeg
+                    .input(self.file_path, ss=t0, t=t1 - t0)
+                    .output(wav, ac=1, ar=16000)
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
+                audio_sec = _wav_seconds(wav)
+                segments = transcribe_audio(wav) if audio_sec > 0 else []
+                if self.diarize and segments:
+                    centers, emb = embeddings(wav)
+                    self.voices.extend([round(float(c) + t0, 2), *np.round(e.astype(float), 4).tolist()]
+                                       for c, e in zip(centers, emb))
+            finally:
+                if os.path.exists(wav):
+                    os.remove(wav)
+            for seg in segments:
+                seg["start"] = round(seg["start"] + t0, 2)
+                seg["end"] = round(seg["end"] + t0, 2)
+            self.transcript.extend(segments)
+            return {"until": t1, "audio_sec": round(audio_sec, 3)}
+        asr_payload = self._stage("asr", w, ("transcript", "voices"), asr)
+        lo, hi = asr_payload["logs"]["transcript"]
+        segments = self.transcript.read_range(lo, hi)
+
+        def sentiment():
+            rows, probs = analyze_sentiment_with_probs(segments)
+            self.sentiment.extend(rows)
+            self.probs.extend([s["start"], s["end"], *np.round(p.astype(float), 5).tolist()]
+                              for s, p in zip(segments, probs))
+        self._stage("sentiment", w, ("sentiment", "probs"), sentiment)
+
+        def summary():
+            text = transcript_text(segments).text
+            self.partials.extend(summarize_partials(text, final_if_single=False))
+        self._stage("summary", w, ("partials",), summary)
+
+        def highlights():
+            if ENABLE_STRUCT:
+                st = extract_structure(segments)
+                self.highlights.extend({"kind": kind, **item} for kind in _CAPS for item in st[kind])
+        self._stage("highlights", w, ("highlights",), highlights)
+        return asr_payload
+
+    def _frames_window(self, t0: float, t1: float) -> None:
+        if self.frame_sampling == "adaptive":
+            self._frames_window_adaptive(t0, t1)
+            return
+        paths = extract_frames(self.file_path, self.frame_dir, interval_sec=self.frame_interval_sec,
+                               start_sec=t0, end_sec=t1, first_index=len(self.frames))
+        results = []
+        for i, frame_path in enumerate(paths):
+            label, score = predict_image(frame_path)
+            if label == "Fake":
+                self.fake_frames += 1
+            results.append({
+                "label": label,
+                "score": round(score * 100, 1),
+                "time": round(t0 + i * self.frame_interval_sec, 2),
+                "image_url": f"{self.frame_url}/{os.path.basename(frame_path)}",
+            })
+        self.frames.extend(results)
+
+    def _frames_window_adaptive(self, t0: float, t1: float) -> None:
+        sampled = sample_frames_adaptive(self.file_path, self.frame_dir, start_sec=t0, end_sec=t1,
+                                         first_index=len(self.frames))
+        results = []
+        for fr in sampled["frames"]:
+            if fr["label"] == "Fake":
+                self.fake_frames += 1
+            results.append({
+                "label": fr["label"],
+                "score": round(fr["score"] * 100, 1),
+                "time": fr["time"],
+                "image_url": f"{self.frame_url}/{os.path.basename(fr['path'])}",
+            })
+        self.frames.extend(results)
+        tl = sampled["timeline"]
+        self.frame_timeline.extend(dict(zip(tl, row)) for row in zip(*tl.values()))
+
+    # ---- Assembly ----
+    def speakers(self) -> Optional[List[str]]:
+        """Speaker per transcript segment (None without `diarize`), clustered over all windows."""
+        if not self.diarize:
+            return None
+        if self._speakers is None:
+            rows = np.array(list(self.voices), dtype=np.float32)
+            centers = rows[:, 0] if len(rows) else np.zeros(0, dtype=np.float32)
+            labels = cluster(rows[:, 1:]) if len(rows) else np.zeros(0, dtype=np.int64)
+            self._speakers = segment_speakers(self.transcript, centers, labels)
+        return self._speakers
+
+    def _speaker_rows(self) -> List[Dict[str, Any]]:
+        """Light per-segment rows (start, end, speaker) for per-speaker stats."""
+        return [{"start": s["start"], "end": s["end"], "speaker": name}
+                for s, name in zip(self.transcript, self.speakers())]
+
+    def merged_highlights(self) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {k: [] for k in _CAPS}
+        seen = {k: set() for k in _CAPS}
+        for item in self.highlights:
+            kind = item.pop("kind")
+            key = item["text"].lower()
+            if len(out[kind]) < _CAPS[kind] and key not in seen[kind]:
+                seen[kind].add(key)
+                out[kind].append(item)
+        if self.diarize:
+            rows = self._speaker_rows()
+            for items in out.values():
+                attribute(items, rows)
+        return out
+
+    def summary(self, highlights: Dict[str, List[Dict[str, Any]]]) -> str:
+        if self._summary is not None:
+            return self._summary
+        saved = self._done("final", "summary")
+        if saved is not None:
+            self._summary = saved["text"]
+            return self._summary
+        partials = list(self.partials)
+        if not partials:
+            return "Executive Summary:\n• No transcript content available."
+        self._summary = compose_summary(partials, highlights["facts"])
+        if self.checkpoints is not None:
+            self.checkpoints.commit("final", "summary", {"text": self._summary})
+        return self._summary
+
+    def _sentiment_report(self, mode: str, bucket_sec: float, page_size: int, page: int = 0,
+                          meeting_id: Optional[str] = None) -> Dict[str, Any]:
+        rows = np.array(list(self.probs), dtype=np.float64).reshape(-1, 5)
+        meta = [{"start": a, "end": b} for a, b in rows[:, :2].tolist()]
+        if self.diarize:
+            # speaker changes start new turns in mode="turn"
+            for m, name in zip(meta, self.speakers()):
+                m["speaker"] = name
+        report = aggregate_sentiment(meta, rows[:, 2:], mode=mode, bucket_sec=bucket_sec)
+        lo = page * page_size
+        items = self.sentiment.read_range(lo, lo + page_size) if page_size > 0 else []
+        report["detail"] = {"page": page, "page_size": page_size, "total": len(meta), "items": items}
+        if meeting_id:
+            # also paged by GET /meetings/{meeting_id}/sentiment once the job is indexed
+            report["detail"]["meeting_id"] = meeting_id
+        return report
+
+    def _iter_compact_transcript(self, with_sentiment: bool) -> Iterator[str]:
+        """`services.encoding.compact_transcript` layout, streamed one column at a time."""
+        yield '{"start": '
+        yield from _json_array(s["start"] for s in self.transcript)
+        yield ', "end": '
+        yield from _json_array(s["end"] for s in self.transcript)
+        yield ', "text": '
+        yield from _json_array(s["text"] for s in self.transcript)
+        if self.diarize:
+            yield ', "speaker": '
+            yield from _json_array(self.speakers())
+        if with_sentiment:
+            code = {lab: i for i, lab in enumerate(SENTIMENT_LABELS)}
+            yield ', "labels": ' + json.dumps(SENTIMENT_LABELS)
+            yield ', "sentiment": '
+            yield from _json_array(code[r["sentiment"]] for r in self.sentiment)
+            yield ', "score": '
+            yield from _json_array(r["score"] for r in self.sentiment)
+        yield "}"
+
+    def iter_json(self, sentiment_mode: str = "segments", bucket_sec: float = 60.0,
+                  page_size: int = 200, page: int = 0,
+                  extra: Optional[Dict[str, Any]] = None, compact: bool = False) -> Iterator[str]:
+        """
+        Stream the same JSON object `/analyze` returns, reading lists back from the logs.
+        `extra` fields (e.g. the job id) are added to the top-level object.
+        compact=True streams the columnar layout of `services.encoding.compact_result`.
+        """
+        highlights = self.merged_highlights() if ENABLE_STRUCT else {"actions": [], "decisions": [], "facts": []}
+        head: Dict[str, Any] = {
+            "type": "video" if self.is_video else "audio",
+            "long_media": {"duration_sec": round(self.duration, 2), "window_sec": self.window_sec,
+                           "windows": self.windows, "resumed_windows": self.resumed_windows},
+            **(extra or {}),
+        }
+        if self.is_video:
+            head["frames_checked"] = len(self.frames)
+            head["fake_frames"] = self.fake_frames
+        head["summary"] = self.summary(highlights)
+        head["highlights"] = highlights
+        if self.diarize:
+            probs = np.array(list(self.probs), dtype=np.float64).reshape(-1, 5)[:, 2:]
+            head["speakers"] = speaker_summary(self._speaker_rows(), probs, highlights)
+        if compact:
+            head["format"] = "compact"
+
+        yield json.dumps(head, ensure_ascii=False)[:-1]
+        if self.is_video:
+            yield ', "frame_details": '
+            if compact:
+                yield json.dumps(compact_frames(list(self.frames)), ensure_ascii=False)
+            else:
+                yield from _json_array(self.frames)
+            if self.frame_sampling == "adaptive":
+                rows = list(self.frame_timeline)
+                keys = ("start", "end", "score_min", "score_max", "confidence")
+                yield ', "frame_timeline": ' + json.dumps({k: [r[k] for r in rows] for k in keys})
+        yield ', "transcript": '
+        if compact:
+            # per-segment sentiment is merged into the transcript columns
+            yield from self._iter_compact_transcript(sentiment_mode == "segments")
+        elif self.diarize:
+            yield from _json_array({**s, "speaker": name} for s, name in zip(self.transcript, self.speakers()))
+        else:
+            yield from _json_array(self.transcript)
+        if sentiment_mode == "segments":
+            if not compact:
+                yield ', "sentiment": '
+                yield from _json_array(self.sentiment)
+        else:
+            yield ', "sentiment": '
+            report = self._sentiment_report(sentiment_mode, bucket_sec, page_size, page,
+                                            meeting_id=(extra or {}).get("meeting_id"))
+            yield json.dumps(report, ensure_ascii=False)
+        yield "}"
+
+    def index(self, meeting_id: str, title: str = "") -> None:
+        """Add the finished analysis to the search index, streaming segments from the logs."""
+        highlights = self.merged_highlights() if ENABLE_STRUCT else {"actions": [], "decisions": [], "facts": []}
+        try:
+            SearchIndex().add_meeting(meeting_id, self.transcript, self.summary(highlights), highlights,
+                                      sentiment=self.sentiment, title=title,
+                                      media_type="video" if self.is_video else "audio",
+                                      duration_sec=round(self.duration, 2))
+        except Exception as e:
+            print(f"[search] indexing {meeting_id} failed: {e}")
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.work_dir, ignore_errors=True)
@@ -0,0 +1,162 @@
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+import ffmpeg
+
+from services.transcriber import transcribe_audio
+from services.summarizer import generate_summary, summary_highlights
+from services.sentiment import analyze_sentiment_with_probs, sentiment_payload
+from services.deepfake import extract_frames, predict_image, sample_frames_adaptive, score_frame
+from services.ingest import SINGLE_PASS, demux
+from services.search import SEARCH_INDEX, index_result
+from services.diarization import attribute, label_speakers, speaker_summary
+
+AUDIO_EXTS = ["mp3", "wav"]
+VIDEO_EXTS = ["mp4", "avi", "mov", "webm"]
+
+
+def with_speakers(result: Dict[str, Any], probs) -> Dict[str, Any]:
+    """Per-speaker summary and speakers on highlights, once segments carry "speaker"."""
+    transcript = result["transcript"]
+    if transcript and "speaker" in transcript[0]:
+        for items in result["highlights"].values():
+            attribute(items, transcript)
+        result["speakers"] = speaker_summary(transcript, probs, result["highlights"])
+    return result
+
+def _indexed(result: Dict[str, Any], rows, meeting_id: Optional[str], title: str) -> Dict[str, Any]:
+    if meeting_id and SEARCH_INDEX:
+        index_result(meeting_id, result, title=title, sentiment_rows=rows)
+        result["meeting_id"] = meeting_id
+        if isinstance(result["sentiment"], dict):
+            # detail pages are also served by GET /meetings/{meeting_id}/sentiment
+            result["sentiment"]["detail"]["meeting_id"] = meeting_id
+    return result
+
+def analyze_media(file_path: str, frame_dir: str, frame_url: str, work_dir: str = "temp",
+                  frame_sampling: str = "grid", sentiment_mode: str = "segments",
+                  bucket_sec: float = 60.0, page_size: int = 200, page: int = 0,
+                  meeting_id: Optional[str] = None, title: str = "", diarize: bool = False) -> Dict[str, Any]:
+    '''
+    Full analysis of one recording held in memory (the /analyze flow).
+    Shared by routes/analyze.py and the offline batch runner (batch.py).
+
+    Audio (mp3/wav): transcript + summary + highlights + sentiment.
+    Video (mp4/avi/mov/webm): additionally deepfake scores of sampled frames,
+    written to `frame_dir` and referenced as `<frame_url>/<name>.jpg`.
+
+    With `meeting_id` (and SEARCH_INDEX on) the finished result is added to the
+    full-text search index and the response carries "meeting_id". Bucket/turn
+    reports carry page `page` of the per-segment sentiment detail either way.
+
+    `diarize` labels every segment with a "speaker" (services.diarization) and
+    adds a per-speaker "speakers" summary (talk time, sentiment, actions).
+
+    Returns the response dict, or {"error": ...}. `file_path` is not removed.
+    '''
+    ext = file_path.rsplit(".", 1)[-1].lower()
+
+    # --- Audio flow ---
+    if ext in AUDIO_EXTS:
+        transcript = transcribe_audio(file_path)
+        if diarize:
+            label_speakers(file_path, transcript)
+        rows, probs = analyze_sentiment_with_probs(transcript)
+        result = {
+            "type": "audio",
+            "transcript": transcript,
+            "summary": generate_summary(transcript),
+            "highlights": summary_highlights(transcript),
+            "sentiment": sentiment_payload(transcript, sentiment_mode, bucket_sec, page=page, page_size=page_size, probs=probs)
+        }
+        return _indexed(with_speakers(result, probs), rows, meeting_id, title)
+
+    if ext not in VIDEO_EXTS:
+        return {"error": "Unsupported file type."}
+
+    # --- Video flow ---
+    os.makedirs(frame_dir, exist_ok=True)
+    os.makedirs(work_dir, exist_ok=True)
+    audio_path = os.path.join(work_dir, f"audio_{uuid.uuid4().hex}.wav")
+
+    frame_results = []
+    frame_timeline = None
+    fake_count = 0
+    demuxed = False
+
+    def add_frame(label, score, frame_path, time_sec=None):
+        nonlocal fake_count
+        if label == "Fake":
+            fake_count += 1
+        item = {
+            "label": label,
+            "score": round(score * 100, 1),
+            "image_url": f"{frame_url}/{os.path.basename(frame_path)}"
+        }
+        if time_sec is not None:
+            item["time"] = time_sec
+        frame_results.append(item)
+
+    if frame_sampling == "adaptive":
+        # Coarse grid, then refine around uncertain / changing scores
+        sampled = sample_frames_adaptive(file_path, frame_dir)
+        frame_timeline = sampled["timeline"]
+        for fr in sampled["frames"]:
+            add_frame(fr["label"], fr["score"], fr["path"], fr["time"])
+    elif SINGLE_PASS:
+        # One decode: 16k mono PCM -> audio_path, a frame every 30s -> deepfake scorer
+        def on_frame(time_sec, index, image):
+            frame_path, label, score = score_frame(image, frame_dir, index)
+            add_frame(label, score, frame_path, round(time_sec, 2))
+        try:
+            demux(file_path, audio_path, frame_interval_sec=30, on_frame=on_frame)
+            demuxed = True
+        except Exception as e:
+            print(f"[analyze] single-pass demux failed, falling back to ffmpeg/OpenCV: {e}")
+            frame_results.clear()
+            fake_count = 0
+
+    if frame_sampling != "adaptive" and not demuxed:
+        # Extract frames every 30s and run deepfake prediction
+        frames = extract_frames(file_path, frame_dir, interval_sec=30)
+        for frame_path in frames:
+            label, score = predict_image(frame_path)
+            add_frame(label, score, frame_path)
+
+    try:
+        if not demuxed:
+            # Extract audio -> mono wav 16k
+            try:
+                (
+                    ffmpeg
+                    .input(file_path)
+                    .output(audio_path, ac=1, ar=16000)
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
+            except Exception as e:
+                return {"error": f"Failed to extract audio: {str(e)}"}
+
+        # ASR + summary + sentiment on the extracted audio
+        transcript = transcribe_audio(audio_path)
+        if diarize:
+            label_speakers(audio_path, transcript)
+    finally:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+
+    rows, probs = analyze_sentiment_with_probs(transcript)
+    result = {
+        "type": "video",
+        "frames_checked": len(frame_results),
+        "fake_frames": fake_count,
+        "frame_details": frame_results,
+        "transcript": transcript,
+        "summary": generate_summary(transcript),
+        "highlights": summary_highlights(transcript),
+        "sentiment": sentiment_payload(transcript, sentiment_mode, bucket_sec, page=page, page_size=page_size, probs=probs)
+    }
+    if frame_timeline is not None:
+        result["frame_timeline"] = frame_timeline
+    return _indexed(with_speakers(result, probs), rows, meeting_id, title)
@@ -0,0 +1,113 @@
+import re
+from typing import List
+
+import numpy as np
+from scipy import sparse
+
+from services.extraction import FILLER_PREFIX, PLEASANTRY, split_sentences
+
+
+# ---- Extractive pre-filter (TF-IDF + TextRank) ----
+_TOKEN_RE   = re.compile(r"[a-z0-9']+")
+_MIN_WORDS  = 4          # shorter sentences are treated as filler
+_DAMPING    = 0.85
+_ITERATIONS = 50
+_TOL        = 1e-6
+
+# Function words carry no topic signal; keep them out of the TF-IDF vocabulary.
+_STOPWORDS = frozenset("""
+a an the and or but if so of to in on at by for with from as is are was were be been
+being it its this that these those i you he she we they me him her us them my your his
+our their what which who whom do does did have has had not no yes just very really
+like um uh er ah okay ok yeah right well oh can could would should will shall may might
+there here then than also about into out up down over again more most some such only own
+same too s t don't i'm it's that's we're you're they're i've we've
+""".split())
+
+
+def _is_filler(s: str) -> bool:
+    core = FILLER_PREFIX.sub("", s).strip()
+    n = len(core.split())
+    if n < _MIN_WORDS:
+        return True
+    # short pleasantries ("Thanks everyone, great job.") carry no content
+    return n < 2 * _MIN_WORDS and bool(PLEASANTRY.search(core))
+
+def _tfidf(sentences: List[str]) -> sparse.csr_matrix:
+    """L2-normalized sublinear TF-IDF rows, one per sentence."""
+    vocab = {}
+    rows, cols, vals = [], [], []
+    for i, s in enumerate(sentences):
+        counts = {}
+        for tok in _TOKEN_RE.findall(s.lower()):
+            if tok in _STOPWORDS:
+                continue
+            j = vocab.setdefault(tok, len(vocab))
+            counts[j] = counts.get(j, 0) + 1
+        rows.extend([i] * len(counts))
+        cols.extend(counts.keys())
+        vals.extend(counts.values())
+    n = len(sentences)
+    X = sparse.csr_matrix(
+        (np.asarray(vals, dtype=np.float64), (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))),
+        shape=(n, max(1, len(vocab))),
+    )
+    X.data = 1.0 + np.log(X.data)
+    df = np.bincount(X.indices, minlength=X.shape[1])
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    X = X @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ X
+
+def textrank_scores(sentences: List[str]) -> np.ndarray:
+    """
+    TextRank centrality over the cosine-similarity graph of TF-IDF vectors.
+    Returns one score per sentence (sums to 1 over non-isolated sentences).
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+    X = _tfidf(sentences)
+    S = (X @ X.T).tocsr()
+    S.setdiag(0.0)
+    S.eliminate_zeros()
+    out_deg = np.asarray(S.sum(axis=1)).ravel()
+    inv = np.divide(1.0, out_deg, out=np.zeros_like(out_deg), where=out_deg > 0)
+    # column-stochastic transition: P[j, i] = S[i, j] / deg(i)
+    P = (sparse.diags(inv) @ S).T.tocsr()
+    r = np.full(n, 1.0 / n)
+    for _ in range(_ITERATIONS):
+        nxt = (1.0 - _DAMPING) / n + _DAMPING * (P @ r)
+        if np.abs(nxt - r).sum() < _TOL:
+            r = nxt
+            break
+        r = nxt
+    return r
+
+def compress_text(text: str, ratio: float) -> str:
+    """
+    Keep the highest-ranked sentences until `ratio` of the (non-filler) words
+    are retained, and return them joined in their original order.
+    ratio >= 1 returns `text` unchanged.
+    """
+    if ratio >= 1.0 or not text.strip():
+        return text
+    sents = split_sentences(text)
+    keep_idx = [i for i, s in enumerate(sents) if not _is_filler(s)]
+    if len(keep_idx) <= 1:
+        return text
+    cand = [sents[i] for i in keep_idx]
+    scores = textrank_scores(cand)
+    lengths = np.array([len(s.split()) for s in cand])
+    budget = max(1, int(round(lengths.sum() * max(ratio, 0.0))))
+
+    order = np.argsort(-scores, kind="stable")
+    taken = np.zeros(len(cand), dtype=bool)
+    used = 0
+    for k in order:
+        if used >= budget:
+            break
+        taken[k] = True
+        used += lengths[k]
+    return " ".join(s for s, t in zip(cand, taken) if t)
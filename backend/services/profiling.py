@@ -0,0 +1,205 @@
+import functools
+import hmac
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+
+# ---- Knobs ----
+ADMIN_TOKEN      = os.getenv("PROFILE_ADMIN_TOKEN", "")            # unset = profiling disabled
+PROFILE_DIR      = os.getenv("PROFILE_DIR", os.path.join("temp", "profiles"))
+SAMPLE_INTERVAL  = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+PROFILE_TORCH    = os.getenv("PROFILE_TORCH", "1") == "1"          # torch.profiler operator breakdown
+
+# One profiled request at a time: torch.profiler is process-wide. Model spans are
+# only emitted in the context of the profiled request (copied into the threads it
+# starts), so concurrent requests are not labelled and the disabled path costs
+# one context-variable lookup per call.
+_session_lock = threading.Lock()
+_torch_active: ContextVar[bool] = ContextVar("profile_torch_active", default=False)
+
+
+def is_admin(request: Request) -> bool:
+    token = request.headers.get("x-admin-token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+def wants_profile(request: Request) -> bool:
+    flag = request.headers.get("x-profile") or request.query_params.get("profile") or ""
+    return flag.lower() in ("1", "true", "yes") and is_admin(request)
+
+def model_span(name: str):
+    """Label a model call ("bart.generate", ...) in the torch trace of a profiled request."""
+    if not _torch_active.get():
+        return nullcontext()
+    import torch
+    return torch.profiler.record_function(name)
+
+
+class ProfileSession:
+    """Sampling profile + torch operator trace of one request, saved under PROFILE_DIR/<id>/."""
+
+    def __init__(self, route: str, request: Request):
+        self.id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.dir = os.path.join(PROFILE_DIR, self.id)
+        self.meta: Dict[str, Any] = {
+            "id": self.id, "route": route, "query": dict(request.query_params),
+            "started_at": time.time(), "artifacts": [],
+        }
+        self._sampler = None
+        self._torch = None
+        self._active = None
+
+    def __enter__(self) -> "ProfileSession":
+        os.makedirs(self.dir, exist_ok=True)
+        if PROFILE_TORCH:
+            try:
+                import torch
+                activities = [torch.profiler.ProfilerActivity.CPU]
+                if torch.cuda.is_available():
+                    activities.append(torch.profiler.ProfilerActivity.CUDA)
+                self._torch = torch.profiler.profile(activities=activities, record_shapes=True)
+                self._torch.__enter__()
+                self._active = _torch_active.set(True)
+            except Exception as e:
+                self._torch = None
+                self.meta["torch_error"] = str(e)
+        if PYINSTRUMENT_AVAILABLE:
+            self._sampler = Profiler(interval=SAMPLE_INTERVAL, async_mode="disabled")
+            self._sampler.start()
+        else:
+            import cProfile
+            self._sampler = cProfile.Profile()
+            self._sampler.enable()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._active is not None:
+            _torch_active.reset(self._active)
+        self.meta["wall_sec"] = round(time.perf_counter() - self._t0, 3)
+        if exc is not None:
+            self.meta["error"] = repr(exc)
+        try:
+            self._save_sampling()
+            self._save_torch()
+        except Exception as e:  # artifacts are best-effort, never fail the request
+            self.meta["save_error"] = str(e)
+        with open(os.path.join(self.dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def _artifact(self, name: str) -> str:
+        self.meta["artifacts"].append(name)
+        return os.path.join(self.dir, name)
+
+    def _save_sampling(self) -> None:
+        if PYINSTRUMENT_AVAILABLE:
+            self._sampler.stop()
+            with open(self._artifact("sampling.speedscope.json"), "w", encoding="utf-8") as f:
+                f.write(self._sampler.output(SpeedscopeRenderer()))
+            with open(self._artifact("sampling.html"), "w", encoding="utf-8") as f:
+                f.write(self._sampler.output_html())
+        else:
+            import pstats
+            self._sampler.disable()
+            self._sampler.dump_stats(self._artifact("cprofile.prof"))
+            with open(self._artifact("cprofile.txt"), "w", encoding="utf-8") as f:
+                pstats.Stats(self._sampler, stream=f).sort_stats("cumulative").print_stats(60)
+
+    def _save_torch(self) -> None:
+        if self._torch is None:
+            return
+        self._torch.__exit__(None, None, None)
+        self._torch.export_chrome_trace(self._artifact("torch_trace.json"))
+        with open(self._artifact("torch_ops.txt"), "w", encoding="utf-8") as f:
+            f.write(self._torch.key_averages().table(sort_by="cpu_time_total", row_limit=60))
+
+
+def _attach_id(result: Any, profile_id: str) -> Any:
+    if isinstance(result, Response):
+        result.headers["X-Profile-Id"] = profile_id
+        return result
+    return JSONResponse(jsonable_encoder(result), headers={"X-Profile-Id": profile_id})
+
+def _find_request(args, kwargs) -> Optional[Request]:
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, Request):
+            return value
+    return None
+
+def profiled(route: str) -> Callable:
+    """
+    Route decorator: with `X-Profile: 1` (or ?profile=1) and a valid
+    `X-Admin-Token`, run the handler under a ProfileSession and return the
+    profile id in the `X-Profile-Id` response header. The endpoint must take a
+    `request: Request` parameter. Streamed bodies are profiled up to the point
+    the response is returned. While one request is being profiled, others run
+    unprofiled.
+
+    Only plain `def` endpoints: FastAPI runs them on a worker thread, which is
+    the thread the sampler follows. On an `async def` endpoint it would sample
+    the event loop (other requests) and miss work handed to the threadpool.
+    """
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            raise TypeError(f"@profiled({route!r}) needs a def endpoint, not async def")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args, kwargs)
+            if request is None or not wants_profile(request) or not _session_lock.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            try:
+                with ProfileSession(route, request) as session:
+                    result = fn(*args, **kwargs)
+            finally:
+                _session_lock.release()
+            return _attach_id(result, session.id)
+        return wrapper
+    return decorate
+
+
+# ---- Stored profiles ----
+def _safe_id(profile_id: str) -> bool:
+    return bool(profile_id) and all(c.isalnum() or c == "_" for c in profile_id)
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        meta = get_profile(name)
+        if meta is not None:
+            out.append(meta)
+    return out
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    if not _safe_id(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id, "meta.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def artifact_path(profile_id: str, name: str) -> Optional[str]:
+    meta = get_profile(profile_id)
+    if meta is None or name not in meta["artifacts"]:
+        return None
+    return os.path.join(PROFILE_DIR, profile_id, name)
@@ -0,0 +1,61 @@
+import os
+from typing import Any, Dict, Optional
+
+import pdfkit
+from jinja2 import Environment, FileSystemLoader
+from pdfkit.configuration import Configuration
+
+# wkhtmltopdf binary; falls back to the one on PATH when the configured path is missing
+WKHTMLTOPDF_PATH = os.getenv("WKHTMLTOPDF_PATH", r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe")
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+def _config() -> Optional[Configuration]:
+    if WKHTMLTOPDF_PATH and os.path.exists(WKHTMLTOPDF_PATH):
+        return Configuration(wkhtmltopdf=WKHTMLTOPDF_PATH)
+    return None
+
+def render_report_html(data: Dict[str, Any]) -> str:
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    return env.get_template("report_template.html").render(data=data)
+
+def write_pdf(data: Dict[str, Any], output_path: str) -> str:
+    """Render an analysis result with templates/report_template.html into a PDF."""
+    pdfkit.from_string(render_report_html(data), output_path, configuration=_config())
+    return output_path
+
+def _hms(secs: float) -> str:
+    total = max(0, int(secs or 0))
+    h, m, s = total // 3600, (total % 3600) // 60, total % 60
+    return f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
+
+def report_payload(result: Dict[str, Any], title: str = "") -> Dict[str, Any]:
+    """
+    Map an /analyze result to the template payload the frontends post to
+    /generate_pdf (charts are omitted: they are rendered client-side).
+    """
+    sentiment = result.get("sentiment")
+    per_segment = sentiment if isinstance(sentiment, list) else []
+    transcript = []
+    for i, t in enumerate(result.get("transcript") or []):
+        s = per_segment[i] if i < len(per_segment) else None
+        transcript.append({
+            "time": f"{_hms(t['start'])} - {_hms(t['end'])}",
+            "text": f"{t['speaker']}: {t['text']}" if t.get("speaker") else t["text"],
+            "sentiment": f"{s['sentiment']} ({s['score'] * 100:.1f}%)" if s else "unknown",
+        })
+    data = {
+        "meeting_title": title,
+        "summary": [{"time": f"S{i + 1}", "text": line}
+                    for i, line in enumerate((result.get("summary") or "").split("\n"))],
+        "transcript": transcript,
+        "deepfake": None,
+    }
+    checked = result.get("frames_checked")
+    if checked:
+        data["deepfake"] = {
+            "total_frames": checked,
+            "fake_frames": result["fake_frames"],
+            "fake_percentage": f"{result['fake_frames'] / checked * 100:.2f}",
+        }
+    return data
@@ -0,0 +1,193 @@
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# ---- Knobs ----
+SEARCH_INDEX = os.getenv("SEARCH_INDEX", "0") == "1"        # opt-in: index every finished analysis
+SEARCH_DB    = os.getenv("SEARCH_DB", os.path.join("temp", "search.db"))
+
+KINDS = ("segment", "summary", "action", "decision", "fact")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id           TEXT PRIMARY KEY,
+    title        TEXT,
+    type         TEXT,
+    duration_sec REAL,
+    summary      TEXT,
+    segments     INTEGER,
+    indexed_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id         INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    kind       TEXT NOT NULL,             -- segment | summary | action | decision | fact
+    start      REAL,
+    "end"      REAL,
+    text       TEXT NOT NULL,
+    sentiment  TEXT,
+    score      REAL
+);
+CREATE INDEX IF NOT EXISTS entries_meeting ON entries(meeting_id);
+-- external-content FTS5 index over entries.text, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, content='entries', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_TOKEN = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def fts_query(q: str) -> str:
+    """
+    Plain search text -> safe FTS5 query: every word must match (implicit AND),
+    quoted so punctuation cannot break the query syntax and AND/OR/NOT/NEAR are
+    searched as words; a trailing '*' keeps prefix search ("budg*").
+    """
+    terms = []
+    for tok in _TOKEN.findall(q):
+        prefix = tok.endswith("*")
+        word = tok.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """SQLite FTS5 index of analyzed meetings (one connection per call)."""
+
+    def __init__(self, db_path: str = SEARCH_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.db_path, timeout=30)
+        con.row_factory = sqlite3.Row
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    # ---- Updates ----
+    def add_meeting(self, meeting_id: str, transcript: Iterable[Dict[str, Any]], summary: str,
+                    highlights: Dict[str, List[Dict[str, Any]]],
+                    sentiment: Optional[Iterable[Dict[str, Any]]] = None,
+                    title: str = "", media_type: str = "", duration_sec: Optional[float] = None) -> int:
+        """
+        (Re)index one meeting in a single transaction: transcript segments with
+        their sentiment, summary bullets and extracted actions/decisions/facts.
+        `transcript` and `sentiment` may be lazy iterables (e.g. long-media spill
+        logs); they are consumed once. Returns the number of indexed segments.
+        """
+        counter = {"segments": 0}
+
+        def segment_rows():
+            sent = iter(sentiment) if sentiment is not None else None
+            for seg in transcript:
+                s = next(sent, None) if sent is not None else None
+                counter["segments"] += 1
+                yield (meeting_id, "segment", seg["start"], seg["end"], seg["text"],
+                       s["sentiment"] if s else None, s["score"] if s else None)
+
+        other = [(meeting_id, "summary", None, None, line.strip(" •-\t"), None, None)
+                 for line in (summary or "").splitlines() if line.strip(" •-\t")]
+        for key, kind in (("actions", "action"), ("decisions", "decision"), ("facts", "fact")):
+            for item in (highlights or {}).get(key, []):
+                other.append((meeting_id, kind, item.get("start"), item.get("end"), item["text"], None, None))
+
+        insert = 'INSERT INTO entries (meeting_id, kind, start, "end", text, sentiment, score) VALUES (?, ?, ?, ?, ?, ?, ?)'
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM entries WHERE meeting_id=?", (meeting_id,))
+            con.executemany(insert, segment_rows())
+            con.executemany(insert, other)
+            con.execute(
+                "INSERT OR REPLACE INTO meetings (id, title, type, duration_sec, summary, segments, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (meeting_id, title, media_type, duration_sec, summary, counter["segments"], time.time()),
+            )
+        return counter["segments"]
+
+    def delete_meeting(self, meeting_id: str) -> bool:
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM entries WHERE meeting_id=?", (meeting_id,))
+            return con.execute("DELETE FROM meetings WHERE id=?", (meeting_id,)).rowcount > 0
+
+    # ---- Queries ----
+    def search(self, q: str, kinds: Optional[List[str]] = None, meeting_id: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Best-matching entries first (BM25), with a highlighted snippet."""
+        match = fts_query(q)
+        if not match:
+            return []
+        # Rank inside the FTS table first and join only the page that is returned.
+        inner = ("SELECT rowid AS rid, rank, snippet(entries_fts, 0, '[', ']', '…', 16) AS snippet "
+                 "FROM entries_fts WHERE entries_fts MATCH ?")
+        args: List[Any] = [match]
+        filters, fargs = [], []
+        if kinds:
+            filters.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            fargs.extend(kinds)
+        if meeting_id:
+            filters.append("meeting_id = ?")
+            fargs.append(meeting_id)
+        if filters:
+            inner += f" AND rowid IN (SELECT id FROM entries WHERE {' AND '.join(filters)})"
+            args.extend(fargs)
+        inner += " ORDER BY rank LIMIT ? OFFSET ?"
+        args.extend([limit, offset])
+        sql = (
+            'SELECT e.meeting_id, m.title, e.kind, e.start, e."end", e.text, e.sentiment, e.score, '
+            f"f.snippet, f.rank FROM ({inner}) f "
+            "JOIN entries e ON e.id = f.rid JOIN meetings m ON m.id = e.meeting_id ORDER BY f.rank"
+        )
+        with closing(self._connect()) as con:
+            return [dict(r) for r in con.execute(sql, args)]
+
+    def segment_sentiment(self, meeting_id: str, limit: int = 200,
+                          offset: int = 0) -> Optional[Dict[str, Any]]:
+        """One page of a meeting's per-segment sentiment rows in transcript order (None if unknown)."""
+        with closing(self._connect()) as con:
+            meeting = con.execute("SELECT segments FROM meetings WHERE id=?", (meeting_id,)).fetchone()
+            if meeting is None:
+                return None
+            items = [dict(r) for r in con.execute(
+                'SELECT start, "end", sentiment, score FROM entries WHERE meeting_id=? AND kind=? '
+                "ORDER BY id LIMIT ? OFFSET ?", (meeting_id, "segment", limit, offset))]
+        return {"total": meeting["segments"], "items": items}
+
+    def list_meetings(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as con:
+            return [dict(r) for r in con.execute(
+                "SELECT id, title, type, duration_sec, segments, indexed_at FROM meetings "
+                "ORDER BY indexed_at DESC LIMIT ? OFFSET ?", (limit, offset))]
+
+
+def index_result(meeting_id: str, result: Dict[str, Any], title: str = "",
+                 sentiment_rows: Optional[List[Dict[str, Any]]] = None) -> None:
+    """
+    Index an in-memory /analyze result. `sentiment_rows` are the per-segment
+    rows (needed when the response carries a bucket/turn sentiment report).
+    Indexing errors are logged, never raised: search is best-effort.
+    """
+    if sentiment_rows is None and isinstance(result.get("sentiment"), list):
+        sentiment_rows = result["sentiment"]
+    transcript = result.get("transcript") or []
+    try:
+        SearchIndex().add_meeting(
+            meeting_id, transcript, result.get("summary", ""), result.get("highlights", {}),
+            sentiment=sentiment_rows, title=title, media_type=result.get("type", ""),
+            duration_sec=transcript[-1]["end"] if transcript else None,
+        )
+    except Exception as e:
+        print(f"[search] indexing {meeting_id} failed: {e}")
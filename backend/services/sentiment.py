@@ -9,45 +9,376 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from scipy.special import softmax
 from nltk.tokenize import sent_tokenize
 
+import os
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
 import torch
-from typing import List, Dict
+from typing import List, Dict, Any, Optional
+
+from services.extraction import FILLER_PREFIX
+from services import standin
+from services.profiling import model_span
 
 # Load CardiffNLP RoBERTa sentiment model once at import time.
 # Labels: negative / neutral / positive (3-class).
 model_name = "cardiffnlp/twitter-roberta-base-sentiment"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSequenceClassification.from_pretrained(model_name)
-model.eval()
+STANDIN = standin.enabled("roberta")   # MODEL_STANDIN: no weights, fake probabilities (load testing)
+if STANDIN:
+    tokenizer = None
+    model = standin.StandInModel("roberta")
+else:
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
 
 # Index-to-label mapping used by the model outputs.
 labels = ['negative', 'neutral', 'positive']
 
-def analyze_sentiment(transcript: List[Dict]) -> List[Dict]:
+# ---- Analytics knobs ----
+BUCKET_SEC   = float(os.getenv("SENTIMENT_BUCKET_SEC", "60"))     # timeline bucket width
+TREND_WINDOW = int(os.getenv("SENTIMENT_TREND_WINDOW", "5"))      # rolling trend, in buckets/turns
+TURN_GAP_SEC = float(os.getenv("SENTIMENT_TURN_GAP_SEC", "1.5"))  # silence that starts a new turn
+PAGE_SIZE    = int(os.getenv("SENTIMENT_PAGE_SIZE", "200"))       # per-segment detail page size
+MAX_BUCKETS  = int(os.getenv("SENTIMENT_MAX_BUCKETS", "2000"))    # wider buckets beyond this many
+
+
+# ---- Memo cache + short-segment fast path ----
+CACHE_SIZE     = int(os.getenv("SENTIMENT_CACHE_SIZE", "20000"))    # normalized texts kept (0 = off)
+FASTPATH_WORDS = int(os.getenv("SENTIMENT_FASTPATH_WORDS", "0"))    # <= N words skip the model (0 = off)
+BATCH_SIZE     = int(os.getenv("SENTIMENT_BATCH_SIZE", "16"))       # cache misses per forward pass
+
+_KEY_STRIP = re.compile(r"[^\w\s?!']+")
+
+# Fast-path lexicon for very short utterances ("Thanks!", "Sorry.", "Okay.") and the
+# fixed distributions they get (ordered as `labels`).
+_FAST_POSITIVE = {"thanks", "thank", "great", "good", "awesome", "nice", "perfect", "cool",
+                  "excellent", "love", "wonderful", "amazing", "fantastic", "glad"}
+_FAST_NEGATIVE = {"sorry", "bad", "terrible", "awful", "unfortunately", "wrong", "problem",
+                  "hate", "worse", "worst", "annoying", "ugh"}
+_FAST_PROBS = {
+    "negative": np.array([0.80, 0.17, 0.03], dtype=np.float32),
+    "neutral":  np.array([0.05, 0.90, 0.05], dtype=np.float32),
+    "positive": np.array([0.02, 0.13, 0.85], dtype=np.float32),
+}
+
+
+class _ProbCache:
+    """Thread-safe LRU of normalized text -> probability row, shared by all requests."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.fast_path = self.evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._data.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return row
+
+    def put(self, key: str, row: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = row
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def count(self, hits: int = 0, fast_path: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.fast_path += fast_path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "fast_path": self.fast_path,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.fast_path = self.evictions = 0
+
+_cache = _ProbCache(CACHE_SIZE)
+
+def sentiment_cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+def _memo_key(text: str):
     """
-    Analyze sentiment by each segment in the transcript.
-    Input: transcript = [{"start": float, "end": float, "text": str}, ...]
-    Output: [{"start": str, "end": str, "sentiment": str, "score": float}, ...]
+    (cache key, model input) for a segment. The model sees the text without leading
+    fillers ("Um, so, ..."); the key additionally ignores case, spacing and
+    punctuation other than ?/!, so "Okay." / "okay" / "Um, okay" share one entry.
     """
-    results = []
-    
-    for segment in transcript:
-        text = segment["text"]
-        # Tokenize with the model tokenizer and run inference
-        encoded_input = tokenizer(text, return_tensors='pt', truncation=True)
-        with torch.no_grad():
-            output = model(**encoded_input)
-            # Convert logits to probabilities with softmax.
-            scores = output.logits[0].numpy()
-            scores = softmax(scores)
-            sentiment_id = scores.argmax()
-            sentiment_label = labels[sentiment_id]
-            sentiment_score = float(scores[sentiment_id])
+    raw = " ".join((text or "").split())
+    model_text = FILLER_PREFIX.sub("", raw).strip() or raw
+    key = " ".join(_KEY_STRIP.sub(" ", model_text.lower()).split())
+    return key, model_text
+
+def _fast_probs(key: str) -> np.ndarray:
+    words = set(key.replace("?", " ").replace("!", " ").split())
+    if words & _FAST_NEGATIVE:
+        return _FAST_PROBS["negative"]
+    if words & _FAST_POSITIVE:
+        return _FAST_PROBS["positive"]
+    return _FAST_PROBS["neutral"]
+
+def _model_probs(texts: List[str]) -> np.ndarray:
+    """One padded forward pass over `texts`; returns (len(texts), 3) probabilities."""
+    if STANDIN:
+        return model.classify(texts)
+    encoded_input = tokenizer(texts, return_tensors='pt', truncation=True, padding=True)
+    with torch.no_grad(), model_span("roberta.sentiment"):
+        output = model(**encoded_input)
+    # Convert logits to probabilities with softmax.
+    return softmax(output.logits.numpy(), axis=1)
+
+def _segment_probs(transcript: List[Dict]) -> np.ndarray:
+    """
+    Run the model over every segment and return an (n, 3) probability matrix
+    ordered as `labels`.
 
+    Repeated and near-duplicate segments are resolved from the shared memo cache
+    (and deduplicated within the transcript), segments of at most FASTPATH_WORDS
+    words skip the model, and the remaining unique texts run in batches.
+    """
+    probs = np.zeros((len(transcript), len(labels)), dtype=np.float32)
+    pending: Dict[str, List[int]] = {}   # cache key -> rows waiting for it
+    model_text: Dict[str, str] = {}
+    uncached = set()                     # keys standing for the exact text, never cached
+    dup_hits = fast = 0
+    for i, segment in enumerate(transcript):
+        key, text = _memo_key(segment["text"])
+        if not key:
+            # punctuation/emoticon only (":)", ":(", "..."): the normalized key would
+            # be "" for all of them, so only identical texts are shared
+            key = text
+            uncached.add(key)
+        elif FASTPATH_WORDS > 0 and len(key.split()) <= FASTPATH_WORDS:
+            probs[i] = _fast_probs(key)
+            fast += 1
+            continue
+        if key in pending:
+            pending[key].append(i)
+            dup_hits += 1
+            continue
+        row = _cache.get(key) if key not in uncached else None
+        if row is not None:
+            probs[i] = row
+            continue
+        pending[key] = [i]
+        model_text[key] = text
+    _cache.count(hits=dup_hits, fast_path=fast)
+
+    keys = list(pending)
+    for b in range(0, len(keys), max(1, BATCH_SIZE)):
+        batch = keys[b:b + max(1, BATCH_SIZE)]
+        for key, row in zip(batch, _model_probs([model_text[k] for k in batch])):
+            if key not in uncached:
+                _cache.put(key, row)
+            probs[pending[key]] = row
+    return probs
+
+def _segment_results(transcript: List[Dict], probs: np.ndarray) -> List[Dict]:
+    results = []
+    ids = probs.argmax(axis=1) if len(probs) else np.zeros(0, dtype=int)
+    for segment, row, sentiment_id in zip(transcript, probs, ids):
         results.append({
             "start": segment["start"],
             "end": segment["end"],
-            "sentiment": sentiment_label,
-            "score": round(sentiment_score, 4)
+            "sentiment": labels[sentiment_id],
+            "score": round(float(row[sentiment_id]), 4)
         })
-
     return results
+
+def analyze_sentiment(transcript: List[Dict]) -> List[Dict]:
+    """
+    Analyze sentiment by each segment in the transcript.
+    Input: transcript = [{"start": float, "end": float, "text": str}, ...]
+    Output: [{"start": str, "end": str, "sentiment": str, "score": float}, ...]
+    """
+    return _segment_results(transcript, _segment_probs(transcript))
+
+def analyze_sentiment_with_probs(transcript: List[Dict]):
+    """`analyze_sentiment` rows plus the (n, 3) probability matrix behind them."""
+    probs = _segment_probs(transcript)
+    return _segment_results(transcript, probs), probs
+
+
+# ---- Server-side aggregation (vectorized) ----
+def _round_list(a: np.ndarray) -> List[float]:
+    return np.round(a.astype(np.float64), 4).tolist()
+
+def _rolling_mean(values: np.ndarray, weights: np.ndarray, window: int) -> np.ndarray:
+    """Weighted trailing mean over `window` groups; empty groups carry no weight."""
+    if len(values) == 0:
+        return values
+    window = max(1, window)
+    cv = np.cumsum(np.concatenate(([0.0], values * weights)))
+    cw = np.cumsum(np.concatenate(([0.0], weights)))
+    lo = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    hi = np.arange(1, len(values) + 1)
+    num = cv[hi] - cv[lo]
+    den = cw[hi] - cw[lo]
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+def _turn_ids(transcript: List[Dict], starts: np.ndarray, ends: np.ndarray,
+              gap_sec: float) -> np.ndarray:
+    """
+    Group consecutive segments into speaker turns. Uses the `speaker` key when
+    present, otherwise a silence gap longer than `gap_sec` starts a new turn.
+    """
+    n = len(starts)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    breaks = np.zeros(n, dtype=bool)
+    breaks[1:] = (starts[1:] - ends[:-1]) > gap_sec
+    speakers = [seg.get("speaker") for seg in transcript]
+    if any(s is not None for s in speakers):
+        spk = np.array([str(s) for s in speakers], dtype=object)
+        breaks[1:] |= spk[1:] != spk[:-1]
+    return np.cumsum(breaks)
+
+def aggregate_sentiment(transcript: List[Dict], probs: np.ndarray, mode: str = "bucket",
+                        bucket_sec: float = BUCKET_SEC, trend_window: int = TREND_WINDOW,
+                        turn_gap_sec: float = TURN_GAP_SEC) -> Dict[str, Any]:
+    """
+    Aggregate per-segment probabilities into a compact timeline.
+
+    mode="bucket": fixed time buckets of `bucket_sec` seconds (empty buckets kept,
+                   so index i always covers [i*bucket_sec, (i+1)*bucket_sec)).
+                   Buckets are widened (to whole seconds) when the recording would
+                   need more than MAX_BUCKETS; the report carries the width used.
+    mode="turn":   consecutive-segment turns (speaker change or silence gap).
+
+    Returns columnar arrays: start/end/count, per-label counts and mean
+    probabilities, polarity (= mean positive - mean negative) and its rolling trend.
+    """
+    if mode not in ("bucket", "turn"):
+        raise ValueError(f"Unknown sentiment aggregation mode: {mode}")
+
+    n = len(transcript)
+    starts = np.array([float(s["start"]) for s in transcript], dtype=np.float64)
+    ends = np.array([float(s["end"]) for s in transcript], dtype=np.float64)
+    ids = probs.argmax(axis=1) if n else np.zeros(0, dtype=np.int64)
+
+    if mode == "bucket":
+        bucket_sec = max(float(bucket_sec), 1e-3)
+        if n and MAX_BUCKETS > 0:
+            bucket_sec = max(bucket_sec, float(np.ceil(starts.max() / max(1, MAX_BUCKETS - 1))))
+        group = np.floor(starts / bucket_sec).astype(np.int64)
+        n_groups = int(group.max()) + 1 if n else 0
+    else:
+        group = _turn_ids(transcript, starts, ends, turn_gap_sec)
+        n_groups = int(group[-1]) + 1 if n else 0
+
+    counts = np.zeros((n_groups, len(labels)), dtype=np.int64)
+    np.add.at(counts, (group, ids), 1)
+    prob_sum = np.zeros((n_groups, len(labels)), dtype=np.float64)
+    np.add.at(prob_sum, group, probs)
+    total = counts.sum(axis=1)
+    mean_probs = prob_sum / np.maximum(total, 1)[:, None]
+
+    if mode == "bucket":
+        g_start = np.arange(n_groups) * bucket_sec
+        g_end = g_start + bucket_sec
+    else:
+        g_start = np.full(n_groups, np.inf)
+        g_end = np.full(n_groups, -np.inf)
+        np.minimum.at(g_start, group, starts)
+        np.maximum.at(g_end, group, ends)
+
+    polarity = mean_probs[:, 2] - mean_probs[:, 0] if n_groups else np.zeros(0)
+    trend = _rolling_mean(polarity, total.astype(np.float64), trend_window)
+
+    overall_counts = counts.sum(axis=0)
+    overall_mean = probs.mean(axis=0) if n else np.zeros(len(labels))
+
+    timeline: Dict[str, Any] = {
+        "start": _round_list(g_start),
+        "end": _round_list(g_end),
+        "count": total.tolist(),
+        "counts": {lab: counts[:, j].tolist() for j, lab in enumerate(labels)},
+        "mean_probs": {lab: _round_list(mean_probs[:, j]) for j, lab in enumerate(labels)},
+        "polarity": _round_list(polarity),
+        "trend": _round_list(trend),
+    }
+    if mode == "turn" and any("speaker" in seg for seg in transcript):
+        first = np.full(n_groups, n, dtype=np.int64)
+        np.minimum.at(first, group, np.arange(n))
+        timeline["speaker"] = [transcript[i].get("speaker") for i in first]
+
+    return {
+        "mode": mode,
+        "bucket_sec": bucket_sec if mode == "bucket" else None,
+        "trend_window": trend_window,
+        "labels": labels,
+        "segments": n,
+        "overall": {
+            "counts": {lab: int(overall_counts[j]) for j, lab in enumerate(labels)},
+            "mean_probs": {lab: round(float(overall_mean[j]), 4) for j, lab in enumerate(labels)},
+        },
+        "timeline": timeline,
+    }
+
+def sentiment_analytics(transcript: List[Dict], mode: str = "bucket",
+                        bucket_sec: float = BUCKET_SEC, trend_window: int = TREND_WINDOW,
+                        page: int = 0, page_size: int = PAGE_SIZE,
+                        probs: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Compact sentiment report for long meetings.
+
+    Runs the model once (or reuses precomputed `probs`), returns the aggregated timeline (see `aggregate_sentiment`)
+    plus one page of the per-segment detail:
+      {"page": int, "page_size": int, "total": int, "items": [analyze_sentiment rows]}
+    page_size <= 0 omits the per-segment detail entirely.
+    """
+    if probs is None:
+        probs = _segment_probs(transcript)
+    report = aggregate_sentiment(transcript, probs, mode=mode,
+                                 bucket_sec=bucket_sec, trend_window=trend_window)
+
+    page = max(0, int(page))
+    if page_size > 0:
+        lo = page * page_size
+        hi = lo + page_size
+        items = _segment_results(transcript[lo:hi], probs[lo:hi])
+    else:
+        items = []
+    report["detail"] = {
+        "page": page,
+        "page_size": page_size,
+        "total": len(transcript),
+        "items": items,
+    }
+    return report
+
+def sentiment_payload(transcript: List[Dict], mode: str = "segments",
+                      bucket_sec: float = BUCKET_SEC, page: int = 0,
+                      page_size: int = PAGE_SIZE, probs: Optional[np.ndarray] = None):
+    """
+    Route helper: mode="segments" keeps the original per-segment list,
+    "bucket"/"turn" return the compact `sentiment_analytics` report.
+    `probs` from `analyze_sentiment_with_probs` skips re-running the model.
+    """
+    if mode == "segments":
+        return _segment_results(transcript, probs) if probs is not None else analyze_sentiment(transcript)
+    return sentiment_analytics(transcript, mode=mode, bucket_sec=bucket_sec,
+                               page=page, page_size=page_size, probs=probs)
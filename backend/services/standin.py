@@ -0,0 +1,149 @@
+"""
+Stand-in models for load testing the HTTP / concurrency layer without the real
+weights. With MODEL_STANDIN set, the model-backed services (Whisper, BART,
+RoBERTa, Xception) skip loading their models and answer through a StandInModel:
+deterministic, plausible outputs plus a configurable cost per call
+(sleep, CPU burn, working memory) and a resident footprint standing in for the
+weights. Everything else (decoding, extraction, sentiment aggregation, search,
+encoding, jobs) runs for real, offline.
+
+  MODEL_STANDIN=1                 all four models
+  MODEL_STANDIN=whisper,bart      only these
+  STANDIN_<MODEL>="sleep_ms,cpu_ms,mem_mb,resident_mb"   cost profile
+  STANDIN_SCALE=0.5               multiply every sleep/CPU cost (0 = instant)
+
+Sleep and CPU are per unit (Whisper: minute of audio, BART: generate call,
+RoBERTa: text, Xception: frame); mem_mb is working memory held during each call.
+"""
+import hashlib
+import os
+import random
+import re
+import time
+import wave
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+MODELS = ("whisper", "bart", "roberta", "xception")
+
+# Rough CPU-only costs of the real models (sleep_ms, cpu_ms, mem_mb, resident_mb)
+DEFAULT_PROFILES = {
+    "whisper":  "300,3000,200,150",   # per audio minute, base/int8
+    "bart":     "100,2000,300,1600",  # per generate call, bart-large
+    "roberta":  "2,25,50,500",        # per text in a batch
+    "xception": "5,60,30,90",         # per frame, 299x299
+}
+
+# ---- Knobs ----
+_raw = os.getenv("MODEL_STANDIN", "0").strip().lower()
+STANDIN = set(MODELS) if _raw in ("1", "all", "true") else {m.strip() for m in _raw.split(",") if m.strip() in MODELS}
+SCALE   = float(os.getenv("STANDIN_SCALE", "1.0"))
+JITTER  = float(os.getenv("STANDIN_JITTER", "0.2"))   # +/- fraction of random variation per call
+
+SENTENCES = [
+    "Okay, let's get started with the weekly project sync.",
+    "The beta release is on track for the end of the month.",
+    "We decided to move the launch date to March 15.",
+    "Sarah will send the updated budget to finance by Friday.",
+    "I think the onboarding flow is still confusing for new users.",
+    "Revenue grew 12 percent compared to last quarter.",
+    "Unfortunately the integration tests are failing again on the staging server.",
+    "Great work on the dashboard, the feedback has been really positive.",
+    "Can we follow up with marketing about the pricing page?",
+    "We agreed to hire two more engineers for the platform team.",
+    "Mark needs to review the security audit before we ship.",
+    "Yeah.",
+    "Thank you.",
+    "Let's wrap up and meet again next Tuesday at 10 am.",
+]
+
+
+def enabled(name: str) -> bool:
+    return name in STANDIN
+
+def _profile(name: str) -> Tuple[float, float, float, float]:
+    raw = os.getenv(f"STANDIN_{name.upper()}", DEFAULT_PROFILES[name])
+    sleep_ms, cpu_ms, mem_mb, resident_mb = (float(x) for x in raw.split(","))
+    return sleep_ms, cpu_ms, mem_mb, resident_mb
+
+def _burn_cpu(sec: float) -> None:
+    # numpy sort is single-threaded and releases the GIL, like a torch kernel;
+    # thread_time counts only this thread's CPU time.
+    buf = np.random.default_rng().random(50_000, dtype=np.float32)
+    end = time.thread_time() + sec
+    while time.thread_time() < end:
+        np.sort(buf)
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little")
+
+
+class StandInModel:
+    """Replaces one model: fake outputs at the configured cost."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sleep_ms, self.cpu_ms, self.mem_mb, resident_mb = _profile(name)
+        # stand-in for the weights: allocated once, kept for the process lifetime
+        self._resident = np.ones(int(resident_mb * 2**20) // 8) if resident_mb > 0 else None
+        print(f"⚠️ MODEL_STANDIN: {name} uses a stand-in model "
+              f"({self.sleep_ms:g} ms sleep, {self.cpu_ms:g} ms CPU, {self.mem_mb:g} MB per call)")
+
+    def _cost(self, units: float) -> None:
+        factor = SCALE * units * (1.0 + random.uniform(-JITTER, JITTER))
+        working = np.ones(int(self.mem_mb * 2**20) // 8) if self.mem_mb > 0 else None
+        if self.sleep_ms > 0:
+            time.sleep(self.sleep_ms * factor / 1000.0)
+        if self.cpu_ms > 0:
+            _burn_cpu(self.cpu_ms * factor / 1000.0)
+        del working
+
+    # ---- Whisper ----
+    def transcribe(self, file_path: str) -> List[Dict]:
+        duration = _wav_duration(file_path)
+        self._cost(duration / 60.0)
+        rng = random.Random(_seed(round(duration, 1)))
+        transcript, t = [], 0.0
+        while t + 1.0 < duration:
+            dur = min(rng.uniform(2.0, 7.0), duration - t)
+            transcript.append({"start": round(t, 2), "end": round(t + dur, 2), "text": rng.choice(SENTENCES)})
+            t += dur + rng.uniform(0.2, 1.8)
+        return transcript
+
+    # ---- BART ----
+    def summarize(self, text: str) -> str:
+        self._cost(1.0)
+        sentences = [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if len(s.split()) > 3]
+        return " ".join(sentences[:4]) or text[:300]
+
+    # ---- RoBERTa ----
+    def classify(self, texts: List[str]) -> np.ndarray:
+        self._cost(float(len(texts)))
+        probs = np.empty((len(texts), 3), dtype=np.float32)
+        for i, text in enumerate(texts):
+            probs[i] = np.random.default_rng(_seed(text)).dirichlet([1.0, 2.5, 1.5])
+        return probs
+
+    # ---- Xception ----
+    def score_frame(self, image) -> float:
+        self._cost(1.0)
+        return float(np.random.default_rng(_seed(float(np.asarray(image).mean()))).beta(1.5, 6.0))
+
+
+class WordTokenizer:
+    """Tokenizer stand-in for BART chunking: roughly one token per 4 characters."""
+
+    def __call__(self, texts, add_special_tokens: bool = False, **_):
+        if isinstance(texts, str):
+            texts = [texts]
+        return {"input_ids": [[0] * max(1, len(t.strip()) // 4) for t in texts]}
+
+
+def _wav_duration(path: str) -> float:
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, EOFError, OSError):
+        return os.path.getsize(path) / 32000.0   # 16 kHz mono s16
@@ -1,20 +1,28 @@
 from faster_whisper import WhisperModel
 
+from services import standin
+from services.profiling import model_span
+
 # Load Whisper once at import:
 # - model size: "base"
 # - CPU inference with int8 compute for portability
-model = WhisperModel("base", device="cpu", compute_type="int8")
+# MODEL_STANDIN: no weights, fake segments at a configurable cost (load testing)
+STANDIN = standin.enabled("whisper")
+model = standin.StandInModel("whisper") if STANDIN else WhisperModel("base", device="cpu", compute_type="int8")
 
 def transcribe_audio(file_path: str,lang=None):
     # Note: language is forced to "en" to keep current behavior.
-    segments, _ = model.transcribe(file_path, language="en")
+    if STANDIN:
+        return model.transcribe(file_path)
     transcript = []
-
-    for segment in segments:
-        transcript.append({
-            "start": float(segment.start),
-            "end": float(segment.end),
-            "text": segment.text.strip()
-        })
+    with model_span("whisper.transcribe"):
+        # segments is a lazy generator: decoding happens while iterating
+        segments, _ = model.transcribe(file_path, language="en")
+        for segment in segments:
+            transcript.append({
+                "start": float(segment.start),
+                "end": float(segment.end),
+                "text": segment.text.strip()
+            })
 
     return transcript
@@ -0,0 +1,173 @@
+"""
+Benchmark the structured extraction engine (services/extraction.py) against the
+previous multi-pass implementation on a synthetic 2-hour transcript.
+
+Run from backend/:  python testing/benchmark_extraction.py [--hours 2] [--repeat 5]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent))
+
+from services.extraction import (  # noqa: E402
+    extract_structure, pick_bullets, scan, sentence_spans, transcript_text,
+)
+
+
+# ---- Previous implementation (baseline) ----
+def _sent_split(text: str) -> List[str]:
+    try:
+        from nltk.tokenize import sent_tokenize
+        return [s.strip() for s in sent_tokenize(text) if s.strip()]
+    except Exception:
+        return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+
+def _clean(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "")).strip()
+
+FILLER_PREFIX = re.compile(r"^(?:\s*(?:um|uh|er|ah|so|well|and)[,.\s])+ ?", re.I)
+Q_PAT         = re.compile(r"\?\s*$")
+PLEASANTRY    = re.compile(r"\b(thank you|thanks|great|awesome|nice)\b", re.I)
+AGENT_RE  = re.compile(r"\b(we|you|team|designer|engineer|developer|pm|manager|marketing|qa|ops|student|presenter|industrial designer|marketing executive)\b", re.I)
+ACTION_RE = re.compile(r"\b(will|need to|should|plan to|try to|please|assign|prepare|send|email|review|update|implement|fix|deploy|test|analyze|summarize|document|schedule|share|collect|gather|design|draft|work on)\b", re.I)
+DECIDE_RE = re.compile(r"\b(decide|decided|agree|agreed|finalize|approve|approved|choose|adopt|conclude|concluded)\b", re.I)
+
+def _legacy_pick_bullets(paragraph: str, k: int = 6) -> List[str]:
+    sents = [_clean(s) for s in _sent_split(paragraph)]
+    sents = [s for s in sents if len(s.split()) >= 6]
+    action_kw   = re.compile(r"\b(update|deliver|send|prepare|review|finalize|test|fix|implement|schedule|align|confirm|approve|assign|follow[- ]?up|work on)\b", re.I)
+    decision_kw = re.compile(r"\b(decide|decided|agreement|agreed|approved|finalize|choose|switch|adopt)\b", re.I)
+    number_kw   = re.compile(r"\b\d[\d,]*(?:\.\d+)?%?\b|\b(RM|MYR|USD|EUR)\s?\d|\b€\s?\d|\$\s?\d", re.I)
+    def score(s: str) -> float:
+        sc = 0.0
+        if action_kw.search(s): sc += 1.2
+        if decision_kw.search(s): sc += 1.0
+        if number_kw.search(s):   sc += 0.7
+        n = len(s.split())
+        if 10 <= n <= 28: sc += 0.5
+        return sc
+    uniq = list(dict.fromkeys(sents))
+    return sorted(uniq, key=lambda x: (-score(x), -len(x)))[:k]
+
+def _legacy_norm_task_text(s: str) -> str:
+    s = FILLER_PREFIX.sub("", s or "").strip()
+    s = re.sub(r"\b(as the|for the)\s+([a-z ]+?),\s*", lambda m: m.group(2).title() + " — ", s, flags=re.I)
+    s = re.sub(r"\b(you|we)\s+(are\s+going\s+to|going\s+to|will|should|need\s+to)\s+", "", s, flags=re.I)
+    s = re.sub(r"\bto\s+be\s+working\s+on\b", "work on", s, flags=re.I)
+    return re.sub(r"\s+", " ", s).strip()
+
+def _legacy_actions_decisions(raw_text: str, cap_act: int = 6, cap_dec: int = 4):
+    actions, decisions = [], []
+    for s in _sent_split(raw_text):
+        s = _clean(s)
+        if not s or PLEASANTRY.search(s) or Q_PAT.search(s):
+            continue
+        if DECIDE_RE.search(s):
+            decisions.append(s)
+            continue
+        if AGENT_RE.search(s) and ACTION_RE.search(s):
+            actions.append(_legacy_norm_task_text(s))
+    def dedupe(xs):
+        seen = set(); out = []
+        for x in xs:
+            if x.lower() not in seen:
+                seen.add(x.lower()); out.append(x)
+        return out
+    return dedupe(actions)[:cap_act], dedupe(decisions)[:cap_dec]
+
+def _legacy_key_facts(raw_text: str, cap: int = 8) -> List[str]:
+    out: List[str] = []
+    out += re.findall(r"(?:€|\$|RM|MYR|USD|EUR)\s?\d[\d,]*(?:\.\d+)?", raw_text, flags=re.I)
+    out += re.findall(r"\b\d+(?:\.\d+)?\s*%", raw_text)
+    out += re.findall(r"\b\d+\s*(?:seconds?|minutes?|hours?|hrs?|days?)\b", raw_text, flags=re.I)
+    out += re.findall(r"\b([01]?\d|2[0-3]):[0-5]\d\b", raw_text)
+    out += re.findall(r"\b\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?\b", raw_text)
+    seen = set(); facts = []
+    for v in out:
+        y = re.sub(r"\s+", " ", v).strip()
+        y = re.sub(r"(\d),(?=\d{3}\b)", r"\1", y)
+        if y.lower() not in seen:
+            seen.add(y.lower()); facts.append(y)
+        if len(facts) >= cap: break
+    return facts
+
+def legacy(transcript, final_paragraph):
+    full_text = _clean(" ".join(str(s.get("text", "")).strip() for s in transcript))
+    bullets = _legacy_pick_bullets(final_paragraph)
+    actions, decisions = _legacy_actions_decisions(full_text)
+    facts = _legacy_key_facts(full_text)
+    return bullets, actions, decisions, facts
+
+def engine(transcript, final_paragraph):
+    bullets = pick_bullets(final_paragraph)
+    return bullets, extract_structure(transcript)
+
+
+# ---- Synthetic long transcript ----
+def build_transcript(hours: float, wpm: int = 150):
+    """Repeat the reference TED transcript, with timestamps, to `hours` of speech."""
+    base = (HERE / "ref_transcript.txt").read_text(encoding="utf-8", errors="ignore")
+    extra = ("We will review the budget of $12,500 by 10:30 and the team should send the "
+             "draft on 12/05. We agreed to adopt the new plan with a 15% buffer over 3 days. "
+             "Um, okay. Thank you. Yeah.")
+    sents = _sent_split(base + " " + extra)
+    target_words = int(hours * 60 * wpm)
+    transcript, words, t, i = [], 0, 0.0, 0
+    while words < target_words:
+        s = sents[i % len(sents)]
+        n = len(s.split())
+        dur = n / wpm * 60.0
+        transcript.append({"start": round(t, 2), "end": round(t + dur, 2), "text": s})
+        t += dur; words += n; i += 1
+    return transcript
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=2.0)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    transcript = build_transcript(args.hours)
+    paragraph = " ".join(s["text"] for s in transcript[:12])
+    text = transcript_text(transcript).text
+    print(f"Transcript: {len(transcript)} segments, {len(text.split())} words, "
+          f"{transcript[-1]['end'] / 3600:.2f} h")
+
+    t_legacy = _time(lambda: legacy(transcript, paragraph), args.repeat)
+
+    def cold():
+        sentence_spans.cache_clear(); scan.cache_clear()
+        engine(transcript, paragraph)
+    t_cold = _time(cold, args.repeat)
+    engine(transcript, paragraph)
+    t_warm = _time(lambda: engine(transcript, paragraph), args.repeat)
+
+    print(f"legacy (multi-pass)      : {t_legacy * 1000:8.1f} ms")
+    print(f"engine (single pass)     : {t_cold * 1000:8.1f} ms  ({t_legacy / t_cold:.1f}x)")
+    print(f"engine (cached re-call)  : {t_warm * 1000:8.1f} ms  ({t_legacy / t_warm:.1f}x)")
+
+    _, l_act, l_dec, _ = legacy(transcript, paragraph)
+    _, st = engine(transcript, paragraph)
+    same = [a["text"] for a in st["actions"]] == l_act and [d["text"] for d in st["decisions"]] == l_dec
+    print(f"actions/decisions match legacy: {same}")
+    for kind in ("actions", "decisions", "facts"):
+        for item in st[kind][:3]:
+            print(f"  {kind:<9} [{item['start']:7.1f}-{item['end']:7.1f}] {item['text'][:70]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark BART generation settings: generated tokens/sec, wall time and ROUGE
+for fixed vs length-adaptive lengths, greedy first-pass partials and
+draft-model assisted decoding.
+
+Run from backend/:
+  python testing/benchmark_generation.py
+  python testing/benchmark_generation.py --transcript meeting.json --reference meeting_ref.txt
+  python testing/benchmark_generation.py --assistant sshleifer/distilbart-cnn-12-6
+
+The first row is the default configuration; the others are the opt-in
+BART_ADAPTIVE_LENGTH / BART_PARTIAL_NUM_BEAMS / BART_ASSISTANT_MODEL settings,
+whose ROUGE should be checked against it before enabling them. Multi-chunk
+effects (partials) need a long real transcript (text or /analyze JSON).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent))
+
+from rouge_score import rouge_scorer  # noqa: E402
+
+import services.summarizer as summarizer  # noqa: E402
+from benchmark_prefilter_rouge import executive_paragraph, load_transcript  # noqa: E402
+
+
+def configs(assistant: str):
+    nb = summarizer.NUM_BEAMS
+    out = [
+        ("default: fixed, full beams",   dict(ADAPTIVE_LEN=False, PARTIAL_NUM_BEAMS=nb, ASSISTANT_MODEL="")),
+        ("adaptive, beams everywhere",   dict(ADAPTIVE_LEN=True,  PARTIAL_NUM_BEAMS=nb, ASSISTANT_MODEL="")),
+        ("adaptive, 2-beam partials",    dict(ADAPTIVE_LEN=True,  PARTIAL_NUM_BEAMS=2,  ASSISTANT_MODEL="")),
+        ("adaptive, greedy partials",    dict(ADAPTIVE_LEN=True,  PARTIAL_NUM_BEAMS=1,  ASSISTANT_MODEL="")),
+    ]
+    if assistant:
+        out.append(("adaptive, greedy + assistant", dict(ADAPTIVE_LEN=True, PARTIAL_NUM_BEAMS=1, ASSISTANT_MODEL=assistant)))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--transcript", default=str(HERE / "hyp_transcript.txt"))
+    ap.add_argument("--reference", default=str(HERE / "ref_summarize.txt"))
+    ap.add_argument("--assistant", default="", help="draft model for assisted decoding, e.g. sshleifer/distilbart-cnn-12-6")
+    args = ap.parse_args()
+
+    transcript = load_transcript(args.transcript)
+    text = " ".join(s["text"] for s in transcript)
+    reference = Path(args.reference).read_text(encoding="utf-8")
+
+    stats = {"passes": 0, "tokens": 0}
+    summarize_once = summarizer._summarize_once
+    def counted(text, final=True):
+        out = summarize_once(text, final=final)
+        stats["passes"] += 1
+        stats["tokens"] += len(summarizer.TOKENIZER(out)["input_ids"])
+        return out
+    summarizer._summarize_once = counted
+
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
+    print(f"Source: {len(text.split())} words, NUM_BEAMS={summarizer.NUM_BEAMS}")
+    print(f"{'config':<30} {'passes':>6} {'tokens':>7} {'time(s)':>8} {'tok/s':>7} {'R1-F':>7} {'R2-F':>7} {'RL-F':>7}")
+    for name, knobs in configs(args.assistant):
+        for k, v in knobs.items():
+            setattr(summarizer, k, v)
+        stats.update(passes=0, tokens=0)
+        t0 = time.perf_counter()
+        summary = summarizer.generate_summary(transcript)
+        dt = time.perf_counter() - t0
+        sc = scorer.score(reference, executive_paragraph(summary))
+        print(f"{name:<30} {stats['passes']:>6d} {stats['tokens']:>7d} {dt:>8.1f} {stats['tokens'] / dt:>7.1f} "
+              f"{sc['rouge1'].fmeasure:>7.4f} {sc['rouge2'].fmeasure:>7.4f} {sc['rougeL'].fmeasure:>7.4f}")
+
+
+if __name__ == "__main__":
+    main()
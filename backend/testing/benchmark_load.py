@@ -0,0 +1,242 @@
+"""
+Load generator: replays mixed frontend traffic against a running backend and
+reports latency percentiles and error rates per endpoint.
+
+Traffic (all media synthesized locally, or --upload to replay a real file):
+  live sessions   RecordPage: POST /transcribe_chunk every --chunk-sec with a
+                  chunk of that length, POST /analyze_frame every --frame-sec
+  uploaders       MeetingAnalyzer: POST /analyze, then /generate_pdf with the
+                  report payload (--pdf) and GET /export_frames_zip, then
+                  --think-sec pause
+
+Runs offline against the stand-in models, so it exercises the HTTP, file and
+concurrency layer rather than the models:
+  MODEL_STANDIN=1 STANDIN_SCALE=0.2 uvicorn main:app --port 8000      (from backend/)
+  python testing/benchmark_load.py --live 8 --uploaders 2 --duration 120
+
+An error is an HTTP status >= 400, a failed request, or a 200 body carrying
+{"error": ...} or a "⚠️ Error" transcript line.
+"""
+import argparse
+import io
+import json
+import random
+import sys
+import threading
+import time
+import wave
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SR = 16000
+
+
+# ---- Synthetic media ----
+def _speechlike(seconds: float, seed: int) -> np.ndarray:
+    """Noise bursts modulated like syllables, with pauses; int16 mono at 16 kHz."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SR)
+    t = np.arange(n) / SR
+    envelope = (np.sin(2 * np.pi * 4.0 * t) > 0) * (np.sin(2 * np.pi * 0.2 * t + seed) > -0.3)
+    signal = rng.normal(0, 0.2, n) * envelope + 0.1 * np.sin(2 * np.pi * 180 * t) * envelope
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+def make_wav(seconds: float, seed: int = 0) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes(_speechlike(seconds, seed).tobytes())
+    return buf.getvalue()
+
+def make_webm(seconds: float, seed: int = 0) -> bytes:
+    """Opus/WebM like MediaRecorder produces; WAV bytes if PyAV can't encode it."""
+    if not AV_AVAILABLE:
+        return make_wav(seconds, seed)
+    try:
+        buf = io.BytesIO()
+        with av.open(buf, "w", format="webm") as out:
+            stream = out.add_stream("libopus", rate=48000)
+            stream.layout = "mono"
+            pcm = np.repeat(_speechlike(seconds, seed), 3)   # 16k -> 48k
+            for i in range(0, len(pcm), 960):
+                frame = av.AudioFrame.from_ndarray(pcm[i:i + 960].reshape(1, -1), format="s16", layout="mono")
+                frame.sample_rate = 48000
+                for packet in stream.encode(frame):
+                    out.mux(packet)
+            for packet in stream.encode(None):
+                out.mux(packet)
+        return buf.getvalue()
+    except Exception as e:
+        print("⚠️ webm encode failed, sending WAV bytes instead:", e)
+        return make_wav(seconds, seed)
+
+def make_jpeg(seed: int = 0, size=(640, 360)) -> bytes:
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(img).resize(size).save(buf, format="JPEG", quality=80)
+    return buf.getvalue()
+
+
+# ---- Recording ----
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)   # endpoint -> [sec]
+        self.errors = defaultdict(list)    # endpoint -> [message]
+
+    def call(self, endpoint: str, fn):
+        t0 = time.perf_counter()
+        error, resp = None, None
+        try:
+            resp = fn()
+            if resp.status_code >= 400:
+                error = f"HTTP {resp.status_code}"
+            elif resp.headers.get("content-type", "").startswith("application/json"):
+                error = _body_error(resp.json())
+        except requests.RequestException as e:
+            error = type(e).__name__
+        sec = time.perf_counter() - t0
+        with self.lock:
+            self.latency[endpoint].append(sec)
+            if error:
+                self.errors[endpoint].append(error)
+        return resp if error is None else None
+
+    def report(self, wall: float) -> dict:
+        out = {}
+        print(f"\n{'endpoint':<20} {'n':>6} {'err%':>6} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for endpoint in sorted(self.latency):
+            lat = np.array(self.latency[endpoint]) * 1000
+            errs = self.errors[endpoint]
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            row = {"n": len(lat), "errors": len(errs), "error_rate": len(errs) / len(lat),
+                   "rps": len(lat) / wall, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": float(lat.max()),
+                   "error_kinds": {k: errs.count(k) for k in set(errs)}}
+            out[endpoint] = row
+            print(f"{endpoint:<20} {row['n']:>6} {row['error_rate']:>6.1%} {row['rps']:>7.2f} "
+                  f"{p50:>9.0f} {p95:>9.0f} {p99:>9.0f} {row['max_ms']:>9.0f}")
+        for endpoint, errs in sorted(self.errors.items()):
+            if errs:
+                kinds = ", ".join(f"{k} x{n}" for k, n in sorted(out[endpoint]["error_kinds"].items()))
+                print(f"  {endpoint} errors: {kinds}")
+        return out
+
+def _body_error(body):
+    if isinstance(body, dict):
+        if body.get("error"):
+            return str(body["error"])[:80]
+        body = body.get("transcript")
+    if isinstance(body, list) and body and isinstance(body[0], dict):
+        text = str(body[0].get("text", ""))
+        if text.startswith("⚠️") and "Skipped" not in text:
+            return text[:80]
+    return None
+
+
+# ---- Sessions ----
+def ticker(stop: threading.Event, pool: ThreadPoolExecutor, interval: float, first: float, fn):
+    #     Open loop, like the browser's timers: requests fire on schedule whether or
+    #     not earlier ones returned, so a slow server shows up as latency, not as
+    #     fewer requests.
+    next_at = time.monotonic() + first
+    while not stop.wait(max(0.0, next_at - time.monotonic())):
+        pool.submit(fn)
+        next_at += interval
+
+def live_session(args, rec: Recorder, stop: threading.Event, pool: ThreadPoolExecutor, sid: int):
+    #     RecordPage: frame snapshots and audio chunks on independent timers.
+    frame = make_jpeg(sid)
+    chunk = make_webm(args.chunk_sec, sid)
+    post_frame = lambda: rec.call("/analyze_frame", lambda: requests.post(
+        f"{args.url}/analyze_frame", files={"file": ("frame.jpg", frame, "image/jpeg")}, timeout=args.timeout))
+    post_chunk = lambda: rec.call("/transcribe_chunk", lambda: requests.post(
+        f"{args.url}/transcribe_chunk", files={"file": ("chunk.webm", chunk, "audio/webm")}, timeout=args.timeout))
+    frames = threading.Thread(target=ticker, daemon=True,
+                              args=(stop, pool, args.frame_sec, random.uniform(0, args.frame_sec), post_frame))
+    frames.start()
+    ticker(stop, pool, args.chunk_sec, args.chunk_sec, post_chunk)
+    frames.join()
+
+def uploader(args, rec: Recorder, stop: threading.Event, pool: ThreadPoolExecutor, upload):
+    #     MeetingAnalyzer: closed loop, a user waits for each result.
+    name, data = upload
+    while not stop.is_set():
+        resp = rec.call("/analyze", lambda: requests.post(
+            f"{args.url}/analyze", files={"file": (name, data)}, timeout=args.timeout))
+        result = resp.json() if resp is not None else {}
+        if result and args.pdf:
+            from services.report import report_payload
+            payload = report_payload(result, title=name)
+            rec.call("/generate_pdf", lambda: requests.post(
+                f"{args.url}/generate_pdf", json=payload, timeout=args.timeout))
+        if result.get("frame_details"):
+            frames_id = result["frame_details"][0]["image_url"].split("/")[3]
+            rec.call("/export_frames_zip", lambda: requests.get(
+                f"{args.url}/export_frames_zip", params={"frames": frames_id}, timeout=args.timeout))
+        stop.wait(args.think_sec * random.uniform(0.5, 1.5))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--duration", type=float, default=60, help="seconds of traffic")
+    ap.add_argument("--live", type=int, default=4, help="concurrent live recording sessions")
+    ap.add_argument("--chunk-sec", type=float, default=15, help="live chunk interval and length")
+    ap.add_argument("--frame-sec", type=float, default=10, help="live frame snapshot interval")
+    ap.add_argument("--uploaders", type=int, default=1, help="concurrent /analyze upload loops")
+    ap.add_argument("--upload", default="", help="file to upload (default: synthetic WAV, same name for all)")
+    ap.add_argument("--upload-sec", type=float, default=120, help="synthetic upload length")
+    ap.add_argument("--think-sec", type=float, default=5, help="pause between an uploader's requests")
+    ap.add_argument("--pdf", action="store_true", help="also POST /generate_pdf (needs wkhtmltopdf)")
+    ap.add_argument("--ramp-sec", type=float, default=5, help="stagger session starts over this long")
+    ap.add_argument("--timeout", type=float, default=600)
+    ap.add_argument("--json", default="", help="write the per-endpoint report here")
+    args = ap.parse_args()
+
+    if args.upload:
+        with open(args.upload, "rb") as f:
+            upload = (args.upload.replace("\\", "/").rsplit("/", 1)[-1], f.read())
+    else:
+        upload = ("load_test.wav", make_wav(args.upload_sec))
+
+    rec, stop = Recorder(), threading.Event()
+    pool = ThreadPoolExecutor(max_workers=8 * args.live + 4)
+    sessions = [(live_session, (i,)) for i in range(args.live)]
+    sessions += [(uploader, (upload,)) for _ in range(args.uploaders)]
+    threads = []
+    print(f"{args.live} live sessions, {args.uploaders} uploaders against {args.url} for {args.duration:.0f}s")
+    t0 = time.perf_counter()
+    for fn, extra in sessions:
+        th = threading.Thread(target=fn, args=(args, rec, stop, pool) + extra, daemon=True)
+        th.start()
+        threads.append(th)
+        stop.wait(args.ramp_sec / max(1, len(sessions)))
+    stop.wait(max(0.0, args.duration - (time.perf_counter() - t0)))
+    stop.set()
+    for th in threads:
+        th.join()
+    pool.shutdown(wait=True)   # in-flight requests finish and are counted
+    report = rec.report(time.perf_counter() - t0)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "endpoints": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
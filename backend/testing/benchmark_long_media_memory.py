@@ -0,0 +1,105 @@
+"""
+Peak-RSS benchmark for the long-media pipeline (services/long_media.py).
+
+Generates synthetic recordings (test pattern + tone, or --source to loop a real
+file) at several durations and analyzes each one in a fresh process, both with
+the rolling-window pipeline and with the original whole-file flow. Peak RSS of
+the windowed pipeline should stay flat as the duration grows.
+
+Run from backend/ (Linux/macOS; needs ffmpeg in PATH):
+  python testing/benchmark_long_media_memory.py --minutes 30 120 240
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+BACKEND = HERE.parent
+
+
+def make_media(path: str, seconds: int, source: str = "") -> None:
+    if os.path.exists(path):
+        return
+    if source:
+        cmd = ["ffmpeg", "-y", "-stream_loop", "-1", "-i", source, "-t", str(seconds), "-c", "copy", path]
+    else:
+        cmd = ["ffmpeg", "-y",
+               "-f", "lavfi", "-i", "testsrc=size=320x240:rate=5",
+               "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=16000",
+               "-t", str(seconds), "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", path]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024.0 if sys.platform != "darwin" else peak / (1024.0 * 1024.0)
+
+def child(path: str, mode: str) -> None:
+    """Runs inside a fresh interpreter; prints one JSON line with the measurements."""
+    os.chdir(BACKEND)
+    sys.path.insert(0, str(BACKEND))
+    import ffmpeg
+    from services.transcriber import transcribe_audio
+    from services.summarizer import generate_summary
+    from services.sentiment import analyze_sentiment
+    from services.deepfake import extract_frames, predict_image
+    from services.long_media import LongMediaAnalysis
+
+    base = _peak_rss_mb()
+    work = tempfile.mkdtemp(prefix="lm_bench_", dir="temp")
+    frames_dir = os.path.join(work, "frames")
+    t0 = time.perf_counter()
+    if mode == "windowed":
+        job = LongMediaAnalysis(path, os.path.join(work, "job"), is_video=True, frame_dir=frames_dir)
+        job.run()
+        size = sum(len(chunk) for chunk in job.iter_json())
+        job.cleanup()
+    else:
+        frames = extract_frames(path, frames_dir, interval_sec=30)
+        frame_results = [predict_image(f) for f in frames]
+        wav = os.path.join(work, "audio.wav")
+        ffmpeg.input(path).output(wav, ac=1, ar=16000).overwrite_output().run(quiet=True)
+        transcript = transcribe_audio(wav)
+        result = {"frame_details": frame_results, "transcript": transcript,
+                  "summary": generate_summary(transcript), "sentiment": analyze_sentiment(transcript)}
+        size = len(json.dumps(result))
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({"baseline_mb": round(base, 1), "peak_mb": round(_peak_rss_mb(), 1),
+                      "seconds": round(elapsed, 1), "response_bytes": size}))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=int, nargs="+", default=[30, 120, 240])
+    ap.add_argument("--modes", nargs="+", default=["windowed", "legacy"], choices=["windowed", "legacy"])
+    ap.add_argument("--source", default="", help="loop this recording instead of a synthetic pattern")
+    ap.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    media_dir = BACKEND / "temp" / "bench_media"
+    media_dir.mkdir(parents=True, exist_ok=True)
+    print(f"{'minutes':>7} {'mode':<9} {'models MB':>9} {'peak MB':>8} {'delta MB':>8} {'time(s)':>8} {'resp KB':>8}")
+    for minutes in args.minutes:
+        path = str(media_dir / f"synthetic_{minutes}min.mp4")
+        make_media(path, minutes * 60, args.source)
+        for mode in args.modes:
+            out = subprocess.run([sys.executable, __file__, "--child", path, mode],
+                                 capture_output=True, text=True, cwd=BACKEND)
+            if out.returncode != 0:
+                print(f"{minutes:>7} {mode:<9} failed: {out.stderr.strip().splitlines()[-1:]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{minutes:>7} {mode:<9} {r['baseline_mb']:>9.1f} {r['peak_mb']:>8.1f} "
+                  f"{r['peak_mb'] - r['baseline_mb']:>8.1f} {r['seconds']:>8.1f} {r['response_bytes'] / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
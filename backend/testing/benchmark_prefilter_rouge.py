@@ -0,0 +1,87 @@
+"""
+Compare summaries with and without the extractive pre-filter
+(SUMMARY_PREFILTER_RATIO): BART passes, wall time and ROUGE against a reference.
+
+Run from backend/:
+  python testing/benchmark_prefilter_rouge.py --ratios 1.0 0.6 0.4 0.25
+  python testing/benchmark_prefilter_rouge.py --transcript meeting.json --reference meeting_ref.txt
+
+--transcript is a real recording's transcript: plain text, or the JSON an
+/analyze call returned (its "transcript" segments are used as-is). The default
+is the ~900-word testing/hyp_transcript.txt; the pre-filter only pays off on
+long meetings, so measure those with their own transcript and reference summary.
+Transcripts are never repeated or padded: duplicated text would be removed by the
+filter's redundancy handling and flatter the savings. Each summary is also written to temp/rouge/hyp_r<ratio>.txt so it can be re-scored with
+  python testing/test_summarization_rouge.py testing/ref_summarize.txt temp/rouge/hyp_r0.4.txt
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent))
+
+from rouge_score import rouge_scorer  # noqa: E402
+
+import services.summarizer as summarizer  # noqa: E402
+
+
+def executive_paragraph(summary: str) -> str:
+    """The abstractive paragraph only (what hyp_summarize.txt holds)."""
+    lines = summary.splitlines()
+    body = []
+    for ln in lines[1:]:
+        if not ln.strip():
+            break
+        body.append(ln.strip())
+    return " ".join(body)
+
+def load_transcript(path: str):
+    """Segments of an /analyze JSON result, or one segment holding a plain-text transcript."""
+    raw = Path(path).read_text(encoding="utf-8", errors="ignore")
+    if path.endswith(".json"):
+        return json.loads(raw)["transcript"]
+    return [{"start": 0.0, "end": 0.0, "text": " ".join(raw.split())}]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--transcript", default=str(HERE / "hyp_transcript.txt"))
+    ap.add_argument("--reference", default=str(HERE / "ref_summarize.txt"))
+    ap.add_argument("--ratios", type=float, nargs="+", default=[1.0, 0.6, 0.4, 0.25])
+    ap.add_argument("--out", default="temp/rouge")
+    args = ap.parse_args()
+
+    transcript = load_transcript(args.transcript)
+    reference = Path(args.reference).read_text(encoding="utf-8")
+    os.makedirs(args.out, exist_ok=True)
+
+    passes = {"n": 0}
+    summarize_once = summarizer._summarize_once
+    def counted(*a, **kw):
+        passes["n"] += 1
+        return summarize_once(*a, **kw)
+    summarizer._summarize_once = counted
+    # always apply the filter when a ratio < 1 is requested, even on short inputs
+    summarizer.PREFILTER_MIN_WORDS = 0
+
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
+    print(f"Source: {sum(len(s['text'].split()) for s in transcript)} words, {len(transcript)} segments")
+    print(f"{'ratio':>6} {'passes':>6} {'time(s)':>8} {'R1-F':>7} {'R2-F':>7} {'RL-F':>7}")
+    for ratio in args.ratios:
+        summarizer.PREFILTER_RATIO = ratio
+        passes["n"] = 0
+        t0 = time.perf_counter()
+        summary = summarizer.generate_summary(transcript)
+        dt = time.perf_counter() - t0
+        hyp = executive_paragraph(summary)
+        Path(args.out, f"hyp_r{ratio}.txt").write_text(hyp, encoding="utf-8")
+        sc = scorer.score(reference, hyp)
+        print(f"{ratio:>6.2f} {passes['n']:>6d} {dt:>8.1f} "
+              f"{sc['rouge1'].fmeasure:>7.4f} {sc['rouge2'].fmeasure:>7.4f} {sc['rougeL'].fmeasure:>7.4f}")
+
+
+if __name__ == "__main__":
+    main()
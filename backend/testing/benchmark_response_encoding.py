@@ -0,0 +1,96 @@
+"""
+Bytes and serialization time of /analyze responses: default format vs ?format=compact.
+
+Builds a synthetic result the size of a real meeting (a segment every ~5 s,
+a frame every 30 s; or --result to load a saved /analyze JSON) and compares:
+  default  FastAPI JSONResponse (jsonable_encoder + json.dumps), row layout
+  orjson   row layout, orjson
+  compact  columnar layout (sentiment merged into the transcript), orjson
+each uncompressed, gzip and (if installed) brotli. No models needed.
+
+Run from backend/:
+  python testing/benchmark_response_encoding.py --minutes 30 120 240
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from services.encoding import (BROTLI_AVAILABLE, BROTLI_QUALITY, GZIP_LEVEL,  # noqa: E402
+                               compact_result, dumps)
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+WORDS = ("we should review the budget for next quarter and I think the launch date "
+         "depends on the design team so let's follow up with marketing about pricing").split()
+
+
+def synthetic_result(minutes: int, seed: int = 0):
+    rng = random.Random(seed)
+    transcript, sentiment, t = [], [], 0.0
+    while t < minutes * 60:
+        dur = rng.uniform(2.0, 8.0)
+        transcript.append({"start": round(t, 2), "end": round(t + dur, 2),
+                           "text": " ".join(rng.choices(WORDS, k=int(dur * 2.5))).capitalize() + "."})
+        sentiment.append({"start": round(t, 2), "end": round(t + dur, 2),
+                          "sentiment": rng.choice(["negative", "neutral", "positive"]),
+                          "score": round(rng.uniform(0.4, 0.99), 4)})
+        t += dur + rng.uniform(0.0, 1.0)
+    frames = [{"label": rng.choice(["Real", "Fake"]), "score": round(rng.uniform(0, 100), 1),
+               "image_url": f"/static/frames/20250812_164852/frame_{i}.jpg", "time": i * 30.0}
+              for i in range(minutes * 2)]
+    return {"type": "video", "frames_checked": len(frames), "fake_frames": 0, "frame_details": frames,
+            "transcript": transcript, "summary": "Executive Summary:\n• Synthetic meeting.",
+            "highlights": {"actions": [], "decisions": [], "facts": []}, "sentiment": sentiment}
+
+def timed(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+def report(label: str, result, repeat: int) -> None:
+    variants = {
+        "default": lambda: JSONResponse(jsonable_encoder(result)).body,
+        "orjson": lambda: dumps(result),
+        "compact": lambda: dumps(compact_result(result)),
+    }
+    print(f"\n{label}: {len(result['transcript'])} segments, {len(result.get('frame_details', []))} frames")
+    print(f"{'format':<8} {'bytes':>10} {'ser ms':>8} {'gzip B':>10} {'gzip ms':>8}"
+          + (f" {'br B':>10} {'br ms':>8}" if BROTLI_AVAILABLE else ""))
+    for name, fn in variants.items():
+        body, ser_ms = timed(fn, repeat)
+        gz, gz_ms = timed(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), repeat)
+        line = f"{name:<8} {len(body):>10} {ser_ms:>8.1f} {len(gz):>10} {gz_ms:>8.1f}"
+        if BROTLI_AVAILABLE:
+            br, br_ms = timed(lambda: brotli.compress(body, quality=BROTLI_QUALITY), repeat)
+            line += f" {len(br):>10} {br_ms:>8.1f}"
+        print(line)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=int, nargs="+", default=[30, 120, 240])
+    ap.add_argument("--result", default="", help="saved /analyze JSON to measure instead")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.result:
+        with open(args.result, "r", encoding="utf-8") as f:
+            report(args.result, json.load(f), args.repeat)
+        return
+    for minutes in args.minutes:
+        report(f"{minutes} min", synthetic_result(minutes), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
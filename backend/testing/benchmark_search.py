@@ -0,0 +1,81 @@
+"""
+Query latency of the meeting search index (services/search.py).
+
+Builds a throw-away index of synthetic meetings whose words follow a Zipf
+distribution over a large vocabulary (like real speech), then times /search-style
+queries. No models needed.
+
+Run from backend/:
+  python testing/benchmark_search.py --hours 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from services.search import SearchIndex  # noqa: E402
+
+SEGMENT_SEC = 5.0
+WORDS_PER_SEGMENT = 14
+MEETING_HOURS = 1.0
+
+
+def synthetic_vocab(size: int, rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = {"".join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(size * 2)}
+    vocab = sorted(words)[:size]
+    rng.shuffle(vocab)
+    weights = [1.0 / (r + 1) for r in range(len(vocab))]  # Zipf, s = 1
+    return vocab, weights
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=500)
+    ap.add_argument("--vocab", type=int, default=20000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--db", default="", help="index location (default: temp dir)")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    vocab, weights = synthetic_vocab(args.vocab, rng)
+    db = args.db or os.path.join(tempfile.mkdtemp(prefix="search_bench_"), "search.db")
+    index = SearchIndex(db)
+
+    n_meetings = max(1, int(args.hours / MEETING_HOURS))
+    per_meeting = int(MEETING_HOURS * 3600 / SEGMENT_SEC)
+    t0 = time.perf_counter()
+    for m in range(n_meetings):
+        transcript = [{"start": i * SEGMENT_SEC, "end": (i + 1) * SEGMENT_SEC,
+                       "text": " ".join(rng.choices(vocab, weights, k=WORDS_PER_SEGMENT))}
+                      for i in range(per_meeting)]
+        sentiment = [{"sentiment": rng.choice(["negative", "neutral", "positive"]), "score": 0.9}
+                     for _ in transcript]
+        index.add_meeting(f"m{m:05d}", transcript, "Executive Summary:\n• synthetic", {},
+                          sentiment=sentiment, title=f"meeting {m}")
+    build = time.perf_counter() - t0
+    size_mb = os.path.getsize(db) / 2 ** 20
+    print(f"indexed {n_meetings} meetings / {n_meetings * per_meeting} segments "
+          f"({args.hours:.0f} h) in {build:.1f}s ({build / n_meetings * 1000:.0f} ms per meeting), {size_mb:.0f} MB")
+
+    # queries: rare, mid-frequency and frequent terms, 1-2 words, some prefixes
+    bands = {"rare": vocab[5000:], "mid": vocab[200:5000], "frequent": vocab[20:200]}
+    for band, pool in bands.items():
+        lat, hits = [], []
+        for _ in range(args.queries):
+            words = rng.sample(pool, rng.choice([1, 1, 2]))
+            q = " ".join(words) if rng.random() > 0.2 else words[0][:4] + "*"
+            t = time.perf_counter()
+            hits.append(len(index.search(q, limit=20)))
+            lat.append((time.perf_counter() - t) * 1000)
+        lat.sort()
+        print(f"{band:<9} p50 {statistics.median(lat):7.2f} ms  p95 {lat[int(len(lat) * 0.95) - 1]:7.2f} ms  "
+              f"avg hits {statistics.mean(hits):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Sentiment memo cache / fast path vs. the original one-forward-pass-per-segment loop.
+
+Builds a meeting-like transcript from hyp_transcript.txt sentences interleaved
+with short backchannels ("Okay.", "Yeah.", "Thank you.", ...), or loads a saved
+/analyze JSON with --result, and reports time, cache hit rate and label agreement
+with the uncached model for:
+  legacy       original loop, one forward pass per segment
+  cache cold   empty memo cache (dedup + batched misses)
+  cache warm   second request over the same meeting
+  fast path    cold cache + SENTIMENT_FASTPATH_WORDS (default 2)
+
+Run from backend/ (downloads the RoBERTa model on first use):
+  python testing/benchmark_sentiment_cache.py --segments 1500
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent))
+
+import numpy as np  # noqa: E402
+import torch  # noqa: E402
+from scipy.special import softmax  # noqa: E402
+
+import services.sentiment as sentiment  # noqa: E402
+
+BACKCHANNELS = ["Okay.", "Yeah.", "Right.", "Thank you.", "Mm-hmm.", "Yes.", "Sure.", "Okay, so...",
+                "Um, okay.", "Great.", "Sorry.", "No.", "Exactly.", "Thanks.", "Yeah, yeah.", "Right, so..."]
+
+
+def legacy_probs(transcript):
+    """The original implementation, kept here as the baseline."""
+    probs = np.zeros((len(transcript), 3), dtype=np.float32)
+    for i, segment in enumerate(transcript):
+        encoded_input = sentiment.tokenizer(segment["text"], return_tensors='pt', truncation=True)
+        with torch.no_grad():
+            output = sentiment.model(**encoded_input)
+            probs[i] = softmax(output.logits[0].numpy())
+    return probs
+
+def synthetic_transcript(n: int, short_ratio: float, seed: int = 0):
+    rng = random.Random(seed)
+    text = (HERE / "hyp_transcript.txt").read_text(encoding="utf-8")
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", " ".join(text.split())) if s.strip()]
+    out, t = [], 0.0
+    for _ in range(n):
+        txt = rng.choice(BACKCHANNELS) if rng.random() < short_ratio else rng.choice(sentences)
+        out.append({"start": t, "end": t + 3.0, "text": txt})
+        t += 3.5
+    return out
+
+def run(label, fn, transcript, reference):
+    t0 = time.perf_counter()
+    probs = fn(transcript)
+    sec = time.perf_counter() - t0
+    agree = float((probs.argmax(1) == reference.argmax(1)).mean()) if reference is not None else 1.0
+    stats = sentiment.sentiment_cache_stats()
+    print(f"{label:<11} {sec:>8.2f}s {len(transcript) / sec:>9.1f} seg/s  hit rate {stats['hit_rate']:>6.1%}  "
+          f"fast path {stats['fast_path']:>5}  label agreement {agree:.2%}")
+    return probs
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--segments", type=int, default=1500)
+    ap.add_argument("--short-ratio", type=float, default=0.35, help="share of backchannel segments")
+    ap.add_argument("--fastpath-words", type=int, default=2)
+    ap.add_argument("--result", default="", help="saved /analyze JSON to use its transcript")
+    args = ap.parse_args()
+
+    if args.result:
+        with open(args.result, "r", encoding="utf-8") as f:
+            transcript = json.load(f)["transcript"]
+    else:
+        transcript = synthetic_transcript(args.segments, args.short_ratio)
+    print(f"{len(transcript)} segments, {len({sentiment._memo_key(s['text'])[0] for s in transcript})} unique keys")
+
+    sentiment.FASTPATH_WORDS = 0
+    sentiment._cache.clear()
+    reference = run("legacy", legacy_probs, transcript, None)
+    sentiment._cache.clear()
+    run("cache cold", sentiment._segment_probs, transcript, reference)
+    run("cache warm", sentiment._segment_probs, transcript, reference)
+
+    sentiment.FASTPATH_WORDS = args.fastpath_words
+    sentiment._cache.clear()
+    run("fast path", sentiment._segment_probs, transcript, reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,29 @@
+import argparse
 from rouge_score import rouge_scorer
 
-with open("testing/ref_summarize.txt", "r", encoding="utf-8") as f:
-    ref = f.read()
 
-with open("testing/hyp_summarize.txt", "r", encoding="utf-8") as f:
-    hyp = f.read()
+def main():
+    # Usage: python testing/test_summarization_rouge.py [ref_path] [hyp_path]
+    ap = argparse.ArgumentParser()
+    ap.add_argument("ref_path", nargs="?", default="testing/ref_summarize.txt")
+    ap.add_argument("hyp_path", nargs="?", default="testing/hyp_summarize.txt")
+    args = ap.parse_args()
 
-scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
-scores = scorer.score(ref, hyp)
+    with open(args.ref_path, "r", encoding="utf-8") as f:
+        ref = f.read()
 
-for metric, result in scores.items():
-    print(f"{metric.upper()}:")
-    print(f"  Precision: {result.precision:.4f}")
-    print(f"  Recall:    {result.recall:.4f}")
-    print(f"  F1 Score:  {result.fmeasure:.4f}")
+    with open(args.hyp_path, "r", encoding="utf-8") as f:
+        hyp = f.read()
+
+    scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+    scores = scorer.score(ref, hyp)
+
+    for metric, result in scores.items():
+        print(f"{metric.upper()}:")
+        print(f"  Precision: {result.precision:.4f}")
+        print(f"  Recall:    {result.recall:.4f}")
+        print(f"  F1 Score:  {result.fmeasure:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Unit tests run from backend/ (`python -m pytest`), offline: every model is a
+zero-cost stand-in (services/standin.py) and the job, search and diarization
+stores live in a throwaway directory.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+_TMP = tempfile.mkdtemp(prefix="meeting_tests_")
+os.environ.setdefault("MODEL_STANDIN", "1")
+os.environ.setdefault("STANDIN_SCALE", "0")
+for _model in ("WHISPER", "BART", "ROBERTA", "XCEPTION"):
+    os.environ.setdefault(f"STANDIN_{_model}", "0,0,0,0")
+os.environ.setdefault("JOBS_DIR", os.path.join(_TMP, "jobs"))
+os.environ.setdefault("SEARCH_DB", os.path.join(_TMP, "search.db"))
+os.environ.setdefault("DIARIZE_CACHE_DIR", os.path.join(_TMP, "diarization"))
+
+import wave  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from services import long_media  # noqa: E402
+from services.long_media import LongMediaAnalysis  # noqa: E402
+
+
+class FakeFFmpeg:
+    """ffmpeg-python stand-in: cuts [ss, ss + t) of a `total_sec` silent recording to a 16 kHz WAV."""
+
+    def __init__(self, total_sec: float):
+        self.total_sec = total_sec
+        self.cuts = []
+
+    def input(self, path, ss=0.0, t=None, **_):
+        self._ss, self._t = float(ss), float(t)
+        return self
+
+    def output(self, path, **_):
+        self._out = path
+        return self
+
+    def overwrite_output(self):
+        return self
+
+    def run(self, **_):
+        seconds = max(0.0, min(self._t, self.total_sec - self._ss))
+        self.cuts.append((self._ss, seconds))
+        with wave.open(self._out, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(np.zeros(int(seconds * 16000), dtype=np.int16).tobytes())
+
+    def transcribe(self, wav, **_):
+        """ASR stand-in: one 4 s segment every 30 s of the last cut, text tagged with its absolute time."""
+        with wave.open(wav, "rb") as w:
+            seconds = w.getnframes() / w.getframerate()
+        ss = self.cuts[-1][0]
+        return [{"start": t, "end": t + 4.0, "text": f"We will review item {int(ss + t)} today."}
+                for t in np.arange(0, seconds - 4.0, 30.0).tolist()]
+
+
+@pytest.fixture
+def fake_media(monkeypatch):
+    """Patch decoding, probing and ASR of services.long_media; returns a factory for the FakeFFmpeg."""
+    def patch(total_sec, probed_sec):
+        fake = FakeFFmpeg(total_sec)
+        monkeypatch.setattr(long_media, "ffmpeg", fake)
+        monkeypatch.setattr(long_media, "probe_duration", lambda path: probed_sec)
+        monkeypatch.setattr(long_media, "transcribe_audio", fake.transcribe)
+        return fake
+    return patch
+
+
+@pytest.fixture
+def media(fake_media, tmp_path):
+    """Factory for (analysis, fake ffmpeg) of an audio recording with 600 s windows in tmp_path."""
+    def make(total_sec, probed_sec, **kw):
+        fake = fake_media(total_sec, probed_sec)
+        job = LongMediaAnalysis(str(tmp_path / "meeting.mp3"), str(tmp_path / "work"),
+                                is_video=False, window_sec=600, **kw)
+        return job, fake
+    return make
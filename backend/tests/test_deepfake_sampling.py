@@ -0,0 +1,88 @@
+import types
+
+import numpy as np
+import pytest
+
+from services import deepfake, long_media
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in: `duration` seconds at 25 fps, optionally without a frame count."""
+
+    def __init__(self, duration, frame_count=True):
+        self.duration, self.frame_count, self.pos = duration, frame_count, 0.0
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        if prop == FAKE_CV2.CAP_PROP_FPS:
+            return 25.0
+        return self.duration * 25.0 if self.frame_count else 0.0
+
+    def set(self, prop, value):
+        self.pos = value / 1000.0
+
+    def read(self):
+        if self.pos >= self.duration:
+            return False, None
+        return True, np.full((8, 8, 3), int(self.pos) % 256, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+FAKE_CV2 = types.SimpleNamespace(CAP_PROP_FPS=5, CAP_PROP_FRAME_COUNT=7, CAP_PROP_POS_MSEC=0,
+                                 imwrite=lambda path, image: True)
+
+
+@pytest.fixture
+def video(monkeypatch, tmp_path):
+    def make(duration, frame_count=True, probed=0.0):
+        capture = FakeCapture(duration, frame_count)
+        monkeypatch.setattr(deepfake, "cv2", types.SimpleNamespace(**vars(FAKE_CV2), VideoCapture=lambda p: capture))
+        monkeypatch.setattr(long_media, "probe_duration", lambda path: probed)
+        return str(tmp_path / "frames")
+    return make
+
+
+def _sample(out_dir, **kw):
+    return deepfake.sample_frames_adaptive("meeting.webm", out_dir, coarse_interval_sec=60,
+                                           frames_per_min=2, min_gap_sec=2, **kw)
+
+
+def test_tail_after_last_coarse_point_is_sampled(video):
+    out = _sample(video(150))
+    times = [f["time"] for f in out["frames"]]
+    assert {0.0, 60.0, 120.0} <= set(times)
+    assert max(times) >= 149                      # not stuck at the last coarse point
+    assert out["timeline"]["end"][-1] == 150
+    assert len(out["frames"]) == out["budget"] == 5
+
+
+def test_missing_frame_count_falls_back_to_probe(video):
+    out = _sample(video(300, frame_count=False, probed=300.0))
+    assert len(out["frames"]) == out["budget"] == 10
+    assert max(f["time"] for f in out["frames"]) >= 299
+
+
+def test_unknown_length_reads_until_frames_stop(video):
+    out = _sample(video(200, frame_count=False, probed=0.0))
+    times = [f["time"] for f in out["frames"]]
+    assert {0.0, 60.0, 120.0, 180.0} <= set(times)
+    assert 199.5 <= out["timeline"]["end"][-1] < 200   # last decodable frame, not the next grid point
+    assert len(times) == out["budget"] == 7
+    assert 199 <= max(times) < 200
+
+
+def test_window_past_the_end_scores_nothing(video):
+    out = _sample(video(100, frame_count=False, probed=0.0), start_sec=600, end_sec=1200)
+    assert out["frames"] == [] and out["timeline"]["start"] == []
+
+
+def test_refinement_stays_inside_window(video):
+    out = _sample(video(3600), start_sec=600, end_sec=1200)
+    times = [f["time"] for f in out["frames"]]
+    assert min(times) == 600 and max(times) < 1200
+    assert len(times) == out["budget"] == 20
+    assert out["timeline"]["start"][0] == 600 and out["timeline"]["end"][-1] == 1200
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from services import diarization
+from services.diarization import cluster, embeddings, label_speakers, segment_speakers
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "testing"))
+from benchmark_diarization import purity, synthetic_meeting, write_wav  # noqa: E402
+
+
+@pytest.fixture
+def meeting(tmp_path, monkeypatch):
+    """Factory: synthetic `speakers`-voice meeting as a WAV -> (path, segments with "true")."""
+    monkeypatch.setattr(diarization, "CACHE_DIR", str(tmp_path / "cache"))
+
+    def make(minutes, speakers, seed=0):
+        pcm, segments = synthetic_meeting(minutes, speakers, seed=seed)
+        path = str(tmp_path / f"meeting_{speakers}_{seed}.wav")
+        write_wav(path, pcm)
+        return path, segments
+    return make
+
+
+def test_cached_embeddings_equal_cold_ones(meeting):
+    path, segments = meeting(2, 3, seed=3)
+    cold_centers, cold = embeddings(path)
+    assert os.listdir(diarization.CACHE_DIR)
+    warm_centers, warm = embeddings(path)
+    np.testing.assert_array_equal(cold_centers, warm_centers)
+    np.testing.assert_array_equal(cold, warm)
+    assert warm.dtype == np.float32
+    np.testing.assert_array_equal(cluster(cold), cluster(warm))
+
+
+@pytest.mark.parametrize("speakers", [2, 3])
+def test_label_speakers_finds_the_voices(meeting, speakers):
+    path, segments = meeting(3, speakers, seed=speakers)
+    label_speakers(path, segments)
+    assert len({s["speaker"] for s in segments}) == speakers
+    assert purity(segments) >= 0.9
+
+
+def test_single_voice_is_one_speaker(meeting):
+    path, segments = meeting(2, 1, seed=1)
+    label_speakers(path, segments)
+    assert {s["speaker"] for s in segments} == {"Speaker 1"}
+
+
+def test_cluster_short_input_is_one_speaker():
+    assert cluster(np.ones((3, 8), dtype=np.float32)).tolist() == [0, 0, 0]
+
+
+def test_segment_speakers_majority_nearest_and_first_appearance_names():
+    centers = np.array([0.5, 1.5, 2.5, 3.5, 4.5, 8.0])
+    labels = np.array([1, 1, 0, 1, 0, 0])
+    transcript = [
+        {"start": 0.0, "end": 2.0},    # windows 1, 1
+        {"start": 2.0, "end": 5.0},    # windows 0, 1, 0 -> majority 0
+        {"start": 6.0, "end": 6.5},    # no window inside: nearest is 4.5 -> 0
+        {"start": 7.5, "end": 9.0},    # window 0
+    ]
+    assert segment_speakers(transcript, centers, labels) == ["Speaker 1", "Speaker 2", "Speaker 2", "Speaker 2"]
+    assert segment_speakers([{"start": 0.0, "end": 1.0}], np.zeros(0), np.zeros(0, dtype=np.int64)) == ["Speaker 1"]
@@ -0,0 +1,54 @@
+from services.extraction import (extract_actions_decisions, extract_key_facts, extract_structure,
+                                 norm_task_text, sentence_tags)
+
+
+def test_overlapping_facts_count_for_every_kind():
+    # each kind is matched on its own, like the original per-pattern scan
+    assert extract_key_facts("Margins moved $10% this year.") == ["$10", "10%"]
+    assert extract_key_facts("It took 3 days, 5 days on 1/2.") == ["3 days", "5 days", "1/2"]
+
+
+def test_facts_keep_kind_order_and_normalize():
+    text = ("Meet at 14:30 on 12/05/2024. Revenue grew 12.5 % to USD 1,200,000. "
+            "The demo takes 15 minutes and costs € 300.")
+    assert extract_key_facts(text) == ["USD 1200000", "€300", "12.5 %", "15 minutes", "14:30", "12/05/2024"]
+
+
+def test_facts_are_deduplicated_case_insensitively_and_capped():
+    text = "We paid $1,000. Then $1000 again. Also rm 5 and RM 5. " + " ".join(f"{i}%" for i in range(20))
+    facts = extract_key_facts(text, cap=4)
+    assert facts == ["$1000", "rm 5", "0%", "1%"]
+
+
+def test_actions_and_decisions():
+    text = ("Um, so we need to update the roadmap. We decided to ship in March. "
+            "Thanks everyone, we will send notes. Should we review the budget? "
+            "As the designer, you will draft the mockups.")
+    actions, decisions = extract_actions_decisions(text)
+    assert decisions == ["We decided to ship in March."]
+    assert actions == ["update the roadmap.", "Designer — draft the mockups."]
+
+
+def test_structure_carries_source_timestamps():
+    transcript = [
+        {"start": 0.0, "end": 4.0, "text": "Hello all."},
+        {"start": 4.0, "end": 9.5, "text": "The team will fix the login bug"},
+        {"start": 9.5, "end": 12.0, "text": "by Friday. We agreed on 20% more budget."},
+        {"start": 12.0, "end": 13.0, "text": "   "},
+    ]
+    st = extract_structure(transcript)
+    assert st["actions"] == [{"text": "The team will fix the login bug by Friday.", "start": 4.0, "end": 12.0}]
+    assert st["decisions"] == [{"text": "We agreed on 20% more budget.", "start": 9.5, "end": 12.0}]
+    assert st["facts"] == [{"text": "20%", "start": 9.5, "end": 12.0}]
+
+
+def test_sentence_tags_match_words_and_phrases():
+    assert sentence_tags("Please follow up with the marketing executive") >= {"action", "agent", "bullet_action"}
+    assert "action" not in sentence_tags("The weekend was testing my patience")   # no substring hits
+    assert sentence_tags("") == frozenset()
+
+
+def test_task_text_normalization():
+    assert norm_task_text("Um, so we will send the deck") == "send the deck"
+    assert norm_task_text("For the QA team, run   the suite") == "Qa Team — run the suite"
+    assert norm_task_text("The team needs to be working on the API") == "The team needs work on the API"
@@ -0,0 +1,36 @@
+import io
+import zipfile
+
+import pytest
+
+from routes import report
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    from main import app
+
+    frames = tmp_path / "frames" / "20250812_164852_ab12cd"
+    frames.mkdir(parents=True)
+    (frames / "frame0.jpg").write_bytes(b"jpeg")
+    monkeypatch.setattr(report, "FRAMES_ROOT", str(tmp_path / "frames"))
+    return TestClient(app)
+
+
+def test_frames_id_is_required(client):
+    assert client.get("/export_frames_zip").status_code == 422
+    assert client.get("/export_frames_zip", params={"frames": ""}).status_code == 422
+    assert client.get("/export_frames_zip", params={"frames": "../x"}).status_code == 422
+
+
+def test_unknown_frames_id_is_404(client):
+    resp = client.get("/export_frames_zip", params={"frames": "20250101_000000_ffffff"})
+    assert resp.status_code == 404
+    assert resp.json() == {"error": "Frames not found."}
+
+
+def test_export_zips_only_that_analysis(client):
+    resp = client.get("/export_frames_zip", params={"frames": "20250812_164852_ab12cd"})
+    assert resp.status_code == 200
+    assert zipfile.ZipFile(io.BytesIO(resp.content)).namelist() == ["frame0.jpg"]
@@ -0,0 +1,162 @@
+"""
+Checkpointed long-media jobs: a crashed run resumes from its last finished
+window, and uploads run as background jobs. The last test kills a real server
+mid-job and resumes it after a restart (needs the ffmpeg binary).
+"""
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from services import long_media
+from services.jobs import Checkpoints, JobStore
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_resume_after_crash_skips_checkpointed_windows(media, monkeypatch, tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, fake = media(total_sec=1500, probed_sec=1500, checkpoints=Checkpoints(store, "job"))
+
+    def crash_in_third_window(wav, **kw):
+        if fake.cuts[-1][0] >= 1200:
+            raise RuntimeError("killed")
+        return fake.transcribe(wav, **kw)
+    monkeypatch.setattr(long_media, "transcribe_audio", crash_in_third_window)
+    with pytest.raises(RuntimeError):
+        job.run()
+    # output written after the last commit must not survive the restart
+    job.transcript.extend([{"start": 1200.0, "end": 1204.0, "text": "half-written"}])
+
+    resumed, fake = media(total_sec=1500, probed_sec=1500, checkpoints=Checkpoints(store, "job"))
+    resumed.run()
+    assert resumed.resumed_windows == 2
+    assert [ss for ss, _ in fake.cuts] == [1200]      # finished windows are not decoded again
+    starts = [s["start"] for s in resumed.transcript]
+    assert len(starts) == 50
+    assert starts == sorted(starts) and len(set(starts)) == 50
+    assert "half-written" not in {s["text"] for s in resumed.transcript}
+
+
+def _wait_done(client, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] != "running":
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still running after {timeout}s")
+
+
+def test_long_media_upload_runs_as_background_job(fake_media, monkeypatch):
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    from main import app
+
+    fake = fake_media(total_sec=1500, probed_sec=1500)
+    go = threading.Event()
+
+    def held_transcribe(wav, **kw):
+        assert go.wait(10)
+        return fake.transcribe(wav, **kw)
+    monkeypatch.setattr(long_media, "transcribe_audio", held_transcribe)
+
+    client = TestClient(app)
+    started = client.post("/analyze", params={"long_media": "on", "sentiment_mode": "bucket"},
+                          files={"file": ("meeting.wav", os.urandom(4096))}).json()
+    assert started["status"] == "running"
+    job_id = started["job_id"]
+    # the job is blocked inside ASR, and the server still answers
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "running"
+    assert "error" in client.get(started["result"]).json()
+
+    go.set()
+    job = _wait_done(client, job_id)
+    assert job["status"] == "done", job["error"]
+    result = client.get(job["result"]).json()
+    assert result["job_id"] == job_id
+    assert result["long_media"]["windows"] == 3
+    assert len(result["transcript"]) == 50
+    assert "timeline" in result["sentiment"]
+    assert not os.path.exists(job["source_path"])    # only the result is kept
+
+
+# ---- Crash recovery of a real server ----
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_server(port: int, env: dict) -> subprocess.Popen:
+    import requests
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+                            cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(240):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/jobs", timeout=2)
+            return proc
+        except requests.RequestException:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+def _poll(url: str, until, timeout: float) -> dict:
+    import requests
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            body = requests.get(url, timeout=5).json()
+            if until(body):
+                return body
+        except requests.RequestException:
+            pass    # a busy server is not a failure; keep polling until the deadline
+        time.sleep(0.2)
+    raise AssertionError(f"timed out polling {url}")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs the ffmpeg binary")
+def test_killed_server_resumes_job_from_checkpoints(tmp_path):
+    requests = pytest.importorskip("requests")
+    recording = tmp_path / "meeting.wav"
+    with wave.open(str(recording), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(np.zeros(300 * 16000, dtype=np.int16).tobytes())
+
+    # five 60 s windows, each held ~2 s in stand-in Whisper
+    env = dict(os.environ, JOBS_DIR=str(tmp_path / "jobs"), JOBS_DB=str(tmp_path / "jobs" / "jobs.db"),
+               LONG_MEDIA_WINDOW_SEC="60", STANDIN_SCALE="1", STANDIN_JITTER="0", STANDIN_WHISPER="2000,0,0,0")
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = _start_server(port, env)
+    try:
+        with open(recording, "rb") as f:
+            job_id = requests.post(f"{base}/analyze", params={"long_media": "on"},
+                                   files={"file": ("meeting.wav", f)}, timeout=60).json()["job_id"]
+        _poll(f"{base}/jobs/{job_id}", lambda job: job["checkpoints"].get("asr", 0) >= 1, timeout=60)
+    finally:
+        server.send_signal(signal.SIGKILL)
+        server.wait()
+
+    server = _start_server(port, env)
+    try:
+        assert requests.post(f"{base}/jobs/{job_id}/resume", timeout=10).json()["status"] == "running"
+        job = _poll(f"{base}/jobs/{job_id}", lambda job: job["status"] != "running", timeout=120)
+        assert job["status"] == "done", job["error"]
+        result = requests.get(f"{base}{job['result']}", timeout=10).json()
+    finally:
+        server.terminate()
+        server.wait()
+
+    assert result["long_media"]["windows"] == 5
+    assert result["long_media"]["resumed_windows"] >= 1
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from services.long_media import SpillLog
+
+
+def test_spill_log_append_range_truncate_and_reopen(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = SpillLog(path)
+    log.extend({"i": i} for i in range(5))
+    assert len(log) == 5
+    assert log.read_range(1, 3) == [{"i": 1}, {"i": 2}]
+    log.truncate(3)
+    assert [x["i"] for x in log] == [0, 1, 2]
+    log.truncate(10)                          # never grows
+    assert len(SpillLog(path)) == 3           # count is rebuilt from disk
+
+
+def test_spill_log_range_seeks_to_the_window(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = SpillLog(path)
+    log.extend({"i": i, "text": "é" * i} for i in range(100))
+    log.extend({"i": i} for i in range(100, 120))
+    reopened = SpillLog(path)
+    for spill in (log, reopened):
+        assert [x["i"] for x in spill.read_range(97, 103)] == [97, 98, 99, 100, 101, 102]
+        assert spill.read_range(118, 500) == [{"i": 118}, {"i": 119}]
+        assert spill.read_range(120, 130) == []
+    reopened.truncate(50)
+    reopened.extend([{"i": "new"}])
+    assert reopened.read_range(49, 51) == [{"i": 49, "text": "é" * 49}, {"i": "new"}]
+
+
+def test_windows_follow_probed_duration(media):
+    job, fake = media(total_sec=1500, probed_sec=1500)
+    job.run()
+    assert job.windows == 3
+    assert [ss for ss, _ in fake.cuts] == [0, 600, 1200]
+    assert len(job.transcript) == 20 + 20 + 10
+
+
+def test_unknown_duration_reads_until_audio_ends(media):
+    job, fake = media(total_sec=1500, probed_sec=0.0)
+    job.run()
+    assert [ss for ss, _ in fake.cuts] == [0, 600, 1200]   # not just the first window
+    assert job.duration == pytest.approx(1500)
+    assert job.transcript.read_range(49, 50)[0]["start"] == pytest.approx(1470)
+
+
+def test_unknown_duration_on_window_boundary_stops_at_empty_window(media):
+    job, fake = media(total_sec=1200, probed_sec=0.0)
+    job.run()
+    assert [sec for _, sec in fake.cuts] == [600, 600, 0]
+    assert job.duration == pytest.approx(1200)
+
+
+def test_streamed_json_is_valid(media):
+    job, _ = media(total_sec=900, probed_sec=900)
+    job.run()
+    result = json.loads("".join(job.iter_json("bucket", 60.0, page_size=5, extra={"job_id": "x"})))
+    assert result["long_media"]["windows"] == 2
+    assert len(result["transcript"]) == 30
+    assert result["sentiment"]["detail"]["total"] == 30
+    assert len(result["sentiment"]["detail"]["items"]) == 5
+
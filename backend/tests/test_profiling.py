@@ -0,0 +1,38 @@
+import threading
+from contextlib import nullcontext
+
+import pytest
+
+from services import profiling
+
+
+def test_model_spans_stay_in_the_profiled_request():
+    inside, started, finished = {}, threading.Event(), threading.Event()
+
+    def profiled_request():
+        token = profiling._torch_active.set(True)
+        started.set()
+        assert finished.wait(5)
+        inside["active"] = profiling._torch_active.get()
+        profiling._torch_active.reset(token)
+
+    def other_request():
+        assert started.wait(5)
+        inside["other"] = isinstance(profiling.model_span("bart.generate"), nullcontext)
+        finished.set()
+
+    threads = [threading.Thread(target=profiled_request), threading.Thread(target=other_request)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # the other request neither emits spans nor switches them off for the profiled one
+    assert inside == {"active": True, "other": True}
+    assert not profiling._torch_active.get()
+
+
+def test_async_endpoints_are_rejected():
+    with pytest.raises(TypeError):
+        @profiling.profiled("handler")
+        async def handler(request):
+            return {}
@@ -0,0 +1,69 @@
+import pytest
+
+from services.search import SearchIndex, fts_query
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("budget review", '"budget" "review"'),
+    ("budg*", '"budg"*'),
+    ("O'Brien: budget?", '"O" "Brien" "budget"'),
+    ("NOT", '"NOT"'),
+    ("go or not", '"go" "or" "not"'),
+    ("NEAR(a b)", '"NEAR" "a" "b"'),
+    ('"" * -', ""),
+])
+def test_fts_query_quotes_every_word(q, expected):
+    assert fts_query(q) == expected
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    transcript = [
+        {"start": 0.0, "end": 4.0, "text": "The budget is approved."},
+        {"start": 5.0, "end": 9.0, "text": "We will not ship on Friday."},
+        {"start": 10.0, "end": 14.0, "text": "Budgeting for Q3 starts next week."},
+    ]
+    sentiment = [{"sentiment": "positive", "score": 0.9}, {"sentiment": "negative", "score": 0.7},
+                 {"sentiment": "neutral", "score": 0.6}]
+    highlights = {"actions": [], "decisions": [{"text": "The budget is approved.", "start": 0.0, "end": 4.0}],
+                  "facts": []}
+    index.add_meeting("m1", transcript, "• Budget approved", highlights, sentiment=sentiment, title="Sync")
+    return index
+
+
+def test_operator_words_are_searched_literally(index):
+    hits = index.search("NOT")
+    assert [h["text"] for h in hits] == ["We will not ship on Friday."]
+    assert index.search("or") == []
+
+
+def test_prefix_kind_filter_and_sentiment(index):
+    segments = index.search("budg*", kinds=["segment"])
+    assert {h["start"] for h in segments} == {0.0, 10.0}
+    assert {h["kind"] for h in index.search("budget")} == {"segment", "summary", "decision"}
+    hit = index.search("friday", meeting_id="m1")[0]
+    assert (hit["sentiment"], hit["score"], hit["title"]) == ("negative", 0.7, "Sync")
+    assert index.search("friday", meeting_id="other") == []
+
+
+def test_segment_sentiment_pages_in_transcript_order(index):
+    page = index.segment_sentiment("m1", limit=2, offset=1)
+    assert page["total"] == 3
+    assert [r["sentiment"] for r in page["items"]] == ["negative", "neutral"]
+    assert index.segment_sentiment("unknown") is None
+
+
+def test_deleting_a_meeting_needs_the_admin_token(monkeypatch):
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    from main import app
+    from services import profiling
+
+    SearchIndex().add_meeting("m2", [{"start": 0.0, "end": 2.0, "text": "Hello."}], "", {}, title="Hi")
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    assert client.delete("/meetings/m2").status_code == 403
+    assert client.delete("/meetings/m2", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert SearchIndex().segment_sentiment("m2") is not None
+    assert client.delete("/meetings/m2", headers={"X-Admin-Token": "secret"}).json() == {"deleted": "m2"}
+    assert SearchIndex().segment_sentiment("m2") is None
@@ -0,0 +1,110 @@
+import wave
+
+import numpy as np
+import pytest
+
+from services import sentiment
+from services.sentiment import aggregate_sentiment, sentiment_analytics
+
+
+NEG, NEU, POS = [0.8, 0.1, 0.1], [0.1, 0.8, 0.1], [0.1, 0.1, 0.8]
+
+
+def _segments(starts, speakers=None):
+    out = [{"start": float(s), "end": float(s) + 2.0, "text": f"segment {i}"} for i, s in enumerate(starts)]
+    for seg, spk in zip(out, speakers or []):
+        seg["speaker"] = spk
+    return out
+
+
+def test_bucket_counts_means_and_empty_buckets():
+    transcript = _segments([0, 10, 65, 190])
+    probs = np.array([POS, NEG, NEU, POS], dtype=np.float32)
+    report = aggregate_sentiment(transcript, probs, mode="bucket", bucket_sec=60)
+    tl = report["timeline"]
+
+    assert report["bucket_sec"] == 60
+    assert tl["start"] == [0, 60, 120, 180]
+    assert tl["count"] == [2, 1, 0, 1]          # empty bucket 2 is kept
+    assert tl["counts"]["positive"] == [1, 0, 0, 1]
+    assert tl["counts"]["negative"] == [1, 0, 0, 0]
+    assert tl["mean_probs"]["positive"][0] == pytest.approx(0.45)
+    assert tl["polarity"][0] == pytest.approx(0.0)
+    assert tl["polarity"][2] == 0.0
+    assert report["overall"]["counts"] == {"negative": 1, "neutral": 1, "positive": 2}
+
+
+def test_trend_is_count_weighted_and_skips_empty_buckets():
+    transcript = _segments([0, 10, 130])
+    probs = np.array([POS, POS, NEG], dtype=np.float32)
+    report = aggregate_sentiment(transcript, probs, mode="bucket", bucket_sec=60, trend_window=3)
+    tl = report["timeline"]
+    assert tl["trend"][1] == pytest.approx(tl["polarity"][0])     # empty bucket carries no weight
+    assert tl["trend"][2] == pytest.approx((2 * 0.7 - 0.7) / 3, abs=1e-4)
+
+
+def test_bucket_count_is_capped(monkeypatch):
+    monkeypatch.setattr(sentiment, "MAX_BUCKETS", 100)
+    transcript = _segments(np.arange(0, 7200, 5))
+    probs = np.tile(np.array(NEU, dtype=np.float32), (len(transcript), 1))
+    report = aggregate_sentiment(transcript, probs, mode="bucket", bucket_sec=1)
+    assert len(report["timeline"]["count"]) <= 100
+    assert report["bucket_sec"] == 73             # whole seconds, reported back
+    assert sum(report["timeline"]["count"]) == len(transcript)
+
+
+def test_turns_split_on_speaker_change_and_silence():
+    transcript = _segments([0, 2.5, 5, 20, 22.5], speakers=["A", "A", "B", "B", "B"])
+    probs = np.array([POS, POS, NEG, NEU, NEU], dtype=np.float32)
+    report = aggregate_sentiment(transcript, probs, mode="turn")
+    tl = report["timeline"]
+    assert tl["count"] == [2, 1, 2]               # speaker change, then a 13 s gap
+    assert tl["speaker"] == ["A", "B", "B"]
+    assert tl["start"] == [0, 5, 20]
+    assert tl["end"] == [4.5, 7, 24.5]
+    assert report["bucket_sec"] is None
+
+
+def test_analytics_detail_is_first_page():
+    transcript = _segments(range(0, 50, 5))
+    probs = np.tile(np.array(POS, dtype=np.float32), (len(transcript), 1))
+    report = sentiment_analytics(transcript, mode="bucket", page_size=4, probs=probs)
+    detail = report["detail"]
+    assert (detail["page"], detail["page_size"], detail["total"]) == (0, 4, 10)
+    assert [row["start"] for row in detail["items"]] == [0, 5, 10, 15]
+    assert detail["items"][0]["sentiment"] == "positive"
+    assert sentiment_analytics(transcript, page_size=0, probs=probs)["detail"]["items"] == []
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        aggregate_sentiment(_segments([0]), np.array([NEU], dtype=np.float32), mode="speaker")
+
+
+def test_analyze_returns_requested_page_without_search_index(monkeypatch, tmp_path):
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    from main import app
+    from routes import analyze
+    from services import pipeline
+
+    monkeypatch.setattr(analyze, "SEARCH_INDEX", False)
+    monkeypatch.setattr(pipeline, "SEARCH_INDEX", False)
+    recording = tmp_path / "meeting.wav"
+    with wave.open(str(recording), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(np.zeros(120 * 8000, dtype=np.int16).tobytes())
+
+    def fetch(page):
+        with open(recording, "rb") as f:
+            return TestClient(app).post("/analyze", params={"sentiment_mode": "bucket", "page": page, "page_size": 3},
+                                        files={"file": ("meeting.wav", f)}).json()
+
+    first, second = fetch(0), fetch(1)
+    assert "meeting_id" not in second
+    detail = second["sentiment"]["detail"]
+    assert (detail["page"], detail["page_size"]) == (1, 3)
+    assert detail["total"] == len(second["transcript"]) > 3
+    assert [row["start"] for row in detail["items"]] == [seg["start"] for seg in second["transcript"][3:6]]
+    assert detail["items"] != first["sentiment"]["detail"]["items"]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from services import sentiment
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    """Record the texts sent to the model; each text gets its own deterministic row."""
+    calls = []
+
+    def fake_model(texts):
+        calls.extend(texts)
+        rows = [np.random.default_rng(sum(map(ord, t))).dirichlet([1, 1, 1]) for t in texts]
+        return np.array(rows, dtype=np.float32)
+
+    monkeypatch.setattr(sentiment, "_model_probs", fake_model)
+    sentiment._cache.clear()
+    yield calls
+    sentiment._cache.clear()
+
+
+def _probs(*texts):
+    return sentiment._segment_probs([{"start": 0.0, "end": 1.0, "text": t} for t in texts])
+
+
+def test_normalized_duplicates_share_one_model_call(model_calls):
+    probs = _probs("Okay.", "okay", "Um, okay", "We ship on Friday.")
+    assert model_calls == ["Okay.", "We ship on Friday."]
+    np.testing.assert_array_equal(probs[0], probs[2])
+    _probs("OKAY!!")                      # "!" is kept: another key
+    assert model_calls[-1] == "OKAY!!"
+    _probs("okay")                        # shared cache across calls
+    assert len(model_calls) == 3
+
+
+def test_punctuation_only_segments_are_not_merged(model_calls, monkeypatch):
+    monkeypatch.setattr(sentiment, "FASTPATH_WORDS", 3)
+    probs = _probs(":)", ":(", "...", ":)")
+    assert model_calls == [":)", ":(", "..."]       # no fast path, identical text runs once
+    assert not np.array_equal(probs[0], probs[1])
+    np.testing.assert_array_equal(probs[0], probs[3])
+    assert sentiment._cache.get("") is None
+    _probs(":(")
+    assert model_calls[-1] == ":("                 # nothing was cached for it
+
+
+def test_fast_path_skips_the_model(model_calls, monkeypatch):
+    monkeypatch.setattr(sentiment, "FASTPATH_WORDS", 2)
+    probs = _probs("Thanks, great!", "Sorry, wrong.", "This is a longer sentence.")
+    assert model_calls == ["This is a longer sentence."]
+    assert sentiment.labels[int(probs[0].argmax())] == "positive"
+    assert sentiment.labels[int(probs[1].argmax())] == "negative"
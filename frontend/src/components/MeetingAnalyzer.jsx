@@ -44,6 +44,9 @@ export default function MeetingAnalyzer() {
       ]
     : [];
 
+  // Frames folder of this result (<id> in /static/frames/<id>/frameN.jpg)
+  const framesId = frameDetails[0]?.image_url?.split('/')[3] || '';
+
   // -------------------- Upload & Analyze --------------------
   const handleUpload = async () => {
     if (!file) {
@@ -287,9 +290,10 @@ export default function MeetingAnalyzer() {
             ⬇️ Export Report
           </button>
 
-          {videoResult && (
+          {/* no frames id, no export: the backend requires it */}
+          {videoResult && framesId && (
             <button
-              onClick={() => window.open("http://localhost:8000/export_frames_zip")}
+              onClick={() => window.open(`http://localhost:8000/export_frames_zip?frames=${encodeURIComponent(framesId)}`)}
               style={{ padding: '0.5rem 1rem', background: '#FF9800', color: '#fff', border: 'none', borderRadius: 6 }}
             >
               📁 Export Frames ZIP